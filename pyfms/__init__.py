@@ -1,14 +1,88 @@
-from .py_data_override.py_data_override import pyDataOverride
-from .py_diag_manager.pyfms_diag_manager import DiagManager
-from .py_field_manager.py_field_manager import FieldTable
-from .py_horiz_interp.py_horiz_interp import HorizInterp
-from .py_mpp.py_mpp import pyFMS_mpp
-from .py_mpp.py_mpp_domains import (
-    pyDomain,
-    pyDomainData,
-    pyFMS_mpp_domains,
-    pyNestDomain,
-)
-from .pyfms import pyFMS
-from .pyfms_utils import data_handling
-from .pyfms_utils.grid_utils import GridUtils
+import importlib
+
+
+"""
+The wrapper classes are imported on first access through the module
+__getattr__, so that import pyfms only loads the submodules that are used.
+"""
+
+
+_lazy_attributes = {
+    "pyDataOverride": ".py_data_override.py_data_override",
+    "DiagManager": ".py_diag_manager.pyfms_diag_manager",
+    "FieldTable": ".py_field_manager.py_field_manager",
+    "HorizInterp": ".py_horiz_interp.py_horiz_interp",
+    "pyFMS_mpp": ".py_mpp.py_mpp",
+    "pyDomain": ".py_mpp.py_mpp_domains",
+    "pyDomainData": ".py_mpp.py_mpp_domains",
+    "pyDomainGeometry": ".py_mpp.py_mpp_domains",
+    "pyFMS_mpp_domains": ".py_mpp.py_mpp_domains",
+    "pyHaloUpdate": ".py_mpp.py_mpp_domains",
+    "pyNestDomain": ".py_mpp.py_mpp_domains",
+    "pyDomainArray": ".py_mpp.py_domain_array",
+    "pyDomainArrayPool": ".py_mpp.py_domain_pool",
+    "pyDecomposition": ".py_mpp.py_decomposition",
+    "pyRedistribution": ".py_mpp.py_redistribute",
+    "pyGatherPlan": ".py_mpp.py_gather",
+    "pyGlobalReduction": ".py_mpp.py_reduction",
+    "pyHaloExchange": ".py_mpp.py_halo_exchange",
+    "pyIODomainWriter": ".py_mpp.py_io_domain",
+    "pyLayoutCandidate": ".py_mpp.py_layout",
+    "pyFMS": ".pyfms",
+    "GridUtils": ".pyfms_utils.grid_utils",
+}
+
+_lazy_modules = {
+    "data_handling": ".pyfms_utils.data_handling",
+    "py_layout": ".py_mpp.py_layout",
+}
+
+# typing is not imported to keep import pyfms cheap, type checkers treat
+# TYPE_CHECKING as True regardless of where it is defined
+TYPE_CHECKING = False
+
+__all__ = sorted(list(_lazy_attributes) + list(_lazy_modules))
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name], __name__), name)
+    elif name in _lazy_modules:
+        value = importlib.import_module(_lazy_modules[name], __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .py_data_override.py_data_override import pyDataOverride
+    from .py_diag_manager.pyfms_diag_manager import DiagManager
+    from .py_field_manager.py_field_manager import FieldTable
+    from .py_horiz_interp.py_horiz_interp import HorizInterp
+    from .py_mpp import py_layout
+    from .py_mpp.py_decomposition import pyDecomposition
+    from .py_mpp.py_domain_array import pyDomainArray
+    from .py_mpp.py_domain_pool import pyDomainArrayPool
+    from .py_mpp.py_gather import pyGatherPlan
+    from .py_mpp.py_halo_exchange import pyHaloExchange
+    from .py_mpp.py_io_domain import pyIODomainWriter
+    from .py_mpp.py_layout import pyLayoutCandidate
+    from .py_mpp.py_mpp import pyFMS_mpp
+    from .py_mpp.py_mpp_domains import (
+        pyDomain,
+        pyDomainData,
+        pyDomainGeometry,
+        pyFMS_mpp_domains,
+        pyHaloUpdate,
+        pyNestDomain,
+    )
+    from .py_mpp.py_redistribute import pyRedistribution
+    from .py_mpp.py_reduction import pyGlobalReduction
+    from .pyfms import pyFMS
+    from .pyfms_utils import data_handling
+    from .pyfms_utils.grid_utils import GridUtils
@@ -4,11 +4,20 @@ from typing import Any
 import numpy as np
 import numpy.typing as npt
 
+from ..pyfms_utils.data_handling import (
+    setarray_Cdouble,
+    setarray_Cfloat,
+    setarray_Cint32,
+)
+from ..pyfms_utils.function_registry import get_registry
+from ..pyfms_utils.library import get_library
+
 
 class pyDataOverride:
 
     def __init__(self, cFMS: ctypes.CDLL = None):
-        self.cfms = cFMS
+        self.cfms = cFMS if cFMS is not None else get_library()
+        self._registry = get_registry(self.cfms) if self.cfms is not None else None
 
     def init(
         self,
@@ -20,8 +29,6 @@ class pyDataOverride:
         mode: int = None,
     ):
 
-        _data_override_init = self.cfms.cFMS_data_override_init
-
         atm_domain_id_t = ctypes.c_int
         ocn_domain_id_t = ctypes.c_int
         ice_domain_id_t = ctypes.c_int
@@ -48,15 +55,18 @@ class pyDataOverride:
         )
         mode_c = mode_t(mode) if mode is not None else None
 
-        _data_override_init.restype = None
-        _data_override_init.argtypes = [
-            ctypes.POINTER(atm_domain_id_t),
-            ctypes.POINTER(ocn_domain_id_t),
-            ctypes.POINTER(ice_domain_id_t),
-            ctypes.POINTER(land_domain_id_t),
-            ctypes.POINTER(land_domainUG_id_t),
-            ctypes.POINTER(mode_t),
-        ]
+        _data_override_init = self._registry.get(
+            "cFMS_data_override_init",
+            argtypes=[
+                ctypes.POINTER(atm_domain_id_t),
+                ctypes.POINTER(ocn_domain_id_t),
+                ctypes.POINTER(ice_domain_id_t),
+                ctypes.POINTER(land_domain_id_t),
+                ctypes.POINTER(land_domainUG_id_t),
+                ctypes.POINTER(mode_t),
+            ],
+            restype=None,
+        )
 
         _data_override_init(
             atm_domain_id_c,
@@ -78,8 +88,6 @@ class pyDataOverride:
         tick: int = None,
     ):
 
-        _data_override_set_time = self.cfms.cFMS_data_override_set_time
-
         year_t = ctypes.c_int
         month_t = ctypes.c_int
         day_t = ctypes.c_int
@@ -98,17 +106,20 @@ class pyDataOverride:
         tick_c = tick_t(tick) if tick is not None else None
         err_msg_c = err_msg_t("NONE".encode("utf-8"))
 
-        _data_override_set_time.restype = None
-        _data_override_set_time.argtypes = [
-            ctypes.POINTER(year_t),
-            ctypes.POINTER(month_t),
-            ctypes.POINTER(day_t),
-            ctypes.POINTER(hour_t),
-            ctypes.POINTER(minute_t),
-            ctypes.POINTER(second_t),
-            ctypes.POINTER(tick_t),
-            ctypes.POINTER(err_msg_t),
-        ]
+        _data_override_set_time = self._registry.get(
+            "cFMS_data_override_set_time",
+            argtypes=[
+                ctypes.POINTER(year_t),
+                ctypes.POINTER(month_t),
+                ctypes.POINTER(day_t),
+                ctypes.POINTER(hour_t),
+                ctypes.POINTER(minute_t),
+                ctypes.POINTER(second_t),
+                ctypes.POINTER(tick_t),
+                ctypes.POINTER(err_msg_t),
+            ],
+            restype=None,
+        )
 
         _data_override_set_time(
             year_c, month_c, day_c, hour_c, minute_c, second_c, tick_c, err_msg_c
@@ -122,7 +133,6 @@ class pyDataOverride:
         data_index: int = None,
     ) -> np.float32 | np.float64:
 
-        _data_override_scalar = self.cfms.cFMS_data_override_0d_cdouble
         gridname_t = ctypes.c_char_p
         fieldname_t = ctypes.c_char_p
         data_t = ctypes.c_float if data_type is np.float32 else ctypes.c_double
@@ -135,14 +145,21 @@ class pyDataOverride:
         override_c = ctypes.c_bool(False)
         data_index_c = data_index_t(data_index) if data_index is not None else None
 
-        _data_override_scalar.restype = None
-        _data_override_scalar.argtypes = [
-            gridname_t,
-            fieldname_t,
-            ctypes.POINTER(data_t),
-            ctypes.POINTER(override_t),
-            ctypes.POINTER(data_index_t),
-        ]
+        _data_override_scalar = self._registry.get(
+            (
+                "cFMS_data_override_0d_cfloat"
+                if data_type is np.float32
+                else "cFMS_data_override_0d_cdouble"
+            ),
+            argtypes=[
+                gridname_t,
+                fieldname_t,
+                ctypes.POINTER(data_t),
+                ctypes.POINTER(override_t),
+                ctypes.POINTER(data_index_t),
+            ],
+            restype=None,
+        )
 
         _data_override_scalar(gridname_c, fieldname_c, data_c, override_c, data_index_c)
 
@@ -163,28 +180,21 @@ class pyDataOverride:
 
         nshape = len(data_shape)
 
+        if nshape not in (2, 3):
+            raise RuntimeError(f"Data_override, {nshape} dimensions not supported")
+
         if data_type is np.float32:
-            if nshape == 2:
-                _data_override = self.cfms.cFMS_data_override_2d_cfloat
-            if nshape == 3:
-                _data_override = self.cfms.cFMS_data_override_3d_cfloat
+            data_ctype = "cfloat"
+            setarray_data = setarray_Cfloat
         elif data_type is np.float64:
-            if nshape == 2:
-                _data_override = self.cfms.cFMS_data_override_2d_cdouble
-            if nshape == 3:
-                _data_override = self.cfms.cFMS_data_override_3d_cdouble
+            data_ctype = "cdouble"
+            setarray_data = setarray_Cdouble
         else:
             # add cFMS_end
             raise RuntimeError("Data_override, datatype not supported")
 
-        ndata = np.prod(data_shape)
-
         gridname_t = ctypes.c_char_p
         fieldname_t = ctypes.c_char_p
-        data_shape_t = np.ctypeslib.ndpointer(dtype=np.int32, ndim=(1), shape=(nshape))
-        data_t = np.ctypeslib.ndpointer(
-            dtype=data_type, ndim=(nshape), shape=data_shape
-        )
         override_t = ctypes.c_bool
         is_in_t = ctypes.c_int
         ie_in_t = ctypes.c_int
@@ -193,31 +203,40 @@ class pyDataOverride:
 
         gridname_c = gridname_t(gridname.encode("utf-8"))
         fieldname_c = fieldname_t(fieldname.encode("utf-8"))
-        data_shape_c = np.array(data_shape, dtype=np.int32)
-        data = np.ascontiguousarray(np.zeros(data_shape, dtype=data_type, order="C"))
+        data = np.zeros(data_shape, dtype=data_type, order="C")
+        data_shape_p, data_shape_t = setarray_Cint32(
+            np.array(data_shape, dtype=np.int32), ndim=1
+        )
+        data_p, data_t = setarray_data(data, ndim=nshape)
         override = override_t(False)
         is_in_c = is_in_t(is_in) if is_in is not None else None
         js_in_c = js_in_t(js_in) if js_in is not None else None
         ie_in_c = ie_in_t(ie_in) if ie_in is not None else None
         je_in_c = je_in_t(je_in) if je_in is not None else None
 
-        _data_override.restype = None
-        _data_override.argtypes = [
-            gridname_t,
-            fieldname_t,
-            data_shape_t,
-            data_t,
-            ctypes.POINTER(override_t),
-            ctypes.POINTER(is_in_t),
-            ctypes.POINTER(ie_in_t),
-            ctypes.POINTER(js_in_t),
-            ctypes.POINTER(je_in_t),
-        ]
+        _data_override = self._registry.get(
+            f"cFMS_data_override_{nshape}d_{data_ctype}",
+            argtypes=[
+                gridname_t,
+                fieldname_t,
+                data_shape_t,
+                data_t,
+                ctypes.POINTER(override_t),
+                ctypes.POINTER(is_in_t),
+                ctypes.POINTER(ie_in_t),
+                ctypes.POINTER(js_in_t),
+                ctypes.POINTER(je_in_t),
+            ],
+            restype=None,
+            dtype=data.dtype,
+            rank=nshape,
+        )
+
         _data_override(
             gridname_c,
             fieldname_c,
-            data_shape_c,
-            data,
+            data_shape_p,
+            data_p,
             override,
             is_in_c,
             js_in_c,
@@ -13,6 +13,8 @@ from pyfms.pyfms_utils.data_handling import (
     setscalar_Cfloat,
     setscalar_Cint32,
 )
+from pyfms.pyfms_utils.function_registry import get_registry
+from pyfms.pyfms_utils.library import get_library
 
 
 class DiagManager:
@@ -21,12 +23,17 @@ class DiagManager:
     DIAG_ALL = 2
 
     def __init__(self, clibFMS: ctypes.CDLL = None):
-        self.clibFMS = clibFMS
+        self.clibFMS = clibFMS if clibFMS is not None else get_library()
+        self._registry = (
+            get_registry(self.clibFMS) if self.clibFMS is not None else None
+        )
 
     def end(self):
-        _cfms_diag_end = self.clibFMS.cFMS_diag_end
-
-        _cfms_diag_end.restype = None
+        _cfms_diag_end = self._registry.get(
+            "cFMS_diag_end",
+            argtypes=[],
+            restype=None,
+        )
 
         _cfms_diag_end()
 
@@ -37,18 +44,19 @@ class DiagManager:
     ) -> str:
         err_msg = " "
 
-        _cfms_diag_init = self.clibFMS.cFMS_diag_init
-
         diag_model_subset_c, diag_model_subset_t = setscalar_Cint32(diag_model_subset)
         time_init_p, time_init_t = setarray_Cint32(time_init)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        _cfms_diag_init.argtypes = [
-            diag_model_subset_t,
-            time_init_t,
-            err_msg_t,
-        ]
-        _cfms_diag_init.restype = None
+        _cfms_diag_init = self._registry.get(
+            "cFMS_diag_init",
+            argtypes=[
+                diag_model_subset_t,
+                time_init_t,
+                err_msg_t,
+            ],
+            restype=None,
+        )
 
         _cfms_diag_init(diag_model_subset_c, time_init_p, err_msg_c)
 
@@ -61,13 +69,14 @@ class DiagManager:
 
         err_msg = " "
 
-        _cfms_diag_send_complete = self.clibFMS.cFMS_diag_send_complete
-
         diag_field_id_c, diag_field_id_t = setscalar_Cint32(diag_field_id)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        _cfms_diag_send_complete.argtypes = [diag_field_id_t, err_msg_t]
-        _cfms_diag_send_complete.restype = None
+        _cfms_diag_send_complete = self._registry.get(
+            "cFMS_diag_send_complete",
+            argtypes=[diag_field_id_t, err_msg_t],
+            restype=None,
+        )
 
         _cfms_diag_send_complete(diag_field_id_c, err_msg_c)
 
@@ -86,8 +95,6 @@ class DiagManager:
 
         err_msg = " "
 
-        _cfms_diag_set_field_init_time = self.clibFMS.cFMS_diag_set_field_init_time
-
         year_c, year_t = setscalar_Cint32(year)
         month_c, month_t = setscalar_Cint32(month)
         day_c, day_t = setscalar_Cint32(day)
@@ -97,17 +104,20 @@ class DiagManager:
         tick_c, tick_t = setscalar_Cint32(tick)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        _cfms_diag_set_field_init_time.argtypes = [
-            year_t,
-            month_t,
-            day_t,
-            hour_t,
-            minute_t,
-            second_t,
-            tick_t,
-            err_msg_t,
-        ]
-        _cfms_diag_set_field_init_time.restype = None
+        _cfms_diag_set_field_init_time = self._registry.get(
+            "cFMS_diag_set_field_init_time",
+            argtypes=[
+                year_t,
+                month_t,
+                day_t,
+                hour_t,
+                minute_t,
+                second_t,
+                tick_t,
+                err_msg_t,
+            ],
+            restype=None,
+        )
 
         _cfms_diag_set_field_init_time(
             year_c, month_c, day_c, hour_c, minute_c, second_c, tick_c, err_msg_c
@@ -125,22 +135,23 @@ class DiagManager:
 
         err_msg = " "
 
-        _cfms_diag_set_field_timestep = self.clibFMS.cFMS_diag_set_field_timestep
-
         diag_field_id_c, diag_field_id_t = setscalar_Cint32(diag_field_id)
         dseconds_c, dseconds_t = setscalar_Cint32(dseconds)
         ddays_c, ddays_t = setscalar_Cint32(ddays)
         dticks_c, dticks_t = setscalar_Cint32(dticks)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        _cfms_diag_set_field_timestep.argtypes = [
-            diag_field_id_t,
-            dseconds_t,
-            ddays_t,
-            dticks_t,
-            err_msg_t,
-        ]
-        _cfms_diag_set_field_timestep.restype = None
+        _cfms_diag_set_field_timestep = self._registry.get(
+            "cFMS_diag_set_field_timestep",
+            argtypes=[
+                diag_field_id_t,
+                dseconds_t,
+                ddays_t,
+                dticks_t,
+                err_msg_t,
+            ],
+            restype=None,
+        )
 
         _cfms_diag_set_field_timestep(
             diag_field_id_c, dseconds_c, ddays_c, dticks_c, err_msg_c
@@ -152,12 +163,13 @@ class DiagManager:
         self,
         diag_field_id: int,
     ):
-        _cfms_diag_advance_field_time = self.clibFMS.cFMS_diag_advance_field_time
-
         diag_field_id_c, diag_field_id_t = setscalar_Cint32(diag_field_id)
 
-        _cfms_diag_advance_field_time.argtypes = [diag_field_id_t]
-        _cfms_diag_advance_field_time.restype = None
+        _cfms_diag_advance_field_time = self._registry.get(
+            "cFMS_diag_advance_field_time",
+            argtypes=[diag_field_id_t],
+            restype=None,
+        )
 
         _cfms_diag_advance_field_time(diag_field_id_c)
 
@@ -175,8 +187,6 @@ class DiagManager:
         if err_msg is not None:
             err_msg = err_msg[:128]
 
-        _cfms_set_time_end = self.clibFMS.cFMS_diag_set_time_end
-
         year_c, year_t = setscalar_Cint32(year)
         month_c, month_t = setscalar_Cint32(month)
         day_c, day_t = setscalar_Cint32(day)
@@ -186,17 +196,20 @@ class DiagManager:
         tick_c, tick_t = setscalar_Cint32(tick)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        _cfms_set_time_end.argtypes = [
-            year_t,
-            month_t,
-            day_t,
-            hour_t,
-            minute_t,
-            second_t,
-            tick_t,
-            err_msg_t,
-        ]
-        _cfms_set_time_end.restype = None
+        _cfms_set_time_end = self._registry.get(
+            "cFMS_diag_set_time_end",
+            argtypes=[
+                year_t,
+                month_t,
+                day_t,
+                hour_t,
+                minute_t,
+                second_t,
+                tick_t,
+                err_msg_t,
+            ],
+            restype=None,
+        )
 
         _cfms_set_time_end(
             year_c,
@@ -244,31 +257,34 @@ class DiagManager:
         not_xy_c, not_xy_t = setscalar_Cbool(not_xy)
 
         if axis_data.dtype == np.float64:
-            _cfms_diag_axis_init_ = self.clibFMS.cFMS_diag_axis_init_cdouble
+            axis_init_symbol = "cFMS_diag_axis_init_cdouble"
             axis_data_p, axis_data_t = setarray_Cdouble(axis_data)
         elif axis_data.dtype == np.float32:
-            _cfms_diag_axis_init_ = self.clibFMS.cFMS_diag_axis_init_cfloat
+            axis_init_symbol = "cFMS_diag_axis_init_cfloat"
             axis_data_p, axis_data_t = setarray_Cfloat(axis_data)
         else:
             raise RuntimeError("diag_axis_init datatype not supported")
 
-        _cfms_diag_axis_init_.argtypes = [
-            name_t,
-            naxis_data_t,
-            axis_data_t,
-            units_t,
-            cart_name_t,
-            long_name_t,
-            direction_t,
-            set_name_t,
-            edges_t,
-            aux_t,
-            req_t,
-            tile_count_t,
-            domain_position_t,
-            not_xy_t,
-        ]
-        _cfms_diag_axis_init_.restype = ctypes.c_int
+        _cfms_diag_axis_init_ = self._registry.get(
+            axis_init_symbol,
+            argtypes=[
+                name_t,
+                naxis_data_t,
+                axis_data_t,
+                units_t,
+                cart_name_t,
+                long_name_t,
+                direction_t,
+                set_name_t,
+                edges_t,
+                aux_t,
+                req_t,
+                tile_count_t,
+                domain_position_t,
+                not_xy_t,
+            ],
+            restype=ctypes.c_int,
+        )
 
         return _cfms_diag_axis_init_(
             name_c,
@@ -350,21 +366,15 @@ class DiagManager:
         multiple_send_data_c, multiple_send_data_t = setscalar_Cbool(multiple_send_data)
 
         if datatype == np.int32:
-            _cfms_register_diag_field_array_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cint
-            )
+            register_symbol = "cFMS_register_diag_field_array_cint"
             range_data_p, range_data_t = setarray_Cint32(range_data)
             missing_value_c, missing_value_t = setscalar_Cint32(missing_value)
         elif datatype == np.float64:
-            _cfms_register_diag_field_array_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cdouble
-            )
+            register_symbol = "cFMS_register_diag_field_array_cdouble"
             range_data_p, range_data_t = setarray_Cdouble(range_data)
             missing_value_c, missing_value_t = setscalar_Cdouble(missing_value)
         elif datatype == np.float32:
-            _cfms_register_diag_field_array_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cfloat
-            )
+            register_symbol = "cFMS_register_diag_field_array_cfloat"
             range_data_p, range_data_t = setarray_Cfloat(range_data)
             missing_value_c, missing_value_t = setscalar_Cfloat(missing_value)
         else:
@@ -372,27 +382,30 @@ class DiagManager:
                 "register diag field array range_data datatype not supported"
             )
 
-        _cfms_register_diag_field_array_.argtypes = [
-            module_name_t,
-            field_name_t,
-            axes_t,
-            long_name_t,
-            units_t,
-            missing_value_t,
-            range_data_t,
-            mask_variant_t,
-            standard_name_t,
-            verbose_t,
-            do_not_log_t,
-            err_msg_t,
-            interp_method_t,
-            tile_count_t,
-            area_t,
-            volume_t,
-            realm_t,
-            multiple_send_data_t,
-        ]
-        _cfms_register_diag_field_array_.restype = ctypes.c_int
+        _cfms_register_diag_field_array_ = self._registry.get(
+            register_symbol,
+            argtypes=[
+                module_name_t,
+                field_name_t,
+                axes_t,
+                long_name_t,
+                units_t,
+                missing_value_t,
+                range_data_t,
+                mask_variant_t,
+                standard_name_t,
+                verbose_t,
+                do_not_log_t,
+                err_msg_t,
+                interp_method_t,
+                tile_count_t,
+                area_t,
+                volume_t,
+                realm_t,
+                multiple_send_data_t,
+            ],
+            restype=ctypes.c_int,
+        )
 
         return _cfms_register_diag_field_array_(
             module_name_c,
@@ -458,21 +471,15 @@ class DiagManager:
         multiple_send_data_c, multiple_send_data_t = setscalar_Cbool(multiple_send_data)
 
         if datatype == np.int32:
-            _cfms_register_diag_field_scalar_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cint
-            )
+            register_symbol = "cFMS_register_diag_field_scalar_cint"
             range_data_p, range_data_t = setarray_Cint32(range_data)
             missing_value_c, missing_value_t = setscalar_Cint32(missing_value)
         elif datatype == np.float64:
-            _cfms_register_diag_field_scalar_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cdouble
-            )
+            register_symbol = "cFMS_register_diag_field_scalar_cdouble"
             range_data_p, range_data_t = setarray_Cdouble(range_data)
             missing_value_c, missing_value_t = setscalar_Cdouble(missing_value)
         elif datatype == np.float32:
-            _cfms_register_diag_field_scalar_ = (
-                self.clibFMS.cFMS_register_diag_field_array_cfloat
-            )
+            register_symbol = "cFMS_register_diag_field_scalar_cfloat"
             range_data_p, range_data_t = setarray_Cfloat(range_data)
             missing_value_c, missing_value_t = setscalar_Cfloat(missing_value)
         else:
@@ -480,22 +487,25 @@ class DiagManager:
                 "register diag field array range_data datatype not supported"
             )
 
-        _cfms_register_diag_field_scalar_.argtypes = [
-            module_name_t,
-            field_name_t,
-            long_name_t,
-            units_t,
-            standard_name_t,
-            missing_value_t,
-            range_data_t,
-            do_not_log_t,
-            err_msg_t,
-            area_t,
-            volume_t,
-            realm_t,
-            multiple_send_data_t,
-        ]
-        _cfms_register_diag_field_scalar_.restype = ctypes.c_int
+        _cfms_register_diag_field_scalar_ = self._registry.get(
+            register_symbol,
+            argtypes=[
+                module_name_t,
+                field_name_t,
+                long_name_t,
+                units_t,
+                standard_name_t,
+                missing_value_t,
+                range_data_t,
+                do_not_log_t,
+                err_msg_t,
+                area_t,
+                volume_t,
+                realm_t,
+                multiple_send_data_t,
+            ],
+            restype=ctypes.c_int,
+        )
 
         return _cfms_register_diag_field_scalar_(
             module_name_c,
@@ -527,66 +537,34 @@ class DiagManager:
         field_shape_p, field_shape_t = setarray_Cint32(field_shape_arr)
         err_msg_c, err_msg_t = set_Cchar(err_msg)
 
-        if field_shape_arr.size == 2:
-            if field.dtype == np.int32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_2d_cint
-                field_p, field_t = setarray_Cint32(field)
-            elif field.dtype == np.float64:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_2d_cdouble
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_2d_cfloat
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(f"diag_send_data {field.dtype} unsupported")
-        elif field_shape_arr.size == 3:
-            if field.dtype == np.int32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_3d_cint
-                field_p, field_t = setarray_Cint32(field)
-            elif field.dtype == np.float64:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_3d_cdouble
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_3d_cfloat
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(f"diag_send_data {field.dtype} unsupported")
-        elif field_shape_arr.size == 4:
-            if field.dtype == np.int32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_4d_cint
-                field_p, field_t = setarray_Cint32(field)
-            elif field.dtype == np.float64:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_4d_cdouble
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_4d_cfloat
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(f"diag_send_data {field.dtype} unsupported")
-        elif field_shape_arr.size == 5:
-            if field.dtype == np.int32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_5d_cint
-                field_p, field_t = setarray_Cint32(field)
-            elif field.dtype == np.float64:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_5d_cdouble
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_diag_send_data_ = self.clibFMS.cFMS_diag_send_data_5d_cfloat
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(f"diag_send_data {field.dtype} unsupported")
+        nshape = field_shape_arr.size
+        if nshape not in (2, 3, 4, 5):
+            raise RuntimeError(f"diag_send_data {nshape} dimensions unsupported")
+
+        if field.dtype == np.int32:
+            field_ctype = "cint"
+            field_p, field_t = setarray_Cint32(field, ndim=nshape)
+        elif field.dtype == np.float64:
+            field_ctype = "cdouble"
+            field_p, field_t = setarray_Cdouble(field, ndim=nshape)
+        elif field.dtype == np.float32:
+            field_ctype = "cfloat"
+            field_p, field_t = setarray_Cfloat(field, ndim=nshape)
         else:
-            raise RuntimeError(
-                f"diag_send_data {field_shape_arr.size} dimensions unsupported"
-            )
-
-        _cfms_diag_send_data_.argtypes = [
-            diag_field_id_t,
-            field_shape_t,
-            field_t,
-            err_msg_t,
-        ]
-        _cfms_diag_send_data_.restype = ctypes.c_bool
+            raise RuntimeError(f"diag_send_data {field.dtype} unsupported")
+
+        _cfms_diag_send_data_ = self._registry.get(
+            f"cFMS_diag_send_data_{nshape}d_{field_ctype}",
+            argtypes=[
+                diag_field_id_t,
+                field_shape_t,
+                field_t,
+                err_msg_t,
+            ],
+            restype=ctypes.c_bool,
+            dtype=field.dtype,
+            rank=nshape,
+        )
 
         return _cfms_diag_send_data_(
             diag_field_id_c,
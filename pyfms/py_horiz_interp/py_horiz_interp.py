@@ -3,14 +3,25 @@ import ctypes
 import numpy as np
 import numpy.typing as npt
 
+from ..pyfms_utils.data_handling import (
+    check_size,
+    setarray_Cdouble,
+    setarray_Cint32,
+)
+from ..pyfms_utils.function_registry import get_registry
+from ..pyfms_utils.library import get_library
+
 
 class HorizInterp:
-    def __init__(self, cfms: ctypes.CDLL):
-        self.cfms = cfms
+    def __init__(self, cfms: ctypes.CDLL = None):
+        self.cfms = cfms if cfms is not None else get_library()
+        self._registry = get_registry(self.cfms) if self.cfms is not None else None
 
     def get_maxxgrid(self) -> np.int32:
-        self.cfms.get_maxxgrid.restype = np.int32
-        return self.cfms.get_maxxgrid()
+        _get_maxxgrid = self._registry.get(
+            "get_maxxgrid", argtypes=[], restype=np.int32
+        )
+        return _get_maxxgrid()
 
     def create_xgrid_2dx2d_order1(
         self,
@@ -25,49 +36,22 @@ class HorizInterp:
         mask_src: npt.NDArray[np.float64],
     ) -> dict:
 
-        ngrid_src = nlon_src * nlat_src
-        ngrid_tgt = nlon_tgt * nlat_tgt
-
-        ngrid_src_p1 = (nlon_src + 1) * (nlat_src + 1)
-        ngrid_tgt_p1 = (nlon_tgt + 1) * (nlat_tgt + 1)
-
         maxxgrid = self.get_maxxgrid()
 
+        # cFMS takes no array sizes, the grids hold the cell corners
+        ncorners_src = (nlon_src + 1) * (nlat_src + 1)
+        ncorners_tgt = (nlon_tgt + 1) * (nlat_tgt + 1)
+        check_size(lon_src, ncorners_src, "lon_src")
+        check_size(lat_src, ncorners_src, "lat_src")
+        check_size(lon_tgt, ncorners_tgt, "lon_tgt")
+        check_size(lat_tgt, ncorners_tgt, "lat_tgt")
+        check_size(mask_src, nlon_src * nlat_src, "mask_src")
+
         nlon_src_t = ctypes.c_int
         nlat_src_t = ctypes.c_int
         nlon_tgt_t = ctypes.c_int
         nlat_tgt_t = ctypes.c_int
         maxxgrid_t = ctypes.c_int
-        lon_src_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngrid_src_p1), flags="C_CONTIGUOUS"
-        )
-        lat_src_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngrid_src_p1), flags="C_CONTIGUOUS"
-        )
-        lon_tgt_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngrid_tgt_p1), flags="C_CONTIGUOUS"
-        )
-        lat_tgt_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngrid_tgt_p1), flags="C_CONTIGUOUS"
-        )
-        mask_src_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngrid_src_p1), flags="C_CONTIGUOUS"
-        )
-        i_src_ndp = np.ctypeslib.ndpointer(
-            dtype=np.int32, shape=(maxxgrid), flags="C_CONTIGUOUS"
-        )
-        j_src_ndp = np.ctypeslib.ndpointer(
-            dtype=np.int32, shape=(maxxgrid), flags="C_CONTIGUOUS"
-        )
-        i_tgt_ndp = np.ctypeslib.ndpointer(
-            dtype=np.int32, shape=(maxxgrid), flags="C_CONTIGUOUS"
-        )
-        j_tgt_ndp = np.ctypeslib.ndpointer(
-            dtype=np.int32, shape=(maxxgrid), flags="C_CONTIGUOUS"
-        )
-        xarea_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(maxxgrid), flags="C_CONTIGUOUS"
-        )
 
         i_src = np.zeros(maxxgrid, dtype=np.int32)
         j_src = np.zeros(maxxgrid, dtype=np.int32)
@@ -75,26 +59,38 @@ class HorizInterp:
         j_tgt = np.zeros(maxxgrid, dtype=np.int32)
         xarea = np.zeros(maxxgrid, dtype=np.float64)
 
-        _create_xgrid = self.cfms.cFMS_create_xgrid_2dx2d_order1
-
-        _create_xgrid.restype = ctypes.c_int
-        _create_xgrid.argtypes = [
-            ctypes.POINTER(nlon_src_t),
-            ctypes.POINTER(nlat_src_t),
-            ctypes.POINTER(nlon_tgt_t),
-            ctypes.POINTER(nlat_tgt_t),
-            lon_src_ndp,
-            lat_src_ndp,
-            lon_tgt_ndp,
-            lat_tgt_ndp,
-            mask_src_ndp,
-            ctypes.POINTER(maxxgrid_t),
-            i_src_ndp,
-            j_src_ndp,
-            i_tgt_ndp,
-            j_tgt_ndp,
-            xarea_ndp,
-        ]
+        lon_src_p, lon_src_t = setarray_Cdouble(lon_src, ndim=1)
+        lat_src_p, lat_src_t = setarray_Cdouble(lat_src, ndim=1)
+        lon_tgt_p, lon_tgt_t = setarray_Cdouble(lon_tgt, ndim=1)
+        lat_tgt_p, lat_tgt_t = setarray_Cdouble(lat_tgt, ndim=1)
+        mask_src_p, mask_src_t = setarray_Cdouble(mask_src, ndim=1)
+        i_src_p, i_src_t = setarray_Cint32(i_src)
+        j_src_p, j_src_t = setarray_Cint32(j_src)
+        i_tgt_p, i_tgt_t = setarray_Cint32(i_tgt)
+        j_tgt_p, j_tgt_t = setarray_Cint32(j_tgt)
+        xarea_p, xarea_t = setarray_Cdouble(xarea)
+
+        _create_xgrid = self._registry.get(
+            "cFMS_create_xgrid_2dx2d_order1",
+            argtypes=[
+                ctypes.POINTER(nlon_src_t),
+                ctypes.POINTER(nlat_src_t),
+                ctypes.POINTER(nlon_tgt_t),
+                ctypes.POINTER(nlat_tgt_t),
+                lon_src_t,
+                lat_src_t,
+                lon_tgt_t,
+                lat_tgt_t,
+                mask_src_t,
+                ctypes.POINTER(maxxgrid_t),
+                i_src_t,
+                j_src_t,
+                i_tgt_t,
+                j_tgt_t,
+                xarea_t,
+            ],
+            restype=ctypes.c_int,
+        )
 
         nlon_src_c = nlon_src_t(nlon_src)
         nlat_src_c = nlat_src_t(nlat_src)
@@ -107,17 +103,17 @@ class HorizInterp:
             ctypes.byref(nlat_src_c),
             ctypes.byref(nlon_tgt_c),
             ctypes.byref(nlat_tgt_c),
-            lon_src,
-            lat_src,
-            lon_tgt,
-            lat_tgt,
-            mask_src,
+            lon_src_p,
+            lat_src_p,
+            lon_tgt_p,
+            lat_tgt_p,
+            mask_src_p,
             maxxgrid_c,
-            i_src,
-            j_src,
-            i_tgt,
-            j_tgt,
-            xarea,
+            i_src_p,
+            j_src_p,
+            i_tgt_p,
+            j_tgt_p,
+            xarea_p,
         )
 
         return {
@@ -130,21 +126,19 @@ class HorizInterp:
         }
 
     def horiz_interp_init(self, ninterp: int = None):
-        _cfms_horiz_interp_init = self.cfms.cFMS_horiz_interp_init
-
         ninterp_c, ninterp_t = ctypes.c_int(ninterp), ctypes.POINTER(ctypes.c_int)
 
-        _cfms_horiz_interp_init.argtypes = [ninterp_t]
-        _cfms_horiz_interp_init.restype = None
+        _cfms_horiz_interp_init = self._registry.get(
+            "cFMS_horiz_interp_init", argtypes=[ninterp_t], restype=None
+        )
 
         _cfms_horiz_interp_init(ctypes.byref(ninterp_c))
 
     def set_current_interp(self, interp_id: int = None):
-        _cfms_set_current_interp = self.cfms.cFMS_set_current_interp
-
         interp_id_c, interp_id_t = ctypes.c_int(interp_id), ctypes.POINTER(ctypes.c_int)
 
-        _cfms_set_current_interp.argtypes = [interp_id_t]
-        _cfms_set_current_interp.restype = None
+        _cfms_set_current_interp = self._registry.get(
+            "cFMS_set_current_interp", argtypes=[interp_id_t], restype=None
+        )
 
         _cfms_set_current_interp(ctypes.byref(interp_id_c))
@@ -0,0 +1,205 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .py_mpp_domains import pyDomain, pyFMS_mpp_domains
+
+
+"""
+This module holds the decomposition of a pyDomain over all PEs, to route
+points, e.g. observations, particles or regridding work, to the PEs that
+own them.
+
+A pyDecomposition keeps the compute and data domains of every PE in NumPy
+tables, indexed by rank and relative to the first compute domain, so that
+the global domain starts at (0, 0). The divisions of the layout form a grid
+of rows and columns, from which the neighbors of every PE in the eight
+directions follow, wrapping around cyclic edges, and the owner of any
+global index is found with a binary search along x and y instead of a loop
+over points.
+
+On symmetric domains the staggered compute domains of neighboring PEs share
+their edges. A shared point is owned by the PE to its west or south, as in
+the reductions of pyGlobalReduction.
+"""
+
+
+# the directions of pyDecomposition.neighbors, as (x, y) offsets of the
+# division of the neighbor
+DIRECTIONS = (
+    "east",
+    "northeast",
+    "north",
+    "northwest",
+    "west",
+    "southwest",
+    "south",
+    "southeast",
+)
+_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+class pyDecomposition:
+    """
+    Decomposition table of a domain, see the module docstring, from the
+    compute and data domains of all PEs, inclusive (x0, x1, y0, y1) per rank
+    relative to the global domain of shape global_shape. compute and data
+    are int64 (npes, 4) tables, division the (x, y) division of every PE,
+    ranks the rank of every division, -1 where masked out by a maskmap, and
+    neighbors the rank of the neighbor of every PE per direction of
+    DIRECTIONS, -1 at non-cyclic edges and masked divisions.
+    """
+
+    def __init__(
+        self,
+        compute: ArrayLike,
+        data: ArrayLike,
+        global_shape: tuple[int, int],
+        xcyclic: bool = False,
+        ycyclic: bool = False,
+    ):
+        self.compute = np.asarray(compute, dtype=np.int64).reshape(-1, 4)
+        self.data = np.asarray(data, dtype=np.int64).reshape(-1, 4)
+        if self.compute.shape != self.data.shape:
+            raise ValueError("compute and data must have a row per PE")
+        self.global_shape = (int(global_shape[0]), int(global_shape[1]))
+        self.xcyclic = bool(xcyclic)
+        self.ycyclic = bool(ycyclic)
+
+        # the last index of every column and row of divisions
+        self.xends = np.unique(self.compute[:, 1])
+        self.yends = np.unique(self.compute[:, 3])
+        self.division = np.stack(
+            [
+                np.searchsorted(self.xends, self.compute[:, 1]),
+                np.searchsorted(self.yends, self.compute[:, 3]),
+            ],
+            axis=1,
+        )
+        self.ranks = np.full((len(self.xends), len(self.yends)), -1, dtype=np.int64)
+        self.ranks[self.division[:, 0], self.division[:, 1]] = np.arange(self.npes)
+
+        self.neighbors = np.empty((self.npes, len(_OFFSETS)), dtype=np.int64)
+        for k, (dx, dy) in enumerate(_OFFSETS):
+            self.neighbors[:, k] = self._division_rank(
+                self.division[:, 0] + dx, self.division[:, 1] + dy
+            )
+
+    @property
+    def npes(self) -> int:
+        return self.compute.shape[0]
+
+    def _division_rank(self, ix: NDArray, iy: NDArray) -> NDArray:
+        # the rank of divisions (ix, iy), wrapped on cyclic axes, -1 outside
+        nxdiv, nydiv = self.ranks.shape
+        if self.xcyclic:
+            ix = ix % nxdiv
+        if self.ycyclic:
+            iy = iy % nydiv
+        inside = (ix >= 0) & (ix < nxdiv) & (iy >= 0) & (iy < nydiv)
+        ranks = np.full(np.shape(ix), -1, dtype=np.int64)
+        ranks[inside] = self.ranks[ix[inside], iy[inside]]
+        return ranks
+
+    """
+    Function: neighbor
+
+    Returns: The rank of the neighbor of rank in direction, one of
+    DIRECTIONS, -1 if there is none
+    """
+
+    def neighbor(self, rank: int, direction: str) -> int:
+        try:
+            k = DIRECTIONS.index(direction)
+        except ValueError:
+            raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction}")
+        return int(self.neighbors[rank, k])
+
+    """
+    Function: owner_of
+
+    Maps the global indices (i, j), arrays of any matching shape relative to
+    the start of the global domain, to the ranks owning them, wrapped
+    around cyclic axes.
+
+    Returns: An int64 array of the shape of i and j, -1 for indices outside
+    the global domain or in masked divisions
+    """
+
+    def owner_of(self, i: ArrayLike, j: ArrayLike) -> NDArray:
+        i, j = np.broadcast_arrays(
+            np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        )
+        nx, ny = self.global_shape
+        if self.xcyclic:
+            i = i % nx
+        if self.ycyclic:
+            j = j % ny
+        i = np.where(i < nx, i, -1)
+        j = np.where(j < ny, j, -1)
+        # indices past the last division, of a masked last row or column,
+        # map to nxdiv or nydiv
+        ix = np.searchsorted(self.xends, i)
+        iy = np.searchsorted(self.yends, j)
+        nxdiv, nydiv = self.ranks.shape
+        inside = (i >= 0) & (ix < nxdiv) & (j >= 0) & (iy < nydiv)
+        owners = np.full(i.shape, -1, dtype=np.int64)
+        owners[inside] = self.ranks[ix[inside], iy[inside]]
+        return owners
+
+
+"""
+Function: gather_decomposition
+
+Allgathers the compute and data domains of domain at position from all PEs
+of comm, MPI.COMM_WORLD by default, which must hold the PEs of the domain
+in order. Cyclic wrap follows CYCLIC_GLOBAL_DOMAIN in the xflags and yflags
+of the domain. Collective over comm.
+
+Returns: The pyDecomposition of the domain
+"""
+
+
+def gather_decomposition(
+    domain: pyDomain, position: Optional[int] = None, comm=None
+) -> pyDecomposition:
+    from mpi4py import MPI
+
+    if domain.is_mosaic:
+        raise ValueError("pyDecomposition does not support mosaic domains")
+
+    comm = MPI.COMM_WORLD if comm is None else comm
+    geometry = domain.geometry(position)
+    own = np.array(
+        [
+            geometry.isc,
+            geometry.iec,
+            geometry.jsc,
+            geometry.jec,
+            geometry.isd,
+            geometry.ied,
+            geometry.jsd,
+            geometry.jed,
+        ],
+        dtype=np.int64,
+    )
+    bounds = np.empty((comm.Get_size(), 8), dtype=np.int64)
+    comm.Allgather(own, bounds)
+
+    # the indices reported by cFMS are offset, the global domain starts at
+    # the first compute domain
+    xorigin, yorigin = bounds[:, 0].min(), bounds[:, 2].min()
+    bounds[:, 0::4] -= xorigin
+    bounds[:, 1::4] -= xorigin
+    bounds[:, 2::4] -= yorigin
+    bounds[:, 3::4] -= yorigin
+
+    cyclic = pyFMS_mpp_domains.CYCLIC_GLOBAL_DOMAIN
+    return pyDecomposition(
+        compute=bounds[:, :4],
+        data=bounds[:, 4:],
+        global_shape=(geometry.ieg - geometry.isg + 1, geometry.jeg - geometry.jsg + 1),
+        xcyclic=bool((domain.xflags or 0) & cyclic),
+        ycyclic=bool((domain.yflags or 0) & cyclic),
+    )
@@ -0,0 +1,298 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain
+
+
+"""
+This module tracks whether the halos of a field are current, so that halo
+updates of fields nothing has written to since their last update are
+skipped.
+
+A pyDomainArray is a NumPy array of the data domain of a pyDomain at a
+staggering position that marks its halos stale on every write through
+NumPy: item and slice assignment, ufuncs with the array as out, including
+the in-place operators and ufunc.at, fill and the mutating functions
+copyto, put, place and putmask. Views of the array share its state. A halo
+update through update_halos marks the halos current until the next write,
+and another update with the same position, flags and halo widths is
+skipped.
+
+Writes that bypass NumPy, e.g. through np.asarray(array) or a pointer
+passed to C or Fortran, are not seen and must be followed by
+mark_stale. Skipping an update is local, the halos must be stale on all
+PEs or on none, which holds when all PEs run the same code, or the flags
+are agreed over comm.
+"""
+
+
+# functions writing to their first argument
+_MUTATING = {np.copyto, np.put, np.place, np.putmask}
+
+
+class _HaloState:
+    __slots__ = ("stale", "key")
+
+    def __init__(self):
+        self.stale = True
+        # position, flags and halo widths of the last update
+        self.key: Optional[tuple] = None
+
+
+class pyDomainArray(np.ndarray):
+    """
+    Data domain array of domain at position, CENTER by default, with nz
+    vertical levels if nz is given, initialized to zero, that tracks the
+    staleness of its halos, see the module docstring. name labels the
+    array in report.
+    """
+
+    # [updates performed, updates skipped] by name of all arrays
+    _counts: dict[str, list[int]] = {}
+
+    def __new__(
+        cls,
+        domain: pyDomain,
+        position: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
+        nz: Optional[int] = None,
+        name: str = "",
+    ):
+        shape: tuple[int, ...] = domain.geometry(position).data_shape
+        if nz is not None:
+            shape = shape + (nz,)
+        return cls.wrap(np.zeros(shape, dtype=dtype), domain, position, name)
+
+    """
+    Function: wrap
+
+    Returns: A pyDomainArray viewing array, data domain shaped at position
+    of domain, with stale halos
+    """
+
+    @classmethod
+    def wrap(
+        cls,
+        array: NDArray,
+        domain: pyDomain,
+        position: Optional[int] = None,
+        name: str = "",
+    ) -> "pyDomainArray":
+        data_shape = domain.geometry(position).data_shape
+        if array.shape[:2] != data_shape:
+            raise ValueError(
+                f"array of shape {array.shape} does not match the data domain "
+                f"{data_shape}"
+            )
+        wrapped = array.view(cls)
+        wrapped.domain = domain
+        wrapped.position = position
+        wrapped.name = name
+        wrapped._state = _HaloState()
+        return wrapped
+
+    def __array_finalize__(self, obj):
+        if obj is None:
+            return
+        self.domain = getattr(obj, "domain", None)
+        self.position = getattr(obj, "position", None)
+        self.name = getattr(obj, "name", "")
+        state = getattr(obj, "_state", None)
+        # views share the state, copies start stale
+        if state is None or not np.may_share_memory(self, obj):
+            state = _HaloState()
+        self._state = state
+
+    def __setitem__(self, key, value):
+        self._state.stale = True
+        super().__setitem__(key, value)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, out=None, **kwargs):
+        # results are plain arrays, written outputs are marked stale
+        if method == "at" and isinstance(inputs[0], pyDomainArray):
+            inputs[0]._state.stale = True
+        inputs = tuple(_base(x) for x in inputs)
+        if out is not None:
+            for array in out:
+                if isinstance(array, pyDomainArray):
+                    array._state.stale = True
+            kwargs["out"] = tuple(_base(array) for array in out)
+        results = getattr(ufunc, method)(*inputs, **kwargs)
+        if out is not None:
+            if isinstance(results, tuple):
+                return tuple(
+                    array if array is not None else result
+                    for array, result in zip(out, results)
+                )
+            return out[0] if out[0] is not None else results
+        return results
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func in _MUTATING and isinstance(args[0], pyDomainArray):
+            args[0]._state.stale = True
+        out = kwargs.get("out")
+        for array in out if isinstance(out, tuple) else (out,):
+            if isinstance(array, pyDomainArray):
+                array._state.stale = True
+        return super().__array_function__(func, types, args, kwargs)
+
+    def fill(self, value):
+        self._state.stale = True
+        super().fill(value)
+
+    @property
+    def stale(self) -> bool:
+        return self._state.stale
+
+    """
+    Subroutine: mark_stale
+
+    Marks the halos stale after a write that bypassed NumPy
+    """
+
+    def mark_stale(self):
+        self._state.stale = True
+
+    """
+    Subroutine: update_domains
+
+    Updates the halos unless they are current, see update_halos
+    """
+
+    def update_domains(
+        self,
+        flags: Optional[int] = None,
+        whalo: Optional[int] = None,
+        ehalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        nhalo: Optional[int] = None,
+        comm=None,
+    ):
+        update_halos(
+            [self],
+            flags=flags,
+            whalo=whalo,
+            ehalo=ehalo,
+            shalo=shalo,
+            nhalo=nhalo,
+            comm=comm,
+        )
+
+    """
+    Function: counts
+
+    Returns: A dictionary keyed by array name with the number of halo
+    updates performed and skipped
+    """
+
+    @classmethod
+    def counts(cls) -> dict[str, dict[str, int]]:
+        return {
+            name: dict(zip(("performed", "skipped"), counts))
+            for name, counts in cls._counts.items()
+        }
+
+    """
+    Subroutine: reset_counts
+
+    Clears the counts of performed and skipped halo updates
+    """
+
+    @classmethod
+    def reset_counts(cls):
+        cls._counts.clear()
+
+    """
+    Function: report
+
+    Returns: The counts of performed and skipped halo updates as a text table
+    """
+
+    @classmethod
+    def report(cls) -> str:
+        counts = cls.counts()
+        performed = sum(c["performed"] for c in counts.values())
+        skipped = sum(c["skipped"] for c in counts.values())
+        lines = [
+            f"pyDomainArray: {performed} halo updates performed, {skipped} skipped",
+            f"{'name':<20} {'performed':>10} {'skipped':>10}",
+        ]
+        for name, c in counts.items():
+            lines.append(
+                f"{name or '(unnamed)':<20} {c['performed']:>10} {c['skipped']:>10}"
+            )
+        return "\n".join(lines)
+
+
+def _base(array):
+    return array.view(np.ndarray) if isinstance(array, pyDomainArray) else array
+
+
+"""
+Subroutine: update_halos
+
+Updates the halos of the arrays, pyDomainArrays of the same domain, whose
+halos are stale or were last updated with another position, flags or halo
+widths, in one pyDomain.update_halos call, and marks them current. The
+other arrays are skipped. With comm the stale flags are combined over the
+PEs of comm with one Allreduce, so that all PEs update the same arrays.
+"""
+
+
+def update_halos(
+    arrays: list[pyDomainArray],
+    flags: Optional[int] = None,
+    whalo: Optional[int] = None,
+    ehalo: Optional[int] = None,
+    shalo: Optional[int] = None,
+    nhalo: Optional[int] = None,
+    comm=None,
+):
+    if not arrays:
+        return
+    domain = arrays[0].domain
+    for array in arrays:
+        if not isinstance(array, pyDomainArray) or array.domain is None:
+            raise ValueError("update_halos takes pyDomainArrays")
+        if array.domain is not domain:
+            raise ValueError("update_halos arrays must be of the same domain")
+        data_shape = domain.geometry(array.position).data_shape
+        if array.shape[:2] != data_shape:
+            raise ValueError(
+                f"array of shape {array.shape} does not match the data domain "
+                f"{data_shape}"
+            )
+
+    keys = [(array.position, flags, whalo, ehalo, shalo, nhalo) for array in arrays]
+    stale = np.array(
+        [
+            array._state.stale or array._state.key != key
+            for array, key in zip(arrays, keys)
+        ]
+    )
+    if comm is not None:
+        from mpi4py import MPI
+
+        agreed = np.empty_like(stale)
+        comm.Allreduce(stale, agreed, op=MPI.LOR)
+        stale = agreed
+
+    updates = [i for i in range(len(arrays)) if stale[i]]
+    if updates:
+        domain.update_halos(
+            [_base(arrays[i]) for i in updates],
+            positions=[arrays[i].position for i in updates],
+            flags=flags,
+            whalo=whalo,
+            ehalo=ehalo,
+            shalo=shalo,
+            nhalo=nhalo,
+        )
+
+    for array, key, update in zip(arrays, keys, stale):
+        if update:
+            array._state.stale = False
+            array._state.key = key
+        pyDomainArray._counts.setdefault(array.name, [0, 0])[0 if update else 1] += 1
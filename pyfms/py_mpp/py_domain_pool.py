@@ -0,0 +1,209 @@
+import threading
+from typing import Optional, Union
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain, pyDomainGeometry
+
+
+"""
+Function: aligned_empty
+
+Returns: An uninitialized C-contiguous array of shape and dtype whose data
+starts on a multiple of alignment bytes
+"""
+
+
+def aligned_empty(
+    shape: tuple[int, ...], dtype: DTypeLike = np.float64, alignment: int = 64
+) -> NDArray:
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    buffer = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
+class pyDomainArrayPool:
+    """
+    Pool of aligned data domain arrays.
+
+    Arrays are C-contiguous, as passed to cFMS without a copy, and sized for
+    the data domain of a pyDomain at a staggering position, indexed
+    (x, y[, z]). Released arrays are kept per shape and dtype and handed out
+    again by the next request of the same kind, so temporaries allocated
+    every timestep are only allocated once.
+    """
+
+    def __init__(self, alignment: int = 64):
+        if alignment <= 0 or alignment & (alignment - 1):
+            raise ValueError(f"alignment must be a power of two, got {alignment}")
+        self.alignment = alignment
+        self._free: dict[tuple, list[NDArray]] = {}
+        # arrays in use are referenced so that their id is not reused
+        self._in_use: dict[int, tuple] = {}
+        self._stats: dict[tuple, list[int]] = {}
+        self._bytes_in_use = 0
+        self._bytes_high_water = 0
+        self._lock = threading.Lock()
+
+    """
+    Function: empty
+
+    Returns: An uninitialized array for the data domain of domain at
+    position, CENTER by default, with nz vertical levels if nz is given.
+    domain can also be the pyDomainGeometry of the position.
+    """
+
+    def empty(
+        self,
+        domain: Union[pyDomain, pyDomainGeometry],
+        position: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
+        nz: Optional[int] = None,
+    ) -> NDArray:
+        if isinstance(domain, pyDomainGeometry):
+            geometry = domain
+        else:
+            geometry = domain.geometry(position)
+        shape = geometry.data_shape if nz is None else geometry.data_shape + (nz,)
+        return self.allocate(shape, dtype)
+
+    """
+    Function: zeros
+
+    Returns: Same as empty with the array set to zero
+    """
+
+    def zeros(
+        self,
+        domain: Union[pyDomain, pyDomainGeometry],
+        position: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
+        nz: Optional[int] = None,
+    ) -> NDArray:
+        array = self.empty(domain, position=position, dtype=dtype, nz=nz)
+        array.fill(0)
+        return array
+
+    """
+    Function: allocate
+
+    Returns: An uninitialized aligned array of shape and dtype, reused from
+    the pool if one has been released
+    """
+
+    def allocate(
+        self, shape: tuple[int, ...], dtype: DTypeLike = np.float64
+    ) -> NDArray:
+        key = (tuple(int(n) for n in shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            stats = self._stats.setdefault(key, [0, 0, 0, 0])
+            if free:
+                array = free.pop()
+                stats[1] += 1
+            else:
+                array = aligned_empty(key[0], key[1], self.alignment)
+                stats[0] += 1
+            self._in_use[id(array)] = (key, array)
+            stats[2] += 1
+            stats[3] = max(stats[3], stats[2])
+            self._bytes_in_use += array.nbytes
+            self._bytes_high_water = max(self._bytes_high_water, self._bytes_in_use)
+        return array
+
+    """
+    Subroutine: release
+
+    Returns array to the pool. The array must have been handed out by this
+    pool and must not be used afterwards.
+    """
+
+    def release(self, array: NDArray):
+        with self._lock:
+            key, pooled = self._in_use.pop(id(array), (None, None))
+            if pooled is not array:
+                raise ValueError("array was not allocated by this pool or is released")
+            self._free.setdefault(key, []).append(array)
+            self._stats[key][2] -= 1
+            self._bytes_in_use -= array.nbytes
+
+    """
+    Function: temporary
+
+    Context manager handing out an array from empty that is released when
+    the block is left
+    """
+
+    def temporary(self, *args, **kwargs) -> "_Temporary":
+        return _Temporary(self, self.empty(*args, **kwargs))
+
+    """
+    Subroutine: clear
+
+    Drops all released arrays, arrays in use are not affected
+    """
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+
+    @property
+    def bytes_in_use(self) -> int:
+        return self._bytes_in_use
+
+    @property
+    def bytes_high_water(self) -> int:
+        return self._bytes_high_water
+
+    """
+    Function: high_water_mark
+
+    Returns: A dictionary keyed by (shape, dtype) with the number of
+    allocations, reuses, arrays in use and the maximum number of arrays in
+    use at once
+    """
+
+    def high_water_mark(self) -> dict[tuple, dict[str, int]]:
+        with self._lock:
+            return {
+                (shape, np.dtype(dtype).name): dict(
+                    zip(("allocated", "reused", "in_use", "high_water"), stats)
+                )
+                for (shape, dtype), stats in self._stats.items()
+            }
+
+    """
+    Function: report
+
+    Returns: The high water mark as a text table
+    """
+
+    def report(self) -> str:
+        lines = [
+            f"pyDomainArrayPool: {self._bytes_in_use} bytes in use, "
+            f"high water mark {self._bytes_high_water} bytes",
+            f"{'shape':<20} {'dtype':<10} {'allocated':>10} {'reused':>10} "
+            f"{'in use':>10} {'high water':>10}",
+        ]
+        for (shape, dtype), stats in self.high_water_mark().items():
+            lines.append(
+                f"{str(shape):<20} {dtype:<10} {stats['allocated']:>10} "
+                f"{stats['reused']:>10} {stats['in_use']:>10} "
+                f"{stats['high_water']:>10}"
+            )
+        return "\n".join(lines)
+
+
+class _Temporary:
+    def __init__(self, pool: pyDomainArrayPool, array: NDArray):
+        self.pool = pool
+        self.array = array
+
+    def __enter__(self) -> NDArray:
+        return self.array
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pool.release(self.array)
@@ -0,0 +1,209 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain
+
+
+"""
+This module gathers distributed fields of a pyDomain on one PE and scatters
+global fields back with mpi4py.
+
+A pyGatherPlan is built once per domain, position, dtype and trailing
+(vertical) shape. It Allgathers the compute domain of every PE into a table
+of counts and displacements, so that a gather is a single Gatherv of the
+compute domains into a preallocated buffer on root, followed by copies of
+the blocks into the global array, and a scatter the reverse with Scatterv.
+
+Fields are passed with or without halos, data domain or compute domain
+shaped. The global array is indexed (x, y[, z]) over the global domain at
+the position of the plan, or with subdomain set over the union of the
+compute domains of the PEs of comm, e.g. an I/O domain. On symmetric
+domains the staggered compute domains of neighboring PEs share their edges,
+which are sent by both.
+"""
+
+
+class pyGatherPlan:
+    """
+    Persistent gather and scatter of fields of a pyDomain, see the module
+    docstring. Creating a plan is collective over comm, MPI.COMM_WORLD by
+    default, which must hold the PEs of the domain in order, or a subset of
+    them with subdomain set.
+    """
+
+    def __init__(
+        self,
+        domain: pyDomain,
+        dtype: DTypeLike = np.float64,
+        trailing_shape: tuple[int, ...] = (),
+        position: Optional[int] = None,
+        root: int = 0,
+        comm=None,
+        subdomain: bool = False,
+    ):
+        from mpi4py import MPI
+
+        if domain.is_mosaic:
+            raise ValueError("pyGatherPlan does not support mosaic domains")
+
+        geometry = domain.geometry(position)
+        self.geometry = geometry
+        self.dtype = np.dtype(dtype)
+        self.trailing_shape = tuple(int(n) for n in trailing_shape)
+        self.global_shape = (
+            geometry.ieg - geometry.isg + 1,
+            geometry.jeg - geometry.jsg + 1,
+        ) + self.trailing_shape
+        self.root = root
+
+        comm = MPI.COMM_WORLD if comm is None else comm
+        self.comm = comm.Dup()
+        self.rank = self.comm.Get_rank()
+
+        own = np.array(
+            [geometry.isc, geometry.iec, geometry.jsc, geometry.jec], dtype=np.int64
+        )
+        bounds = np.empty((self.comm.Get_size(), 4), dtype=np.int64)
+        self.comm.Allgather(own, bounds)
+
+        # the indices reported by cFMS are offset, the global domain starts
+        # at the first compute domain
+        bounds[:, 0:2] -= bounds[:, 0].min()
+        bounds[:, 2:4] -= bounds[:, 2].min()
+        if subdomain:
+            self.global_shape = (
+                int(bounds[:, 1].max()) + 1,
+                int(bounds[:, 3].max()) + 1,
+            ) + self.trailing_shape
+        elif (
+            bounds[:, 1].max() >= self.global_shape[0]
+            or bounds[:, 3].max() >= self.global_shape[1]
+        ):
+            raise ValueError(
+                "the compute domains do not start at the global domain, the first "
+                "row and column of divisions must be assigned a PE"
+            )
+
+        depth = int(np.prod(self.trailing_shape, dtype=np.int64))
+        shapes = (
+            np.stack([bounds[:, 1] - bounds[:, 0], bounds[:, 3] - bounds[:, 2]]) + 1
+        )
+        self.counts = shapes[0] * shapes[1] * depth
+        self.displacements = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        self.blocks = [
+            np.s_[x0 : x1 + 1, y0 : y1 + 1] for x0, x1, y0, y1 in bounds.tolist()
+        ]
+
+        self._local = np.empty(geometry.compute_shape + self.trailing_shape, self.dtype)
+        self._buffer = None
+        if self.rank == root:
+            self._buffer = np.empty(int(self.counts.sum()), dtype=self.dtype)
+        self._counts = (self.counts.tolist(), self.displacements.tolist())
+
+    def _compute(self, field: NDArray) -> NDArray:
+        # the compute domain of a data or compute domain shaped field
+        if field.shape[2:] != self.trailing_shape or field.dtype != self.dtype:
+            raise ValueError(
+                f"plan is for {self.dtype} fields with trailing shape "
+                f"{self.trailing_shape}, got {field.dtype} of shape {field.shape}"
+            )
+        if field.shape[:2] == self.geometry.data_shape:
+            return field[self.geometry.compute_slice]
+        if field.shape[:2] == self.geometry.compute_shape:
+            return field
+        raise ValueError(
+            f"field of shape {field.shape} matches neither the data domain "
+            f"{self.geometry.data_shape} nor the compute domain "
+            f"{self.geometry.compute_shape}"
+        )
+
+    """
+    Function: gather
+
+    Gathers the compute domains of field from all PEs on root. Collective
+    over the communicator of the plan.
+
+    Returns: The global field on root, into out if given, None elsewhere
+    """
+
+    def gather(
+        self, field: NDArray, out: Optional[NDArray] = None
+    ) -> Optional[NDArray]:
+        compute = self._compute(field)
+        if not compute.flags.c_contiguous:
+            np.copyto(self._local, compute)
+            compute = self._local
+
+        if self.rank != self.root:
+            self.comm.Gatherv(compute, None, root=self.root)
+            return None
+
+        self.comm.Gatherv(compute, [self._buffer, self._counts], root=self.root)
+        if out is None:
+            out = np.empty(self.global_shape, dtype=self.dtype)
+        elif out.shape != self.global_shape:
+            raise ValueError(f"out has shape {out.shape}, expected {self.global_shape}")
+        for block, start, count in zip(self.blocks, self.displacements, self.counts):
+            target = out[block]
+            target[...] = self._buffer[start : start + count].reshape(target.shape)
+        return out
+
+    """
+    Function: scatter
+
+    Scatters global_field, only read on root, to the compute domains of all
+    PEs. Collective over the communicator of the plan. The halos of field
+    are not touched and are filled by a halo update. The arguments of all
+    PEs are checked before the Scatterv, a ValueError is raised on every PE
+    if those of any PE are invalid.
+
+    Returns: field, or a new compute domain shaped array if field is None
+    """
+
+    def scatter(
+        self, global_field: Optional[NDArray], field: Optional[NDArray] = None
+    ) -> NDArray:
+        if field is None:
+            field = np.empty(
+                self.geometry.compute_shape + self.trailing_shape, dtype=self.dtype
+            )
+
+        # an error raised on one PE alone would leave the others blocked in
+        # Scatterv, the errors of all PEs are exchanged first
+        error = None
+        try:
+            compute = self._compute(field)
+        except ValueError as exception:
+            error = str(exception)
+        if self.rank == self.root and error is None:
+            if global_field is None or global_field.shape != self.global_shape:
+                error = f"global_field must have shape {self.global_shape} on root"
+        errors = self.comm.allgather(error)
+        for rank, error in enumerate(errors):
+            if error is not None:
+                raise ValueError(f"scatter failed on rank {rank}: {error}")
+
+        receive = compute if compute.flags.c_contiguous else self._local
+        if self.rank != self.root:
+            self.comm.Scatterv(None, receive, root=self.root)
+        else:
+            for block, start, count in zip(
+                self.blocks, self.displacements, self.counts
+            ):
+                self._buffer[start : start + count] = global_field[block].reshape(-1)
+            self.comm.Scatterv([self._buffer, self._counts], receive, root=self.root)
+
+        if receive is not compute:
+            compute[...] = receive
+        return field
+
+    """
+    Subroutine: free
+
+    Frees the communicator of the plan
+    """
+
+    def free(self):
+        self.comm.Free()
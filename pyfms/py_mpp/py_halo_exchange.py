@@ -0,0 +1,280 @@
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain, pyFMS_mpp_domains
+
+
+"""
+This module exchanges the halos of a pyDomain with mpi4py instead of FMS.
+
+A pyHaloExchange is a plan built once per domain, position, halo widths,
+dtype and field shape. It holds the index ranges sent to and received from
+every neighbor, contiguous send and receive buffers, and persistent MPI
+requests (Send_init/Recv_init), so that an exchange only packs the buffers,
+starts the requests and unpacks. Halo points filled from this PE itself,
+e.g. across the cyclic edges of a single PE, are copied directly.
+
+Supported are scalar updates, including the corners, of domains that may be
+cyclic in x and y. Mosaic, masked and folded domains, and staggered positions
+on symmetric domains, are left to update_domains.
+"""
+
+
+def _intersect(a: tuple, b: tuple) -> Optional[tuple]:
+    x0, x1 = max(a[0], b[0]), min(a[1], b[1])
+    y0, y1 = max(a[2], b[2]), min(a[3], b[3])
+    if x0 > x1 or y0 > y1:
+        return None
+    return (x0, x1, y0, y1)
+
+
+"""
+Function: halo_transfers
+
+Computes the halo regions exchanged by rank, from the compute domain bounds
+of all ranks, bounds[pe] = (isc, iec, jsc, jec). The bounds of all ranks must
+tile the global domain.
+
+Returns: A dictionary keyed by peer rank of (recv, send) lists of inclusive
+index ranges (x0, x1, y0, y1) in the index space of rank. recv lists the halo
+regions of rank filled from peer, send the regions of the compute domain of
+rank sent to peer. Both lists are in the order the peer sends and receives
+them. A peer equal to rank lists regions wrapped around cyclic edges.
+"""
+
+
+def halo_transfers(
+    bounds: NDArray,
+    rank: int,
+    whalo: int,
+    ehalo: int,
+    shalo: int,
+    nhalo: int,
+    xcyclic: bool = False,
+    ycyclic: bool = False,
+) -> dict[int, tuple[list, list]]:
+    extents = [tuple(int(b) for b in pe_bounds) for pe_bounds in bounds]
+    nx = max(b[1] for b in extents) - min(b[0] for b in extents) + 1
+    ny = max(b[3] for b in extents) - min(b[2] for b in extents) + 1
+    xshifts = (0, -nx, nx) if xcyclic else (0,)
+    yshifts = (0, -ny, ny) if ycyclic else (0,)
+    shifts = [(sx, sy) for sy in yshifts for sx in xshifts]
+
+    def extended(b: tuple) -> tuple:
+        return (b[0] - whalo, b[1] + ehalo, b[2] - shalo, b[3] + nhalo)
+
+    own = extents[rank]
+    transfers: dict[int, tuple[list, list]] = {}
+    for peer, peer_bounds in enumerate(extents):
+        recv, send = [], []
+        for sx, sy in shifts:
+            if peer == rank and (sx, sy) == (0, 0):
+                continue
+            shifted_peer = (
+                peer_bounds[0] + sx,
+                peer_bounds[1] + sx,
+                peer_bounds[2] + sy,
+                peer_bounds[3] + sy,
+            )
+            region = _intersect(extended(own), shifted_peer)
+            if region is not None:
+                recv.append(region)
+            shifted_own = (own[0] + sx, own[1] + sx, own[2] + sy, own[3] + sy)
+            region = _intersect(extended(peer_bounds), shifted_own)
+            if region is not None:
+                send.append(
+                    (region[0] - sx, region[1] - sx, region[2] - sy, region[3] - sy)
+                )
+        if recv or send:
+            transfers[peer] = (recv, send)
+    return transfers
+
+
+class pyHaloExchange:
+    """
+    Persistent halo exchange plan of a pyDomain, see the module docstring.
+    Creating and freeing a plan is collective over comm, MPI.COMM_WORLD by
+    default, which must hold the PEs of the domain in order.
+    """
+
+    def __init__(
+        self,
+        domain: pyDomain,
+        field_shape: tuple[int, ...],
+        dtype: DTypeLike = np.float64,
+        position: Optional[int] = None,
+        whalo: Optional[int] = None,
+        ehalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        nhalo: Optional[int] = None,
+        comm=None,
+    ):
+        from mpi4py import MPI
+
+        if domain.is_mosaic or domain.maskmap is not None:
+            raise ValueError("pyHaloExchange does not support mosaic or masked domains")
+        if (
+            domain.symmetry
+            and position is not None
+            and position != pyFMS_mpp_domains.CENTER
+        ):
+            raise ValueError(
+                "pyHaloExchange only supports CENTER fields on symmetric domains"
+            )
+
+        geometry = domain.geometry(position)
+        self.field_shape = tuple(int(n) for n in field_shape)
+        self.dtype = np.dtype(dtype)
+        if self.field_shape[:2] != geometry.data_shape:
+            raise ValueError(
+                f"field shape {self.field_shape} does not match the data domain "
+                f"{geometry.data_shape}"
+            )
+
+        self.whalo = geometry.isc - geometry.isd if whalo is None else whalo
+        self.ehalo = geometry.ied - geometry.iec if ehalo is None else ehalo
+        self.shalo = geometry.jsc - geometry.jsd if shalo is None else shalo
+        self.nhalo = geometry.jed - geometry.jec if nhalo is None else nhalo
+
+        comm = MPI.COMM_WORLD if comm is None else comm
+        self.comm = comm.Dup()
+        rank = self.comm.Get_rank()
+
+        own = np.array(
+            [geometry.isc, geometry.iec, geometry.jsc, geometry.jec], dtype=np.int64
+        )
+        bounds = np.empty((self.comm.Get_size(), 4), dtype=np.int64)
+        self.comm.Allgather(own, bounds)
+
+        cyclic = pyFMS_mpp_domains.CYCLIC_GLOBAL_DOMAIN
+        transfers = halo_transfers(
+            bounds,
+            rank,
+            self.whalo,
+            self.ehalo,
+            self.shalo,
+            self.nhalo,
+            xcyclic=bool((domain.xflags or 0) & cyclic),
+            ycyclic=bool((domain.yflags or 0) & cyclic),
+        )
+
+        def local(region: tuple) -> tuple[slice, slice]:
+            return np.s_[
+                region[0] - geometry.isd : region[1] - geometry.isd + 1,
+                region[2] - geometry.jsd : region[3] - geometry.jsd + 1,
+            ]
+
+        def size(region: tuple) -> int:
+            return (region[1] - region[0] + 1) * (region[3] - region[2] + 1)
+
+        # points per horizontal index, from the trailing dimensions
+        self._depth = int(np.prod(self.field_shape[2:], dtype=np.int64))
+
+        self._copies = []
+        self._sends: list[tuple[tuple[slice, slice], int, int]] = []
+        self._recvs: list[tuple[tuple[slice, slice], int, int]] = []
+        send_segments, recv_segments = [], []
+        nsend = nrecv = 0
+        for peer, (recv, send) in sorted(transfers.items()):
+            if peer == rank:
+                self._copies = [
+                    (local(r), local(s)) for r, s in zip(recv, send, strict=True)
+                ]
+                continue
+            start = nsend
+            for region in send:
+                count = size(region) * self._depth
+                self._sends.append((local(region), nsend, nsend + count))
+                nsend += count
+            if nsend > start:
+                send_segments.append((peer, start, nsend))
+            start = nrecv
+            for region in recv:
+                count = size(region) * self._depth
+                self._recvs.append((local(region), nrecv, nrecv + count))
+                nrecv += count
+            if nrecv > start:
+                recv_segments.append((peer, start, nrecv))
+
+        self._send_buffer = np.empty(nsend, dtype=self.dtype)
+        self._recv_buffer = np.empty(nrecv, dtype=self.dtype)
+        self._send_requests = [
+            self.comm.Send_init(self._send_buffer[a:b], dest=peer, tag=0)
+            for peer, a, b in send_segments
+        ]
+        self._recv_requests = [
+            self.comm.Recv_init(self._recv_buffer[a:b], source=peer, tag=0)
+            for peer, a, b in recv_segments
+        ]
+        self._requests = self._recv_requests + self._send_requests
+        self._MPI = MPI
+        self._field: Optional[NDArray] = None
+
+    @property
+    def peers(self) -> int:
+        return len(self._send_requests)
+
+    def _check(self, field: NDArray):
+        if field.shape != self.field_shape or field.dtype != self.dtype:
+            raise ValueError(
+                f"plan is for {self.dtype} fields of shape {self.field_shape}, got "
+                f"{field.dtype} of shape {field.shape}"
+            )
+
+    """
+    Subroutine: start
+
+    Packs the send buffer from field and starts the exchange. field must
+    not be modified until wait has returned.
+    """
+
+    def start(self, field: NDArray):
+        self._check(field)
+        if self._field is not None:
+            raise RuntimeError("the previous exchange of this plan has not completed")
+        self._field = field
+        self._MPI.Prequest.Startall(self._recv_requests)
+        for region, a, b in self._sends:
+            self._send_buffer[a:b] = field[region].reshape(-1)
+        self._MPI.Prequest.Startall(self._send_requests)
+        for recv_region, send_region in self._copies:
+            field[recv_region] = field[send_region]
+
+    """
+    Subroutine: wait
+
+    Completes the exchange started by start and unpacks the halos into the
+    field
+    """
+
+    def wait(self):
+        if self._field is None:
+            raise RuntimeError("no exchange of this plan has been started")
+        field, self._field = self._field, None
+        self._MPI.Prequest.Waitall(self._requests)
+        for region, a, b in self._recvs:
+            field[region] = self._recv_buffer[a:b].reshape(field[region].shape)
+
+    """
+    Subroutine: exchange
+
+    Updates the halos of field, start followed by wait
+    """
+
+    def exchange(self, field: NDArray):
+        self.start(field)
+        self.wait()
+
+    """
+    Subroutine: free
+
+    Frees the persistent requests and the communicator of the plan
+    """
+
+    def free(self):
+        for request in self._requests:
+            request.Free()
+        self._requests = self._send_requests = self._recv_requests = []
+        self.comm.Free()
@@ -0,0 +1,345 @@
+from typing import Literal, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .py_gather import pyGatherPlan
+from .py_mpp_domains import pyDomain
+
+
+"""
+This module writes fields of a pyDomain to netCDF per I/O domain, as the
+distributed restart files of FMS.
+
+The I/O layout [iox, ioy] groups the divisions of the domain layout into
+iox * ioy I/O domains, as define_io_domain does. Each I/O domain gathers
+its fields to its first PE over its own communicator, with a pyGatherPlan,
+and writes one file, path.0000, path.0001, ..., so the files are written in
+parallel and no data passes through a single rank. The files carry the
+domain_decomposition attributes of FMS on their axes and the
+NumFilesInSet global attribute, so that combine, or mppnccombine, merges
+them into a single file.
+
+Where h5py is built with MPI, write with collective set writes a single
+file from all PEs through the mpio driver of HDF5 instead.
+
+Arrays are indexed (x, y[, z]) and stored (z, y, x) in the files, with the
+axes xaxis_1, yaxis_1 and zaxis_1, zaxis_2, ... per distinct vertical size.
+"""
+
+
+# the netCDF backends of xarray that write files
+NetCDFEngine = Literal["netcdf4", "scipy", "h5netcdf"]
+
+
+"""
+Function: io_filename
+
+Returns: The file of I/O domain index of the set written to path
+"""
+
+
+def io_filename(path: str, index: int) -> str:
+    return f"{path}.{index:04d}"
+
+
+"""
+Function: mpi_hdf5_available
+
+Returns: True if h5py is built with MPI, so that files can be written
+collectively
+"""
+
+
+def mpi_hdf5_available() -> bool:
+    try:
+        import h5py
+    except ImportError:
+        return False
+    return bool(h5py.get_config().mpi)
+
+
+def _axes(trailing_shapes: list[tuple[int, ...]]) -> dict[int, str]:
+    # a vertical axis per distinct size, in order of appearance
+    names: dict[int, str] = {}
+    for shape in trailing_shapes:
+        for n in shape:
+            if n not in names:
+                names[n] = f"zaxis_{len(names) + 1}"
+    return names
+
+
+class pyIODomainWriter:
+    """
+    Writer of the fields of domain per I/O domain of io_layout, see the
+    module docstring. With define set the I/O domain is also defined in
+    FMS through define_io_domain. Creating a writer is collective over comm,
+    MPI.COMM_WORLD by default, which must hold the PEs of the domain in
+    order.
+    """
+
+    def __init__(
+        self,
+        domain: pyDomain,
+        io_layout: list[int],
+        position: Optional[int] = None,
+        comm=None,
+        define: bool = True,
+    ):
+        from mpi4py import MPI
+
+        if domain.is_mosaic:
+            raise ValueError("pyIODomainWriter does not support mosaic domains")
+
+        self.domain = domain
+        self.io_layout = list(io_layout)
+        self.position = position
+        if define:
+            domain.mpp_domains_obj.define_io_domain(
+                io_layout=self.io_layout, domain_id=domain.domain_id
+            )
+
+        geometry = domain.geometry(position)
+        self.geometry = geometry
+        self.global_shape = (
+            geometry.ieg - geometry.isg + 1,
+            geometry.jeg - geometry.jsg + 1,
+        )
+        self.comm = MPI.COMM_WORLD if comm is None else comm
+        rank = self.comm.Get_rank()
+
+        own = np.array(
+            [geometry.isc, geometry.iec, geometry.jsc, geometry.jec], dtype=np.int64
+        )
+        bounds = np.empty((self.comm.Get_size(), 4), dtype=np.int64)
+        self.comm.Allgather(own, bounds)
+        bounds[:, 0:2] -= bounds[:, 0].min()
+        bounds[:, 2:4] -= bounds[:, 2].min()
+        self.bounds = bounds
+
+        # the division of every PE along x and y from the starts of the
+        # compute domains
+        xstarts, ystarts = np.unique(bounds[:, 0]), np.unique(bounds[:, 2])
+        iox, ioy = self.io_layout
+        if len(xstarts) % iox or len(ystarts) % ioy:
+            raise ValueError(
+                f"io_layout {self.io_layout} does not divide the layout "
+                f"[{len(xstarts)}, {len(ystarts)}]"
+            )
+        xdivision = np.searchsorted(xstarts, bounds[:, 0]) // (len(xstarts) // iox)
+        ydivision = np.searchsorted(ystarts, bounds[:, 2]) // (len(ystarts) // ioy)
+        io_index = ydivision * iox + xdivision
+
+        self.nfiles = iox * ioy
+        self.io_index = int(io_index[rank])
+        members = io_index == self.io_index
+        # inclusive global bounds of the I/O domain of this PE
+        self.io_bounds = (
+            int(bounds[members, 0].min()),
+            int(bounds[members, 1].max()),
+            int(bounds[members, 2].min()),
+            int(bounds[members, 3].max()),
+        )
+        self.io_comm = self.comm.Split(color=self.io_index, key=rank)
+        self.is_io_root = self.io_comm.Get_rank() == 0
+        self._plans: dict[tuple, pyGatherPlan] = {}
+
+    def _plan(self, field: NDArray) -> pyGatherPlan:
+        key = (field.dtype.str, field.shape[2:])
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = pyGatherPlan(
+                self.domain,
+                dtype=field.dtype,
+                trailing_shape=field.shape[2:],
+                position=self.position,
+                root=0,
+                comm=self.io_comm,
+                subdomain=True,
+            )
+            self._plans[key] = plan
+        return plan
+
+    def _axis_attributes(self, axis: int) -> dict:
+        # 1-based global and I/O domain bounds, as written by FMS
+        start, end = self.io_bounds[2 * axis], self.io_bounds[2 * axis + 1]
+        return dict(
+            domain_decomposition=np.array(
+                [1, self.global_shape[axis], start + 1, end + 1], dtype=np.int32
+            ),
+            cartesian_axis="XY"[axis],
+        )
+
+    """
+    Function: write
+
+    Writes fields, a dictionary of data or compute domain shaped arrays by
+    variable name, to io_filename(path, io_index) of every I/O domain, or
+    to path itself from all PEs with collective set. attributes are added
+    to the file, chunks, in (x, y[, z]) order, sets the chunk shape of the
+    variables, the whole I/O domain by default. engine is the xarray
+    backend of the files. Collective over comm.
+
+    Returns: The file written by this PE, None on PEs that do not write
+    """
+
+    def write(
+        self,
+        path: str,
+        fields: dict[str, NDArray],
+        attributes: Optional[dict] = None,
+        chunks: Optional[tuple[int, ...]] = None,
+        collective: bool = False,
+        engine: Optional[NetCDFEngine] = "h5netcdf",
+    ) -> Optional[str]:
+        if collective:
+            return self._write_collective(path, fields, attributes)
+
+        gathered = {
+            name: self._plan(field).gather(field) for name, field in fields.items()
+        }
+        if not self.is_io_root:
+            return None
+
+        import xarray as xr
+
+        x0, x1, y0, y1 = self.io_bounds
+        zaxes = _axes([field.shape[2:] for field in gathered.values()])
+        coords = {
+            "xaxis_1": (
+                "xaxis_1",
+                np.arange(x0, x1 + 1) + 1.0,
+                self._axis_attributes(0),
+            ),
+            "yaxis_1": (
+                "yaxis_1",
+                np.arange(y0, y1 + 1) + 1.0,
+                self._axis_attributes(1),
+            ),
+        }
+        for n, name in zaxes.items():
+            coords[name] = (name, np.arange(n) + 1.0, dict(cartesian_axis="Z"))
+
+        variables = {}
+        encoding = {}
+        for name, field in gathered.items():
+            dims = tuple(zaxes[n] for n in field.shape[:1:-1]) + ("yaxis_1", "xaxis_1")
+            variables[name] = (dims, field.T)
+            shape = field.T.shape
+            if chunks is not None:
+                shape = tuple(min(c, n) for c, n in zip(chunks[::-1], shape))
+            encoding[name] = dict(chunksizes=shape)
+
+        dataset = xr.Dataset(variables, coords=coords, attrs=dict(attributes or {}))
+        dataset.attrs["NumFilesInSet"] = np.int32(self.nfiles)
+        filename = io_filename(path, self.io_index)
+        dataset.to_netcdf(filename, engine=engine, encoding=encoding)
+        return filename
+
+    def _write_collective(
+        self, path: str, fields: dict[str, NDArray], attributes: Optional[dict]
+    ) -> str:
+        if not mpi_hdf5_available():
+            raise RuntimeError("collective writes need h5py built with MPI")
+        import h5netcdf
+
+        nx, ny = self.global_shape
+        rank = self.comm.Get_rank()
+        x0, x1, y0, y1 = (int(b) for b in self.bounds[rank])
+        computes = {}
+        for name, field in fields.items():
+            if field.shape[:2] == self.geometry.data_shape:
+                field = field[self.geometry.compute_slice]
+            computes[name] = field
+        zaxes = _axes([field.shape[2:] for field in computes.values()])
+
+        with h5netcdf.File(path, "w", driver="mpio", comm=self.comm) as file:
+            file.attrs.update(dict(attributes or {}))
+            file.dimensions.update({"xaxis_1": nx, "yaxis_1": ny})
+            file.dimensions.update({name: n for n, name in zaxes.items()})
+            for name, field in computes.items():
+                dims = tuple(zaxes[n] for n in field.shape[:1:-1])
+                variable = file.create_variable(
+                    name, dims + ("yaxis_1", "xaxis_1"), dtype=field.dtype
+                )
+                # every PE writes its compute domain, stored (z, y, x)
+                variable[..., y0 : y1 + 1, x0 : x1 + 1] = field.T
+        return path
+
+
+"""
+Function: combine
+
+Combines the files of the set written to path by pyIODomainWriter.write, or
+by FMS, into output, path by default, with the xarray backend engine. The
+domain_decomposition attributes of the axes place every file in the global
+domain. Variables without decomposed axes must be the same in all files.
+Runs on a single PE.
+
+Returns: The combined file
+"""
+
+
+def combine(
+    path: str, output: Optional[str] = None, engine: Optional[NetCDFEngine] = "h5netcdf"
+) -> str:
+    import xarray as xr
+
+    output = path if output is None else output
+    with xr.open_dataset(io_filename(path, 0), engine=engine) as first:
+        nfiles = int(first.attrs["NumFilesInSet"])
+        attributes = {
+            key: value for key, value in first.attrs.items() if key != "NumFilesInSet"
+        }
+
+    variables: dict = {}
+    coords: dict = {}
+    for index in range(nfiles):
+        with xr.open_dataset(
+            io_filename(path, index), engine=engine, decode_cf=False
+        ) as dataset:
+            decomposition = {
+                dim: dataset[dim].attrs["domain_decomposition"]
+                for dim in dataset.dims
+                if dim in dataset.variables
+                and "domain_decomposition" in dataset[dim].attrs
+            }
+            for dim, (_, size, _, _) in decomposition.items():
+                if dim not in coords:
+                    coords[dim] = (
+                        dim,
+                        np.arange(int(size)) + 1.0,
+                        dict(
+                            cartesian_axis=dataset[dim].attrs.get("cartesian_axis", "")
+                        ),
+                    )
+            for dim in dataset.dims:
+                if dim not in decomposition and dim not in coords and dim in dataset:
+                    coords[dim] = (dim, dataset[dim].values, dict(dataset[dim].attrs))
+            for name, variable in dataset.data_vars.items():
+                if name not in variables:
+                    shape = tuple(
+                        int(decomposition[dim][1]) if dim in decomposition else n
+                        for dim, n in zip(variable.dims, variable.shape)
+                    )
+                    variables[name] = (
+                        variable.dims,
+                        np.zeros(shape, dtype=variable.dtype),
+                        dict(variable.attrs),
+                    )
+                region = tuple(
+                    (
+                        slice(
+                            int(decomposition[dim][2]) - 1, int(decomposition[dim][3])
+                        )
+                        if dim in decomposition
+                        else slice(None)
+                    )
+                    for dim in variable.dims
+                )
+                variables[name][1][region] = variable.values
+
+    xr.Dataset(variables, coords=coords, attrs=attributes).to_netcdf(
+        output, engine=engine
+    )
+    return output
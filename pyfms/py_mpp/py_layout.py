@@ -0,0 +1,723 @@
+import time
+from typing import Optional, Union
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain, pyFMS_mpp_domains
+
+
+"""
+This module searches domain decompositions for a layout that minimizes a
+model of the cost of a timestep on the slowest PE.
+
+define_layout returns the FMS factorization of ndivs, which only looks at
+the global extents. rank_layouts instead evaluates every factorization
+lx * ly == ndivs with
+
+    cost = message_cost * messages
+           + halo_cost * halo points * nz
+           + compute_cost * compute points * nz
+
+per PE, where messages is the number of distinct neighbor PEs a halo update
+exchanges with and halo points the number of points received, including
+the corners and the wraps of cyclic edges. The cost of a layout is the cost
+of its slowest PE. The default coefficients are rough estimates in seconds
+and only their ratios matter for the ranking.
+
+Besides the evenly split extents, the extents of each factorization are
+refined by moving points from the slowest to the fastest division while the
+cost drops. On non-cyclic edges the outer PEs exchange fewer halos and are
+given more points. benchmark_layouts times update_domains for the best
+candidates on the actual machine.
+
+weighted_extents balances a per-column cost instead of the point count,
+e.g. measured physics timings or a land fraction, for a given layout.
+
+mask_layouts drops the divisions without a single active point of a land
+or ocean mask, read e.g. with read_mask, and sets the maskmap of
+define_domains, so that fewer PEs run the same layout.
+"""
+
+
+"""
+Function: balanced_extents
+
+Returns: The extents of n points split into ndivs divisions, differing by
+at most one point
+"""
+
+
+def balanced_extents(n: int, ndivs: int) -> NDArray:
+    extents = np.full(ndivs, n // ndivs, dtype=np.int32)
+    extents[: n % ndivs] += 1
+    return extents
+
+
+"""
+Function: factor_layouts
+
+Returns: All layouts [lx, ly] with lx * ly == ndivs
+"""
+
+
+def factor_layouts(ndivs: int) -> list[list[int]]:
+    return [[lx, ndivs // lx] for lx in range(1, ndivs + 1) if ndivs % lx == 0]
+
+
+class pyLayoutCandidate:
+    """
+    A decomposition ranked by rank_layouts or mask_layouts. cost is the
+    modeled cost of the slowest PE, measured the time of an update_domains
+    call set by benchmark_layouts. maskmap, indexed [x division, y division],
+    marks the divisions that are assigned a PE.
+    """
+
+    __slots__ = (
+        "global_indices",
+        "layout",
+        "xextent",
+        "yextent",
+        "cost",
+        "max_messages",
+        "max_halo_points",
+        "max_compute_points",
+        "imbalance",
+        "maskmap",
+        "measured",
+    )
+
+    def __init__(
+        self,
+        global_indices: list[int],
+        xextent: NDArray,
+        yextent: NDArray,
+        cost: float,
+        max_messages: int,
+        max_halo_points: int,
+        max_compute_points: int,
+        imbalance: float,
+        maskmap: Optional[NDArray[np.bool_]] = None,
+    ):
+        self.global_indices = list(global_indices)
+        self.layout = [len(xextent), len(yextent)]
+        self.xextent = xextent
+        self.yextent = yextent
+        self.cost = cost
+        self.max_messages = max_messages
+        self.max_halo_points = max_halo_points
+        self.max_compute_points = max_compute_points
+        self.imbalance = imbalance
+        self.maskmap = maskmap
+        self.measured: Optional[float] = None
+
+    @property
+    def npes(self) -> int:
+        if self.maskmap is None:
+            return self.layout[0] * self.layout[1]
+        return int(self.maskmap.sum())
+
+    def __repr__(self) -> str:
+        return (
+            f"pyLayoutCandidate(layout={self.layout}, npes={self.npes}, "
+            f"xextent={self.xextent.tolist()}, yextent={self.yextent.tolist()}, "
+            f"cost={self.cost:.3e}, measured={self.measured})"
+        )
+
+    """
+    Function: domain_arguments
+
+    Returns: The global_indices, layout, xextent and yextent arguments of
+    define_domains and pyDomain for this candidate, and maskmap if PEs are
+    masked out
+    """
+
+    def domain_arguments(self) -> dict:
+        arguments = dict(
+            global_indices=self.global_indices,
+            layout=self.layout,
+            xextent=self.xextent,
+            yextent=self.yextent,
+        )
+        if self.maskmap is not None:
+            arguments["maskmap"] = self.maskmap
+        return arguments
+
+
+def _neighbor_ids(
+    lx: int, ly: int, xcyclic: bool, ycyclic: bool
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+    # existence of the west, east, south and north neighbors per division
+    has_w = np.arange(lx) > 0 if not xcyclic else np.ones(lx, dtype=bool)
+    has_e = np.arange(lx) < lx - 1 if not xcyclic else np.ones(lx, dtype=bool)
+    has_s = np.arange(ly) > 0 if not ycyclic else np.ones(ly, dtype=bool)
+    has_n = np.arange(ly) < ly - 1 if not ycyclic else np.ones(ly, dtype=bool)
+
+    i = np.arange(lx)[None, :]
+    j = np.arange(ly)[:, None]
+    own = j * lx + i
+    ids = []
+    for dy, ys in ((-1, has_s), (0, None), (1, has_n)):
+        for dx, xs in ((-1, has_w), (0, None), (1, has_e)):
+            if dx == 0 and dy == 0:
+                continue
+            exists = np.ones((ly, lx), dtype=bool)
+            if xs is not None:
+                exists &= xs[None, :]
+            if ys is not None:
+                exists &= ys[:, None]
+            peer = ((j + dy) % ly) * lx + (i + dx) % lx
+            ids.append(np.where(exists & (peer != own), peer, -1))
+    return np.stack(ids), has_w, has_e, has_s, has_n
+
+
+def _pe_costs(
+    xextent: NDArray,
+    yextent: NDArray,
+    halos: tuple[int, int, int, int],
+    xcyclic: bool,
+    ycyclic: bool,
+) -> tuple[NDArray, NDArray, NDArray]:
+    whalo, ehalo, shalo, nhalo = halos
+    ids, has_w, has_e, has_s, has_n = _neighbor_ids(
+        len(xextent), len(yextent), xcyclic, ycyclic
+    )
+
+    # distinct neighbor PEs, the peers sorted with missing ones as -1
+    ids = np.sort(ids, axis=0)
+    distinct = (ids[0] >= 0).astype(np.int64)
+    distinct += np.sum((ids[1:] >= 0) & (ids[1:] != ids[:-1]), axis=0)
+
+    nx = np.asarray(xextent, dtype=np.int64)[None, :]
+    ny = np.asarray(yextent, dtype=np.int64)[:, None]
+    xh = whalo * has_w + ehalo * has_e
+    yh = shalo * has_s + nhalo * has_n
+    corners = xh[None, :] * yh[:, None]
+    halo_points = xh[None, :] * ny + yh[:, None] * nx + corners
+    compute_points = nx * ny
+    return distinct, halo_points, compute_points
+
+
+def _model(
+    xextent: NDArray,
+    yextent: NDArray,
+    halos: tuple[int, int, int, int],
+    xcyclic: bool,
+    ycyclic: bool,
+    nz: int,
+    coefficients: tuple[float, float, float],
+) -> NDArray:
+    message_cost, halo_cost, compute_cost = coefficients
+    messages, halo_points, compute_points = _pe_costs(
+        xextent, yextent, halos, xcyclic, ycyclic
+    )
+    return (
+        message_cost * messages
+        + halo_cost * nz * halo_points
+        + compute_cost * nz * compute_points
+    )
+
+
+"""
+Function: layout_cost
+
+Returns: The modeled cost of the slowest PE of the decomposition with
+xextent and yextent, see the module docstring
+"""
+
+
+def layout_cost(
+    xextent: NDArray,
+    yextent: NDArray,
+    whalo: int = 1,
+    ehalo: int = 1,
+    shalo: int = 1,
+    nhalo: int = 1,
+    xcyclic: bool = False,
+    ycyclic: bool = False,
+    nz: int = 1,
+    message_cost: float = 5.0e-6,
+    halo_cost: float = 2.0e-9,
+    compute_cost: float = 1.0e-8,
+) -> float:
+    coefficients = (message_cost, halo_cost, compute_cost)
+    return float(
+        _model(
+            xextent,
+            yextent,
+            (whalo, ehalo, shalo, nhalo),
+            xcyclic,
+            ycyclic,
+            nz,
+            coefficients,
+        ).max()
+    )
+
+
+def _refine(extents: list[NDArray], axis: int, cost, minimum: int):
+    # moves single points from the slowest division of axis, by the slowest
+    # PE in it, to the fastest one while the division costs, sorted from the
+    # slowest, decrease. Ties between several slowest divisions are resolved
+    # one move at a time.
+    def division_costs(candidate):
+        per_division = cost(*candidate, per_pe=True).max(axis=axis)
+        return per_division, sorted(per_division.tolist(), reverse=True)
+
+    per_division, best = division_costs(extents)
+    for _ in range(int(extents[axis].sum())):
+        slowest, fastest = int(np.argmax(per_division)), int(np.argmin(per_division))
+        if slowest == fastest or extents[axis][slowest] <= minimum:
+            break
+        candidate = list(extents)
+        candidate[axis] = extents[axis].copy()
+        candidate[axis][slowest] -= 1
+        candidate[axis][fastest] += 1
+        trial_division, trial = division_costs(candidate)
+        if trial >= best:
+            break
+        extents[axis], per_division, best = candidate[axis], trial_division, trial
+
+
+"""
+Function: rank_layouts
+
+Ranks the decompositions of the domain with global_indices over ndivs PEs
+by the cost model of the module docstring. xflags and yflags are the flags
+passed to define_domains. Layouts with a division smaller than the halo
+are skipped. uneven refines the extents of each layout.
+
+Returns: The candidates, cheapest first, at most top of them if top is set
+"""
+
+
+def rank_layouts(
+    global_indices: list[int],
+    ndivs: int,
+    whalo: int = 1,
+    ehalo: int = 1,
+    shalo: int = 1,
+    nhalo: int = 1,
+    xflags: Optional[int] = None,
+    yflags: Optional[int] = None,
+    nz: int = 1,
+    message_cost: float = 5.0e-6,
+    halo_cost: float = 2.0e-9,
+    compute_cost: float = 1.0e-8,
+    uneven: bool = True,
+    top: Optional[int] = None,
+) -> list[pyLayoutCandidate]:
+    nx = global_indices[1] - global_indices[0] + 1
+    ny = global_indices[3] - global_indices[2] + 1
+    cyclic = pyFMS_mpp_domains.CYCLIC_GLOBAL_DOMAIN
+    xcyclic = bool((xflags or 0) & cyclic)
+    ycyclic = bool((yflags or 0) & cyclic)
+    halos = (whalo, ehalo, shalo, nhalo)
+    xminimum = max(whalo, ehalo, 1)
+    yminimum = max(shalo, nhalo, 1)
+
+    coefficients = (message_cost, halo_cost, compute_cost)
+
+    def cost(xextent, yextent, per_pe=False):
+        pe_cost = _model(xextent, yextent, halos, xcyclic, ycyclic, nz, coefficients)
+        return pe_cost if per_pe else float(pe_cost.max())
+
+    candidates = []
+    for lx, ly in factor_layouts(ndivs):
+        if nx // lx < xminimum or ny // ly < yminimum:
+            continue
+        extents = [balanced_extents(nx, lx), balanced_extents(ny, ly)]
+        if uneven:
+            for axis in (0, 1, 0):
+                _refine(extents, axis, cost, (xminimum, yminimum)[axis])
+        xextent, yextent = extents
+        messages, halo_points, compute_points = _pe_costs(
+            xextent, yextent, halos, xcyclic, ycyclic
+        )
+        candidates.append(
+            pyLayoutCandidate(
+                global_indices,
+                xextent,
+                yextent,
+                cost=cost(xextent, yextent),
+                max_messages=int(messages.max()),
+                max_halo_points=int(halo_points.max()),
+                max_compute_points=int(compute_points.max()),
+                imbalance=float(compute_points.max() / compute_points.mean()),
+            )
+        )
+
+    candidates.sort(key=lambda candidate: candidate.cost)
+    return candidates if top is None else candidates[:top]
+
+
+"""
+Function: benchmark_layouts
+
+Times update_domains for each candidate on the PEs of comm,
+MPI.COMM_WORLD by default, which must be the PEs of the layouts. A domain is
+defined per candidate with the ids domain_id, domain_id + 1, ..., which
+pyFMS must have been initialized with room for. The time of a candidate is
+the mean over nrepeat updates of a field with nz levels, the maximum over
+the PEs, and is stored in candidate.measured. Collective over comm.
+
+Returns: The candidates sorted by the measured time
+"""
+
+
+def benchmark_layouts(
+    mpp_domains: pyFMS_mpp_domains,
+    candidates: list[pyLayoutCandidate],
+    domain_id: int = 0,
+    whalo: int = 1,
+    ehalo: int = 1,
+    shalo: int = 1,
+    nhalo: int = 1,
+    xflags: Optional[int] = None,
+    yflags: Optional[int] = None,
+    nz: int = 1,
+    nrepeat: int = 10,
+    dtype: DTypeLike = np.float64,
+    comm=None,
+) -> list[pyLayoutCandidate]:
+    from mpi4py import MPI
+
+    comm = MPI.COMM_WORLD if comm is None else comm
+    for offset, candidate in enumerate(candidates):
+        domain = pyDomain(
+            mpp_domains_obj=mpp_domains,
+            domain_id=domain_id + offset,
+            xflags=xflags,
+            yflags=yflags,
+            **candidate.domain_arguments(),
+            whalo=whalo,
+            ehalo=ehalo,
+            shalo=shalo,
+            nhalo=nhalo,
+        )
+        shape = domain.geometry().data_shape
+        field = np.zeros(shape if nz == 1 else shape + (nz,), dtype=dtype)
+
+        # the first update sets up the communication of FMS
+        mpp_domains.update_domains(
+            field,
+            domain_id=domain.domain_id,
+            whalo=whalo,
+            ehalo=ehalo,
+            shalo=shalo,
+            nhalo=nhalo,
+        )
+        comm.Barrier()
+        start = time.perf_counter()
+        for _ in range(nrepeat):
+            mpp_domains.update_domains(
+                field,
+                domain_id=domain.domain_id,
+                whalo=whalo,
+                ehalo=ehalo,
+                shalo=shalo,
+                nhalo=nhalo,
+            )
+        elapsed = (time.perf_counter() - start) / nrepeat
+        candidate.measured = comm.allreduce(elapsed, op=MPI.MAX)
+
+    return sorted(candidates, key=lambda candidate: candidate.measured)
+
+
+def _prefix_sums(cost: NDArray) -> NDArray:
+    # 2D inclusive prefix sums with a leading row and column of zeros
+    sums = np.zeros((cost.shape[0] + 1, cost.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(cost, axis=0, dtype=np.float64), axis=1, out=sums[1:, 1:])
+    return sums
+
+
+def _prefix_rows(groups: NDArray) -> NDArray:
+    # prefix sums along the first axis with a leading row of zeros
+    prefix = np.zeros((groups.shape[0] + 1, groups.shape[1]), dtype=np.float64)
+    np.cumsum(groups, axis=0, out=prefix[1:])
+    return prefix
+
+
+def _cuts(extents: NDArray) -> NDArray:
+    return np.concatenate(([0], np.cumsum(extents, dtype=np.int64)))
+
+
+"""
+Function: block_costs
+
+Returns: The summed cost of each PE of the decomposition with xextent and
+yextent, indexed [x division, y division]. cost is indexed (x, y) over the
+global domain.
+"""
+
+
+def block_costs(cost: NDArray, xextent: NDArray, yextent: NDArray) -> NDArray:
+    sums = _prefix_sums(np.asarray(cost))
+    xcuts, ycuts = _cuts(xextent), _cuts(yextent)
+    corners = sums[np.ix_(xcuts, ycuts)]
+    return corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+
+
+def _partition(prefix: NDArray, ndivs: int, minimum: int, bottleneck: float):
+    # greedy cuts along the first axis of prefix, prefix[i, g] the cost of
+    # group g before position i, so that no segment of any group exceeds
+    # bottleneck. Returns None if ndivs segments do not suffice.
+    n = prefix.shape[0] - 1
+    start, extents = 0, []
+    for k in range(ndivs - 1):
+        end = min(
+            int(np.searchsorted(prefix[:, g], prefix[start, g] + bottleneck, "right"))
+            - 1
+            for g in range(prefix.shape[1])
+        )
+        end = min(max(end, start + minimum), n - minimum * (ndivs - k - 1))
+        if end < start + minimum:
+            return None
+        extents.append(end - start)
+        start = end
+    extents.append(n - start)
+    if extents[-1] < minimum or np.any(prefix[n] - prefix[start] > bottleneck):
+        return None
+    return extents
+
+
+def _balance(prefix: NDArray, ndivs: int, minimum: int) -> NDArray:
+    # smallest bottleneck by bisection, the extents of the last feasible one
+    low = float((prefix[-1] - prefix[0]).max()) / ndivs
+    high = float((prefix[-1] - prefix[0]).max())
+    best = _partition(prefix, ndivs, minimum, high * (1.0 + 1.0e-12))
+    if best is None:
+        return balanced_extents(prefix.shape[0] - 1, ndivs)
+    for _ in range(64):
+        bottleneck = 0.5 * (low + high)
+        extents = _partition(prefix, ndivs, minimum, bottleneck)
+        if extents is None:
+            low = bottleneck
+        else:
+            high, best = bottleneck, extents
+        if high - low <= 1.0e-9 * high:
+            break
+    return np.array(best, dtype=np.int32)
+
+
+"""
+Function: weighted_extents
+
+Computes the xextent and yextent of layout that balance cost, a
+non-negative cost per column of the global domain indexed (x, y), between
+the PEs. As FMS decompositions are rectilinear, the x and y extents are
+alternately recomputed for the other ones, with prefix sums and a bisection
+for the smallest maximum cost of a PE, and the best pair is kept. Every
+division has at least minimum points, e.g. the halo width.
+
+Returns: xextent and yextent as int32 arrays, to be passed on to pyDomain
+with layout
+"""
+
+
+def weighted_extents(
+    cost: NDArray,
+    layout: list[int],
+    minimum: int = 1,
+    niter: int = 8,
+) -> tuple[NDArray, NDArray]:
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2 or np.any(cost < 0):
+        raise ValueError("cost must be a non-negative 2D array indexed (x, y)")
+    nx, ny = cost.shape
+    lx, ly = layout
+    if nx < lx * minimum or ny < ly * minimum:
+        raise ValueError(
+            f"the cost array of shape {cost.shape} cannot be split into layout "
+            f"{layout} with at least {minimum} points per division"
+        )
+
+    # x extents for the cost summed over y to start with
+    xextent = _balance(_prefix_rows(cost.sum(axis=1)[:, None]), lx, minimum)
+    yextent = balanced_extents(ny, ly)
+    best = (np.inf, xextent, yextent)
+    for _ in range(niter):
+        # y extents for the x divisions, then x extents for the y divisions
+        xcuts = _cuts(xextent)
+        ygroups = np.add.reduceat(cost, xcuts[:-1], axis=0).T
+        yextent = _balance(_prefix_rows(ygroups), ly, minimum)
+        ycuts = _cuts(yextent)
+        xgroups = np.add.reduceat(cost, ycuts[:-1], axis=1)
+        xextent = _balance(_prefix_rows(xgroups), lx, minimum)
+        maximum = float(block_costs(cost, xextent, yextent).max())
+        if maximum >= best[0]:
+            break
+        best = (maximum, xextent, yextent)
+    return best[1], best[2]
+
+
+"""
+Function: read_mask
+
+Reads the 2D variable of a grid file, e.g. the mask of an ocean_mask.nc or
+land_mask.nc file, with xarray. The variable is stored (y, x) in the file.
+Points with a value above threshold are active, or those at most threshold
+with invert, e.g. to run an ocean model from a land fraction.
+
+Returns: The boolean mask of active points indexed (x, y)
+"""
+
+
+def read_mask(
+    path: str,
+    variable: str = "mask",
+    threshold: float = 0.5,
+    invert: bool = False,
+    engine: Optional[str] = None,
+) -> NDArray[np.bool_]:
+    import xarray as xr
+
+    with xr.open_dataset(path, engine=engine) as dataset:
+        values = dataset[variable].squeeze().values
+    if values.ndim != 2:
+        raise ValueError(
+            f"{variable} in {path} has shape {values.shape}, expected a 2D mask"
+        )
+    mask = values > threshold
+    if invert:
+        mask = ~mask
+    return np.ascontiguousarray(mask.T)
+
+
+"""
+Function: mask_maskmap
+
+Returns: The maskmap of the decomposition with xextent and yextent, True
+for the divisions holding at least one active point of mask
+"""
+
+
+def mask_maskmap(
+    mask: NDArray[np.bool_], xextent: NDArray, yextent: NDArray
+) -> NDArray[np.bool_]:
+    return block_costs(np.asarray(mask, dtype=np.float64), xextent, yextent) > 0
+
+
+"""
+Function: mask_layouts
+
+Evaluates the factorizations of each number of divisions in ndivs for the
+active points of mask, indexed (x, y) over the global domain. Divisions
+without active points are masked out, the candidate runs on
+candidate.npes PEs. The cost of a candidate is the largest number of active
+points of a PE. weighted balances the active points with weighted_extents,
+which may free fewer PEs than the even split.
+
+Returns: The candidates sorted by npes, then cost
+"""
+
+
+def mask_layouts(
+    mask: NDArray[np.bool_],
+    ndivs: Union[int, range, list[int]],
+    whalo: int = 1,
+    ehalo: int = 1,
+    shalo: int = 1,
+    nhalo: int = 1,
+    xflags: Optional[int] = None,
+    yflags: Optional[int] = None,
+    weighted: bool = False,
+) -> list[pyLayoutCandidate]:
+    mask = np.asarray(mask, dtype=bool)
+    nx, ny = mask.shape
+    cyclic = pyFMS_mpp_domains.CYCLIC_GLOBAL_DOMAIN
+    xcyclic = bool((xflags or 0) & cyclic)
+    ycyclic = bool((yflags or 0) & cyclic)
+    halos = (whalo, ehalo, shalo, nhalo)
+    xminimum = max(whalo, ehalo, 1)
+    yminimum = max(shalo, nhalo, 1)
+
+    candidates = []
+    for n in [ndivs] if isinstance(ndivs, int) else ndivs:
+        for lx, ly in factor_layouts(n):
+            if nx // lx < xminimum or ny // ly < yminimum:
+                continue
+            if weighted:
+                xextent, yextent = weighted_extents(
+                    mask, [lx, ly], minimum=min(xminimum, yminimum)
+                )
+            else:
+                xextent, yextent = balanced_extents(nx, lx), balanced_extents(ny, ly)
+            active = block_costs(mask.astype(np.float64), xextent, yextent)
+            maskmap = active > 0
+            if not maskmap.any():
+                continue
+            messages, halo_points, compute_points = _pe_costs(
+                xextent, yextent, halos, xcyclic, ycyclic
+            )
+            candidates.append(
+                pyLayoutCandidate(
+                    [0, nx - 1, 0, ny - 1],
+                    xextent,
+                    yextent,
+                    cost=float(active.max()),
+                    max_messages=int(messages.max()),
+                    max_halo_points=int(halo_points.max()),
+                    max_compute_points=int(compute_points.max()),
+                    imbalance=float(active.max() / active[maskmap].mean()),
+                    maskmap=maskmap,
+                )
+            )
+
+    candidates.sort(key=lambda candidate: (candidate.npes, candidate.cost))
+    return candidates
+
+
+"""
+Function: mask_layout
+
+Searches the layouts of npes up to max_ndivs divisions, 2 * npes by
+default, that run on exactly npes PEs once the divisions without active
+points of mask are masked out. The remaining arguments are passed on to
+mask_layouts.
+
+Returns: The candidate with the fewest active points on its slowest PE
+"""
+
+
+def mask_layout(
+    mask: NDArray[np.bool_],
+    npes: int,
+    max_ndivs: Optional[int] = None,
+    **kwargs,
+) -> pyLayoutCandidate:
+    max_ndivs = 2 * npes if max_ndivs is None else max_ndivs
+    candidates = [
+        candidate
+        for candidate in mask_layouts(mask, range(npes, max_ndivs + 1), **kwargs)
+        if candidate.npes == npes
+    ]
+    if not candidates:
+        raise ValueError(
+            f"no layout of {npes} to {max_ndivs} divisions masks out to {npes} PEs"
+        )
+    return min(candidates, key=lambda candidate: candidate.cost)
+
+
+"""
+Function: format_mask_layouts
+
+Returns: A text table of candidates from mask_layouts with the PEs freed by
+the maskmap of each
+"""
+
+
+def format_mask_layouts(candidates: list[pyLayoutCandidate]) -> str:
+    lines = [
+        f"{'npes':>6} {'layout':>10} {'ndivs':>6} {'freed':>6} {'freed %':>8} "
+        f"{'max points':>11} {'imbalance':>10}"
+    ]
+    for candidate in candidates:
+        ndivs = candidate.layout[0] * candidate.layout[1]
+        freed = ndivs - candidate.npes
+        layout = "x".join(str(n) for n in candidate.layout)
+        lines.append(
+            f"{candidate.npes:>6} {layout:>10} {ndivs:>6} {freed:>6} "
+            f"{100.0 * freed / ndivs:>8.1f} {int(candidate.cost):>11} "
+            f"{candidate.imbalance:>10.3f}"
+        )
+    return "\n".join(lines)
@@ -10,12 +10,15 @@ from ..pyfms_utils.data_handling import (
     setscalar_Cbool,
     setscalar_Cint32,
 )
+from ..pyfms_utils.function_registry import get_registry
+from ..pyfms_utils.library import get_library
 
 
 class pyFMS_mpp:
 
     def __init__(self, cFMS: ctypes.CDLL = None):
-        self.cFMS = cFMS
+        self.cFMS = cFMS if cFMS is not None else get_library()
+        self._registry = get_registry(self.cFMS) if self.cFMS is not None else None
 
     """
     Subroutine: declare_pelist
@@ -43,14 +46,13 @@ class pyFMS_mpp:
         name: Optional[str] = None,
         commID: Optional[int] = None,
     ) -> int | None:
-        _cfms_declare_pelist = self.cFMS.cFMS_declare_pelist
-
         pelist_p, pelist_t = setarray_Cint32(pelist)
         name_c, name_t = set_Cchar(name)
         commID_c, commID_t = setscalar_Cint32(commID)
 
-        _cfms_declare_pelist.argtypes = [pelist_t, name_t, commID_t]
-        _cfms_declare_pelist.restype = None
+        _cfms_declare_pelist = self._registry.get(
+            "cFMS_declare_pelist", argtypes=[pelist_t, name_t, commID_t], restype=None
+        )
 
         _cfms_declare_pelist(pelist_p, name_c, commID_c)
 
@@ -71,13 +73,12 @@ class pyFMS_mpp:
         if errormsg is not None:
             errormsg = errormsg[:128]
 
-        _cfms_error = self.cFMS.cFMS_error
-
         errortype_c, errortype_t = setscalar_Cint32(errortype)
         errormsg_c, errormsg_t = set_Cchar(errormsg)
 
-        _cfms_error.argtypes = [errortype_t, errormsg_t]
-        _cfms_error.restype = None
+        _cfms_error = self._registry.get(
+            "cFMS_error", argtypes=[errortype_t, errormsg_t], restype=None
+        )
 
         _cfms_error(errortype_c, errormsg_c)
 
@@ -101,14 +102,15 @@ class pyFMS_mpp:
         npes = ctypes.c_int.in_dll(self.cFMS, "cFMS_pelist_npes")
         pelist = np.empty(shape=npes.value, dtype=np.int32, order="C")
 
-        _cfms_get_current_pelist = self.cFMS.cFMS_get_current_pelist
-
         pelist_p, pelist_t = setarray_Cint32(pelist)
         name_c, name_t = set_Cchar(name)
         commID_c, commID_t = setscalar_Cint32(commID)
 
-        _cfms_get_current_pelist.argtypes = [pelist_t, name_t, commID_t]
-        _cfms_get_current_pelist.restype = None
+        _cfms_get_current_pelist = self._registry.get(
+            "cFMS_get_current_pelist",
+            argtypes=[pelist_t, name_t, commID_t],
+            restype=None,
+        )
 
         _cfms_get_current_pelist(pelist_p, name_c, commID_c)
 
@@ -128,9 +130,9 @@ class pyFMS_mpp:
     """
 
     def npes(self) -> int:
-        _cfms_npes = self.cFMS.cFMS_npes
-
-        _cfms_npes.restype = ctypes.c_int32
+        _cfms_npes = self._registry.get(
+            "cFMS_npes", argtypes=[], restype=ctypes.c_int32
+        )
 
         return _cfms_npes()
 
@@ -141,9 +143,7 @@ class pyFMS_mpp:
     """
 
     def pe(self) -> int:
-        _cfms_pe = self.cFMS.cFMS_pe
-
-        _cfms_pe.restype = ctypes.c_int32
+        _cfms_pe = self._registry.get("cFMS_pe", argtypes=[], restype=ctypes.c_int32)
 
         return _cfms_pe()
 
@@ -161,12 +161,11 @@ class pyFMS_mpp:
     def set_current_pelist(
         self, pelist: Optional[NDArray] = None, no_sync: Optional[bool] = None
     ):
-        _cfms_set_current_pelist = self.cFMS.cFMS_set_current_pelist
-
         pelist_p, pelist_t = setarray_Cint32(pelist)
         no_sync_c, no_sync_t = setscalar_Cbool(no_sync)
 
-        _cfms_set_current_pelist.argtypes = [pelist_t, no_sync_t]
-        _cfms_set_current_pelist.restype = None
+        _cfms_set_current_pelist = self._registry.get(
+            "cFMS_set_current_pelist", argtypes=[pelist_t, no_sync_t], restype=None
+        )
 
         _cfms_set_current_pelist(pelist_p, no_sync_c)
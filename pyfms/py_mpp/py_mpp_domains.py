@@ -1,10 +1,12 @@
 import ctypes
-from typing import Optional
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 
 from ..pyfms_utils.data_handling import (
+    check_array,
     set_Cchar,
     setarray_Cbool,
     setarray_Cdouble,
@@ -13,6 +15,15 @@ from ..pyfms_utils.data_handling import (
     setscalar_Cbool,
     setscalar_Cint32,
 )
+from ..pyfms_utils.executor import get_executor
+from ..pyfms_utils.function_registry import get_registry
+from ..pyfms_utils.library import get_library
+
+
+if TYPE_CHECKING:
+    from .py_gather import pyGatherPlan
+    from .py_halo_exchange import pyHaloExchange
+    from .py_reduction import pyGlobalReduction
 
 
 class pyDomainData:
@@ -43,9 +54,103 @@ class pyDomainData:
         self.tile_count = ctypes.c_int(tile_count)
 
 
+class pyDomainGeometry:
+    """
+    Index bounds of a domain for one staggering position as plain ints,
+    with the slice selecting the compute domain from a data domain array.
+    Arrays are indexed (x, y[, z]).
+    """
+
+    __slots__ = (
+        "position",
+        "isc",
+        "iec",
+        "jsc",
+        "jec",
+        "isd",
+        "ied",
+        "jsd",
+        "jed",
+        "isg",
+        "ieg",
+        "jsg",
+        "jeg",
+        "compute_slice",
+        "data_shape",
+        "compute_shape",
+    )
+
+    def __init__(
+        self,
+        position: int,
+        compute: tuple[int, int, int, int],
+        data: tuple[int, int, int, int],
+        global_: tuple[int, int, int, int],
+    ):
+        self.position = position
+        self.isc, self.iec, self.jsc, self.jec = compute
+        self.isd, self.ied, self.jsd, self.jed = data
+        self.isg, self.ieg, self.jsg, self.jeg = global_
+        self.compute_slice = np.s_[
+            self.isc - self.isd : self.iec - self.isd + 1,
+            self.jsc - self.jsd : self.jec - self.jsd + 1,
+        ]
+        self.data_shape = (self.ied - self.isd + 1, self.jed - self.jsd + 1)
+        self.compute_shape = (self.iec - self.isc + 1, self.jec - self.jsc + 1)
+
+    def __repr__(self):
+        return (
+            f"pyDomainGeometry(position={self.position}, "
+            f"compute=({self.isc}, {self.iec}, {self.jsc}, {self.jec}), "
+            f"data=({self.isd}, {self.ied}, {self.jsd}, {self.jed}), "
+            f"global=({self.isg}, {self.ieg}, {self.jsg}, {self.jeg}))"
+        )
+
+
 class pyFMS_mpp_domains:
+
+    # To be class vars after refactor, accessed directly from cFMS
+    GLOBAL_DATA_DOMAIN = 1
+    CYCLIC_GLOBAL_DOMAIN = 2
+    WEST = 2
+    EAST = 3
+    SOUTH = 4
+    NORTH = 5
+    SCALAR_BIT = 6
+    CENTER = 7
+    CORNER = 8
+    POSITIONS = (CENTER, EAST, NORTH, CORNER)
+
+    # bounds [xbegin, xend] x [ybegin, yend] of a compute or data domain, in
+    # the order of the arguments of get_compute_domain and get_data_domain
+    DOMAIN_EXTENT_DTYPE = np.dtype(
+        [
+            ("xbegin", np.int32),
+            ("xend", np.int32),
+            ("ybegin", np.int32),
+            ("yend", np.int32),
+            ("xsize", np.int32),
+            ("xmax_size", np.int32),
+            ("ysize", np.int32),
+            ("ymax_size", np.int32),
+            ("x_is_global", np.bool_),
+            ("y_is_global", np.bool_),
+        ]
+    )
+
+    # compute, data and global domain of a position, see get_compute_domain2
+    DOMAIN_BOUNDS_DTYPE = np.dtype(
+        [
+            ("position", np.int32),
+            ("compute", DOMAIN_EXTENT_DTYPE),
+            ("data", DOMAIN_EXTENT_DTYPE),
+            ("global", DOMAIN_EXTENT_DTYPE),
+        ]
+    )
+
     def __init__(self, cFMS: ctypes.CDLL = None):
-        self.cFMS = cFMS
+        self.cFMS = cFMS if cFMS is not None else get_library()
+        self._registry = get_registry(self.cFMS) if self.cFMS is not None else None
 
     """
     Subroutine: define_domains
@@ -87,22 +192,20 @@ class pyFMS_mpp_domains:
         y_cyclic_offset: Optional[int] = None,
     ):
 
-        _cfms_define_domains = self.cFMS.cFMS_define_domains
-
         global_indices_arr = np.array(global_indices, dtype=np.int32)
         layout_arr = np.array(layout, dtype=np.int32)
 
-        global_indices_p, global_indices_t = setarray_Cint32(global_indices_arr)
-        layout_p, layout_t = setarray_Cint32(layout_arr)
+        global_indices_p, global_indices_t = setarray_Cint32(global_indices_arr, ndim=1)
+        layout_p, layout_t = setarray_Cint32(layout_arr, ndim=1)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
-        pelist_p, pelist_t = setarray_Cint32(pelist)
+        pelist_p, pelist_t = setarray_Cint32(pelist, ndim=1)
         xflags_c, xflags_t = setscalar_Cint32(xflags)
         yflags_c, yflags_t = setscalar_Cint32(yflags)
         xhalo_c, xhalo_t = setscalar_Cint32(xhalo)
         yhalo_c, yhalo_t = setscalar_Cint32(yhalo)
-        xextent_p, xextent_t = setarray_Cint32(xextent)
-        yextent_p, yextent_t = setarray_Cint32(yextent)
-        maskmap_p, maskmap_t = setarray_Cbool(maskmap)
+        xextent_p, xextent_t = setarray_Cint32(xextent, ndim=1)
+        yextent_p, yextent_t = setarray_Cint32(yextent, ndim=1)
+        maskmap_p, maskmap_t = setarray_Cbool(maskmap, ndim=2)
         name_c, name_t = set_Cchar(name)
         symmetry_c, symmetry_t = setscalar_Cbool(symmetry)
         memory_size_p, memory_size_t = setarray_Cint32(memory_size)
@@ -117,34 +220,36 @@ class pyFMS_mpp_domains:
         x_cyclic_offset_c, x_cyclic_offset_t = setscalar_Cint32(x_cyclic_offset)
         y_cyclic_offset_c, y_cyclic_offset_t = setscalar_Cint32(y_cyclic_offset)
 
-        _cfms_define_domains.argtypes = [
-            global_indices_t,
-            layout_t,
-            domain_id_t,
-            pelist_t,
-            xflags_t,
-            yflags_t,
-            xhalo_t,
-            yhalo_t,
-            xextent_t,
-            yextent_t,
-            maskmap_t,
-            name_t,
-            symmetry_t,
-            memory_size_t,
-            whalo_t,
-            ehalo_t,
-            shalo_t,
-            nhalo_t,
-            is_mosaic_t,
-            tile_count_t,
-            tile_id_t,
-            complete_t,
-            x_cyclic_offset_t,
-            y_cyclic_offset_t,
-        ]
-
-        _cfms_define_domains.restype = None
+        _cfms_define_domains = self._registry.get(
+            "cFMS_define_domains",
+            argtypes=[
+                global_indices_t,
+                layout_t,
+                domain_id_t,
+                pelist_t,
+                xflags_t,
+                yflags_t,
+                xhalo_t,
+                yhalo_t,
+                xextent_t,
+                yextent_t,
+                maskmap_t,
+                name_t,
+                symmetry_t,
+                memory_size_t,
+                whalo_t,
+                ehalo_t,
+                shalo_t,
+                nhalo_t,
+                is_mosaic_t,
+                tile_count_t,
+                tile_id_t,
+                complete_t,
+                x_cyclic_offset_t,
+                y_cyclic_offset_t,
+            ],
+            restype=None,
+        )
 
         _cfms_define_domains(
             global_indices_p,
@@ -182,15 +287,16 @@ class pyFMS_mpp_domains:
     """
 
     def define_io_domain(self, io_layout: list[int], domain_id: Optional[int] = None):
-        _cfms_define_io_domain = self.cFMS.cFMS_define_io_domain
-
         io_layout_arr = np.array(io_layout, dtype=np.int32)
 
-        io_layout_p, io_layout_t = setarray_Cint32(io_layout_arr)
+        io_layout_p, io_layout_t = setarray_Cint32(io_layout_arr, ndim=1)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_define_io_domain.argtypes = [io_layout_t, domain_id_t]
-        _cfms_define_io_domain.restype = None
+        _cfms_define_io_domain = self._registry.get(
+            "cFMS_define_io_domain",
+            argtypes=[io_layout_t, domain_id_t],
+            restype=None,
+        )
 
         _cfms_define_io_domain(io_layout_p, domain_id_c)
 
@@ -212,14 +318,15 @@ class pyFMS_mpp_domains:
 
         global_indices_arr = np.array(global_indices, dtype=np.int32)
 
-        _cfms_define_layout = self.cFMS.cFMS_define_layout
-
-        global_indices_p, global_indices_t = setarray_Cint32(global_indices_arr)
+        global_indices_p, global_indices_t = setarray_Cint32(global_indices_arr, ndim=1)
         ndivs_c, ndivs_t = setscalar_Cint32(ndivs)
         layout_p, layout_t = setarray_Cint32(layout)
 
-        _cfms_define_layout.argtypes = [global_indices_t, ndivs_t, layout_t]
-        _cfms_define_layout.restype = None
+        _cfms_define_layout = self._registry.get(
+            "cFMS_define_layout",
+            argtypes=[global_indices_t, ndivs_t, layout_t],
+            restype=None,
+        )
 
         _cfms_define_layout(global_indices_p, ndivs_c, layout_p)
 
@@ -252,8 +359,6 @@ class pyFMS_mpp_domains:
         extra_halo: Optional[int] = None,
         name: Optional[str] = None,
     ):
-        _cfms_define_nest_domain = self.cFMS.cFMS_define_nest_domains
-
         num_nest_p, num_nest_t = setscalar_Cint32(num_nest)
         ntiles_c, ntiles_t = setscalar_Cint32(ntiles)
         nest_level_p, nest_level_t = setarray_Cint32(nest_level)
@@ -271,25 +376,28 @@ class pyFMS_mpp_domains:
         extra_halo_c, extra_halo_t = setscalar_Cint32(extra_halo)
         name_p, name_t = set_Cchar(name)
 
-        _cfms_define_nest_domain.argtypes = [
-            num_nest_t,
-            ntiles_t,
-            nest_level_t,
-            tile_fine_t,
-            tile_coarse_t,
-            istart_coarse_t,
-            icount_coarse_t,
-            jstart_coarse_t,
-            jcount_coarse_t,
-            npes_nest_tile_t,
-            x_refine_t,
-            y_refine_t,
-            nest_domain_id_t,
-            domain_id_t,
-            extra_halo_t,
-            name_t,
-        ]
-        _cfms_define_nest_domain.restype = None
+        _cfms_define_nest_domain = self._registry.get(
+            "cFMS_define_nest_domains",
+            argtypes=[
+                num_nest_t,
+                ntiles_t,
+                nest_level_t,
+                tile_fine_t,
+                tile_coarse_t,
+                istart_coarse_t,
+                icount_coarse_t,
+                jstart_coarse_t,
+                jcount_coarse_t,
+                npes_nest_tile_t,
+                x_refine_t,
+                y_refine_t,
+                nest_domain_id_t,
+                domain_id_t,
+                extra_halo_t,
+                name_t,
+            ],
+            restype=None,
+        )
 
         _cfms_define_nest_domain(
             num_nest_p,
@@ -320,12 +428,13 @@ class pyFMS_mpp_domains:
     """
 
     def domain_is_initialized(self, domain_id: Optional[int] = None) -> bool:
-        _cfms_domain_is_initialized = self.cFMS.cFMS_domain_is_initialized
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_domain_is_initialized.argtypes = [domain_id_t]
-        _cfms_domain_is_initialized.restype = ctypes.c_bool
+        _cfms_domain_is_initialized = self._registry.get(
+            "cFMS_domain_is_initialized",
+            argtypes=[domain_id_t],
+            restype=ctypes.c_bool,
+        )
 
         return _cfms_domain_is_initialized(domain_id_c)
 
@@ -352,8 +461,6 @@ class pyFMS_mpp_domains:
         shalo: Optional[int] = None,
     ):
 
-        _cfms_get_compute_domain = self.cFMS.cFMS_get_compute_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         xbegin_c, xbegin_t = setscalar_Cint32(domain_data.xbegin)
         xend_c, xend_t = setscalar_Cint32(domain_data.xend)
@@ -370,24 +477,27 @@ class pyFMS_mpp_domains:
         whalo_c, whalo_t = setscalar_Cint32(whalo)
         shalo_c, shalo_t = setscalar_Cint32(shalo)
 
-        _cfms_get_compute_domain.argtypes = [
-            domain_id_t,
-            xbegin_t,
-            xend_t,
-            ybegin_t,
-            yend_t,
-            xsize_t,
-            xmax_size_t,
-            ysize_t,
-            ymax_size_t,
-            x_is_global_t,
-            y_is_global_t,
-            tile_count_t,
-            position_t,
-            whalo_t,
-            shalo_t,
-        ]
-        _cfms_get_compute_domain.restype = None
+        _cfms_get_compute_domain = self._registry.get(
+            "cFMS_get_compute_domain",
+            argtypes=[
+                domain_id_t,
+                xbegin_t,
+                xend_t,
+                ybegin_t,
+                yend_t,
+                xsize_t,
+                xmax_size_t,
+                ysize_t,
+                ymax_size_t,
+                x_is_global_t,
+                y_is_global_t,
+                tile_count_t,
+                position_t,
+                whalo_t,
+                shalo_t,
+            ],
+            restype=None,
+        )
 
         _cfms_get_compute_domain(
             domain_id_c,
@@ -407,102 +517,113 @@ class pyFMS_mpp_domains:
             shalo_c,
         )
 
+    """
+    Function: get_compute_domain2
+
+    Queries the compute and data domains of domain_id for every position of
+    positions, CENTER, EAST, NORTH and CORNER by default, reusing the same
+    ctypes arguments for all queries. cFMS has no query of the global domain,
+    it is filled from global_indices [isg, ieg, jsg, jeg] when given, shifted
+    by one point east and north of CENTER for symmetric domains.
+
+    Returns: A DOMAIN_BOUNDS_DTYPE structured array with one record per
+    position, the compute and data fields hold the bounds, sizes, max sizes
+    and global flags as returned by get_compute_domain and get_data_domain,
+    the global field is zero without global_indices
+    """
+
     def get_compute_domain2(
         self,
-        domain_id: int | None = None,
-        position: int | None = None,
-        tile_count: int | None = None,
-        whalo: int | None = None,
-        shalo: int | None = None,
-    ):
+        domain_id: Optional[int] = None,
+        positions: Optional[tuple[int, ...]] = None,
+        tile_count: Optional[int] = None,
+        whalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        global_indices: Optional[list[int]] = None,
+        symmetry: Optional[bool] = None,
+    ) -> NDArray:
+        if positions is None:
+            positions = self.POSITIONS
 
-        _cfms_get_compute_domain = self.cFMS.cFMS_get_compute_domain
-
-        default_i = 0
-        default_b = False
-
-        domain_id_t = ctypes.c_int
-        xbegin_t = ctypes.c_int
-        xend_t = ctypes.c_int
-        ybegin_t = ctypes.c_int
-        yend_t = ctypes.c_int
-        xsize_t = ctypes.c_int
-        xmax_size_t = ctypes.c_int
-        ysize_t = ctypes.c_int
-        ymax_size_t = ctypes.c_int
-        x_is_global_t = ctypes.c_bool
-        y_is_global_t = ctypes.c_bool
-        tile_count_t = ctypes.c_int
-        position_t = ctypes.c_int
-        whalo_t = ctypes.c_int
-        shalo_t = ctypes.c_int
-
-        xbegin_c = xbegin_t(default_i)
-        xend_c = xend_t(default_i)
-        ybegin_c = ybegin_t(default_i)
-        yend_c = yend_t(default_i)
-        xsize_c = xsize_t(default_i)
-        xmax_size_c = xmax_size_t(default_i)
-        ysize_c = ysize_t(default_i)
-        ymax_size_c = ymax_size_t(default_i)
-        x_is_global_c = x_is_global_t(default_b)
-        y_is_global_c = y_is_global_t(default_b)
-        domain_id_c = domain_id_t(domain_id) if domain_id is not None else None
-        tile_count_c = tile_count_t(tile_count) if tile_count is not None else None
-        position_c = position_t(position) if tile_count is not None else None
-        whalo_c = whalo_t(whalo) if whalo is not None else None
-        shalo_c = shalo_t(shalo) if shalo is not None else None
-
-        _cfms_get_compute_domain.argtypes = [
-            ctypes.POINTER(domain_id_t),
-            ctypes.POINTER(xbegin_t),
-            ctypes.POINTER(xend_t),
-            ctypes.POINTER(ybegin_t),
-            ctypes.POINTER(yend_t),
-            ctypes.POINTER(xsize_t),
-            ctypes.POINTER(xmax_size_t),
-            ctypes.POINTER(ysize_t),
-            ctypes.POINTER(ymax_size_t),
-            ctypes.POINTER(x_is_global_t),
-            ctypes.POINTER(y_is_global_t),
-            ctypes.POINTER(tile_count_t),
-            ctypes.POINTER(position_t),
-            ctypes.POINTER(whalo_t),
-            ctypes.POINTER(shalo_t),
-        ]
+        domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
+        tile_count_c, tile_count_t = setscalar_Cint32(tile_count)
+        whalo_c, whalo_t = setscalar_Cint32(whalo)
+        shalo_c, shalo_t = setscalar_Cint32(shalo)
+        position_c, position_t = setscalar_Cint32(0)
+        extents = [ctypes.c_int(0) for _ in range(8)]
+        x_is_global_c, x_is_global_t = setscalar_Cbool(False)
+        y_is_global_c, y_is_global_t = setscalar_Cbool(False)
+        extent_t = ctypes.POINTER(ctypes.c_int)
+
+        argtypes = (
+            [domain_id_t]
+            + [extent_t] * 8
+            + [x_is_global_t, y_is_global_t, tile_count_t, position_t]
+            + [whalo_t, shalo_t]
+        )
+        arguments = (
+            [domain_id_c]
+            + extents
+            + [x_is_global_c, y_is_global_c, tile_count_c, position_c]
+            + [whalo_c, shalo_c]
+        )
+        queries = {
+            "compute": self._registry.get(
+                "cFMS_get_compute_domain", argtypes=argtypes, restype=None
+            ),
+            "data": self._registry.get(
+                "cFMS_get_data_domain", argtypes=argtypes, restype=None
+            ),
+        }
+
+        bounds = np.zeros(len(positions), dtype=self.DOMAIN_BOUNDS_DTYPE)
+        for record, position in zip(bounds, positions):
+            record["position"] = position
+            position_c.value = position
+            for kind, query in queries.items():
+                query(*arguments)
+                record[kind] = tuple(extent.value for extent in extents) + (
+                    x_is_global_c.value,
+                    y_is_global_c.value,
+                )
+            if global_indices is not None:
+                record["global"] = self.global_extent(
+                    global_indices, position, symmetry
+                )
 
-        _cfms_get_compute_domain.restype = None
+        return bounds
 
-        _cfms_get_compute_domain(
-            domain_id_c,
-            xbegin_c,
-            xend_c,
-            ybegin_c,
-            yend_c,
-            xsize_c,
-            xmax_size_c,
-            ysize_c,
-            ymax_size_c,
-            x_is_global_c,
-            y_is_global_c,
-            tile_count_c,
-            position_c,
-            whalo_c,
-            shalo_c,
-        )
+    """
+    Function: global_extent
+
+    The global domain [isg, ieg] x [jsg, jeg] of global_indices at position,
+    one point longer along x east and along y north of CENTER when symmetry
+    is set, the global domain is not shifted otherwise.
 
-        return dict(
-            domain_id=domain_id_c.value,
-            xbegin=xbegin_c.value,
-            ybegin=ybegin_c.value,
-            xend=xend_c.value,
-            yend=yend_c.value,
-            xsize=xsize_c.value,
-            ysize=ysize_c.value,
-            xmax_size=xmax_size_c.value,
-            ymax_size=ymax_size_c.value,
-            x_is_global=x_is_global_c.value,
-            y_is_global=y_is_global_c.value,
+    Returns: The DOMAIN_EXTENT_DTYPE fields of the global domain as a tuple
+    """
+
+    @classmethod
+    def global_extent(
+        cls,
+        global_indices: list[int],
+        position: int,
+        symmetry: Optional[bool] = None,
+    ) -> tuple:
+        ishift = jshift = 0
+        if symmetry:
+            ishift = int(position in (cls.EAST, cls.CORNER))
+            jshift = int(position in (cls.NORTH, cls.CORNER))
+        isg, ieg, jsg, jeg = (int(index) for index in global_indices[:4])
+        xsize = ieg + ishift - isg + 1
+        ysize = jeg + jshift - jsg + 1
+        return (isg, ieg + ishift, jsg, jeg + jshift) + (
+            xsize,
+            xsize,
+            ysize,
+            ysize,
+            True,
+            True,
         )
 
     """
@@ -527,8 +648,6 @@ class pyFMS_mpp_domains:
         whalo: Optional[int] = None,
         shalo: Optional[int] = None,
     ):
-        _cfms_get_data_domain = self.cFMS.cFMS_get_data_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         xbegin_c, xbegin_t = setscalar_Cint32(domain_data.xbegin)
         xend_c, xend_t = setscalar_Cint32(domain_data.xend)
@@ -545,24 +664,27 @@ class pyFMS_mpp_domains:
         whalo_c, whalo_t = setscalar_Cint32(whalo)
         shalo_c, shalo_t = setscalar_Cint32(shalo)
 
-        _cfms_get_data_domain.argtypes = [
-            domain_id_t,
-            xbegin_t,
-            xend_t,
-            ybegin_t,
-            yend_t,
-            xsize_t,
-            xmax_size_t,
-            ysize_t,
-            ymax_size_t,
-            x_is_global_t,
-            y_is_global_t,
-            tile_count_t,
-            position_t,
-            whalo_t,
-            shalo_t,
-        ]
-        _cfms_get_data_domain.restype = None
+        _cfms_get_data_domain = self._registry.get(
+            "cFMS_get_data_domain",
+            argtypes=[
+                domain_id_t,
+                xbegin_t,
+                xend_t,
+                ybegin_t,
+                yend_t,
+                xsize_t,
+                xmax_size_t,
+                ysize_t,
+                ymax_size_t,
+                x_is_global_t,
+                y_is_global_t,
+                tile_count_t,
+                position_t,
+                whalo_t,
+                shalo_t,
+            ],
+            restype=None,
+        )
 
         _cfms_get_data_domain(
             domain_id_c,
@@ -594,15 +716,16 @@ class pyFMS_mpp_domains:
     """
 
     def get_domain_name(self, domain_id: Optional[int] = None) -> str:
-        _cfms_get_domain_name = self.cFMS.cFMS_get_domain_name
-
         domain_name = ""
 
         domain_name_c, domain_name_t = set_Cchar(domain_name)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_get_domain_name.argtypes = [domain_name_t, domain_id_t]
-        _cfms_get_domain_name.restype = None
+        _cfms_get_domain_name = self._registry.get(
+            "cFMS_get_domain_name",
+            argtypes=[domain_name_t, domain_id_t],
+            restype=None,
+        )
 
         _cfms_get_domain_name(domain_name_c, domain_id_c)
 
@@ -620,13 +743,14 @@ class pyFMS_mpp_domains:
 
         layout = np.empty(shape=2, dtype=np.int32, order="C")
 
-        _cfms_get_layout = self.cFMS.cFMS_get_layout
-
         layout_p, layout_t = setarray_Cint32(layout)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_get_layout.argtypes = [layout_t, domain_id_t]
-        _cfms_get_layout.restype = None
+        _cfms_get_layout = self._registry.get(
+            "cFMS_get_layout",
+            argtypes=[layout_t, domain_id_t],
+            restype=None,
+        )
 
         _cfms_get_layout(layout_p, domain_id_c)
 
@@ -643,13 +767,14 @@ class pyFMS_mpp_domains:
         npes = ctypes.c_int.in_dll(self.cFMS, "cFMS_pelist_npes")
         pelist = np.empty(shape=npes.value, dtype=np.int32, order="C")
 
-        _cfms_get_domain_pelist = self.cFMS.cFMS_get_domain_pelist
-
-        pelist_p, pelist_t = setarray_Cint32(pelist)
+        pelist_p, pelist_t = setarray_Cint32(pelist, ndim=1)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_get_domain_pelist.argtypes = [pelist_t, domain_id_t]
-        _cfms_get_domain_pelist.restype = None
+        _cfms_get_domain_pelist = self._registry.get(
+            "cFMS_get_domain_pelist",
+            argtypes=[pelist_t, domain_id_t],
+            restype=None,
+        )
 
         _cfms_get_domain_pelist(pelist_p, domain_id_c)
 
@@ -687,8 +812,6 @@ class pyFMS_mpp_domains:
         whalo: Optional[int] = None,
         shalo: Optional[int] = None,
     ):
-        _cfms_set_compute_domain = self.cFMS.cFMS_set_compute_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         xbegin_c, xbegin_t = setscalar_Cint32(xbegin)
         xend_c, xend_t = setscalar_Cint32(xend)
@@ -702,21 +825,24 @@ class pyFMS_mpp_domains:
         whalo_c, whalo_t = setscalar_Cint32(whalo)
         shalo_c, shalo_t = setscalar_Cint32(shalo)
 
-        _cfms_set_compute_domain.argtypes = [
-            domain_id_t,
-            xbegin_t,
-            xend_t,
-            ybegin_t,
-            yend_t,
-            xsize_t,
-            ysize_t,
-            x_is_global_t,
-            y_is_global_t,
-            tile_count_t,
-            whalo_t,
-            shalo_t,
-        ]
-        _cfms_set_compute_domain.restype = None
+        _cfms_set_compute_domain = self._registry.get(
+            "cFMS_set_compute_domain",
+            argtypes=[
+                domain_id_t,
+                xbegin_t,
+                xend_t,
+                ybegin_t,
+                yend_t,
+                xsize_t,
+                ysize_t,
+                x_is_global_t,
+                y_is_global_t,
+                tile_count_t,
+                whalo_t,
+                shalo_t,
+            ],
+            restype=None,
+        )
 
         _cfms_set_compute_domain(
             domain_id_c,
@@ -741,12 +867,13 @@ class pyFMS_mpp_domains:
     """
 
     def set_current_domain(self, domain_id: Optional[int] = None):
-        _cfms_set_current_domain = self.cFMS.cFMS_set_current_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
 
-        _cfms_set_current_domain.argtypes = [domain_id_t]
-        _cfms_set_current_domain.restype = None
+        _cfms_set_current_domain = self._registry.get(
+            "cFMS_set_current_domain",
+            argtypes=[domain_id_t],
+            restype=None,
+        )
 
         _cfms_set_current_domain(domain_id_c)
 
@@ -758,12 +885,13 @@ class pyFMS_mpp_domains:
     """
 
     def set_current_nest_domain(self, nest_domain_id: Optional[int] = None):
-        _cfms_set_current_nest_domain = self.cFMS.cFMS_set_current_nest_domain
-
         nest_domain_id_c, nest_domain_id_t = setscalar_Cint32(nest_domain_id)
 
-        _cfms_set_current_nest_domain.argtypes = [nest_domain_id_t]
-        _cfms_set_current_nest_domain.restype = None
+        _cfms_set_current_nest_domain = self._registry.get(
+            "cFMS_set_current_nest_domain",
+            argtypes=[nest_domain_id_t],
+            restype=None,
+        )
 
         _cfms_set_current_nest_domain(nest_domain_id_c)
 
@@ -795,8 +923,6 @@ class pyFMS_mpp_domains:
         whalo: Optional[int] = None,
         shalo: Optional[int] = None,
     ):
-        _cfms_set_data_domain = self.cFMS.cFMS_set_data_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         xbegin_c, xbegin_t = setscalar_Cint32(xbegin)
         xend_c, xend_t = setscalar_Cint32(xend)
@@ -810,21 +936,24 @@ class pyFMS_mpp_domains:
         whalo_c, whalo_t = setscalar_Cint32(whalo)
         shalo_c, shalo_t = setscalar_Cint32(shalo)
 
-        _cfms_set_data_domain.argtypes = [
-            domain_id_t,
-            xbegin_t,
-            xend_t,
-            ybegin_t,
-            yend_t,
-            xsize_t,
-            ysize_t,
-            x_is_global_t,
-            y_is_global_t,
-            tile_count_t,
-            whalo_t,
-            shalo_t,
-        ]
-        _cfms_set_data_domain.restype = None
+        _cfms_set_data_domain = self._registry.get(
+            "cFMS_set_data_domain",
+            argtypes=[
+                domain_id_t,
+                xbegin_t,
+                xend_t,
+                ybegin_t,
+                yend_t,
+                xsize_t,
+                ysize_t,
+                x_is_global_t,
+                y_is_global_t,
+                tile_count_t,
+                whalo_t,
+                shalo_t,
+            ],
+            restype=None,
+        )
 
         _cfms_set_data_domain(
             domain_id_c,
@@ -871,8 +1000,6 @@ class pyFMS_mpp_domains:
         whalo: Optional[int] = None,
         shalo: Optional[int] = None,
     ):
-        _cfms_set_global_domain = self.cFMS.cFMS_set_global_domain
-
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         xbegin_c, xbegin_t = setscalar_Cint32(xbegin)
         xend_c, xend_t = setscalar_Cint32(xend)
@@ -884,19 +1011,22 @@ class pyFMS_mpp_domains:
         whalo_c, whalo_t = setscalar_Cint32(whalo)
         shalo_c, shalo_t = setscalar_Cint32(shalo)
 
-        _cfms_set_global_domain.argtypes = [
-            domain_id_t,
-            xbegin_t,
-            xend_t,
-            ybegin_t,
-            yend_t,
-            xsize_t,
-            ysize_t,
-            tile_count_t,
-            whalo_t,
-            shalo_t,
-        ]
-        _cfms_set_global_domain.restype = None
+        _cfms_set_global_domain = self._registry.get(
+            "cFMS_set_global_domain",
+            argtypes=[
+                domain_id_t,
+                xbegin_t,
+                xend_t,
+                ybegin_t,
+                yend_t,
+                xsize_t,
+                ysize_t,
+                tile_count_t,
+                whalo_t,
+                shalo_t,
+            ],
+            restype=None,
+        )
 
         _cfms_set_global_domain(
             domain_id_c,
@@ -928,69 +1058,30 @@ class pyFMS_mpp_domains:
         if name is not None:
             name = name[:64]
 
-        if field.ndim == 2:
-            if field.dtype == np.float64:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_double_2d
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_float_2d
-                field_p, field_t = setarray_Cfloat(field)
-            elif field.dtype == np.int32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_int_2d
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(
-                    f"udate_domains input field datatype {field.dtype} unsupported"
-                )
-        elif field.ndim == 3:
-            if field.dtype == np.float64:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_double_3d
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_float_3d
-                field_p, field_t = setarray_Cfloat(field)
-            elif field.dtype == np.int32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_int_3d
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(
-                    f"udate_domains input field datatype {field.dtype} unsupported"
-                )
-        elif field.ndim == 4:
-            if field.dtype == np.float64:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_double_4d
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_float_4d
-                field_p, field_t = setarray_Cfloat(field)
-            elif field.dtype == np.int32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_int_4d
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(
-                    f"udate_domains input field datatype {field.dtype} unsupported"
-                )
-        elif field.ndim == 5:
-            if field.dtype == np.float64:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_double_5d
-                field_p, field_t = setarray_Cdouble(field)
-            elif field.dtype == np.float32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_float_5d
-                field_p, field_t = setarray_Cfloat(field)
-            elif field.dtype == np.int32:
-                _cfms_update_domains = self.cFMS.cFMS_update_domains_int_5d
-                field_p, field_t = setarray_Cfloat(field)
-            else:
-                raise RuntimeError(
-                    f"udate_domains input field datatype {field.dtype} unsupported"
-                )
-        else:
+        if field.ndim not in (2, 3, 4, 5):
             raise RuntimeError(
                 f"update_domains field dimension {field.ndim}d unsupported"
             )
 
+        # halos are written into a contiguous copy and copied back afterwards
+        field_arr = check_array(field, field.dtype, writeable=True)
+
+        if field.dtype == np.float64:
+            field_p, field_t = setarray_Cdouble(field_arr)
+            field_ctype = "double"
+        elif field.dtype == np.float32:
+            field_p, field_t = setarray_Cfloat(field_arr)
+            field_ctype = "float"
+        elif field.dtype == np.int32:
+            field_p, field_t = setarray_Cint32(field_arr)
+            field_ctype = "int"
+        else:
+            raise RuntimeError(
+                f"update_domains input field datatype {field.dtype} unsupported"
+            )
+
         field_shape = np.array(field.shape, dtype=np.int32)
-        field_shape_p, field_shape_t = setarray_Cint32(field_shape)
+        field_shape_p, field_shape_t = setarray_Cint32(field_shape, ndim=1)
         domain_id_c, domain_id_t = setscalar_Cint32(domain_id)
         flags_c, flags_t = setscalar_Cint32(flags)
         complete_c, complete_t = setscalar_Cbool(complete)
@@ -1002,21 +1093,26 @@ class pyFMS_mpp_domains:
         name_c, name_t = set_Cchar(name)
         tile_count_c, tile_count_t = setscalar_Cint32(tile_count)
 
-        _cfms_update_domains.argtypes = [
-            field_shape_t,
-            field_t,
-            domain_id_t,
-            flags_t,
-            complete_t,
-            position_t,
-            whalo_t,
-            ehalo_t,
-            shalo_t,
-            nhalo_t,
-            name_t,
-            tile_count_t,
-        ]
-        _cfms_update_domains.restype = None
+        _cfms_update_domains = self._registry.get(
+            f"cFMS_update_domains_{field_ctype}_{field.ndim}d",
+            argtypes=[
+                field_shape_t,
+                field_t,
+                domain_id_t,
+                flags_t,
+                complete_t,
+                position_t,
+                whalo_t,
+                ehalo_t,
+                shalo_t,
+                nhalo_t,
+                name_t,
+                tile_count_t,
+            ],
+            restype=None,
+            dtype=field.dtype,
+            rank=field.ndim,
+        )
 
         _cfms_update_domains(
             field_shape_p,
@@ -1033,6 +1129,43 @@ class pyFMS_mpp_domains:
             tile_count_c,
         )
 
+        if field_arr is not field:
+            field[...] = field_arr
+
+
+class pyHaloUpdate:
+    """
+    Handle of a halo update started by pyDomain.start_update. The field is
+    referenced by the handle, it must not be modified nor its halos read
+    until wait has returned.
+    """
+
+    def __init__(self, field: NDArray, future: Future):
+        self.field = field
+        self._future = future
+
+    """
+    Function: done
+
+    Returns: True if the halo update has completed
+    """
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    """
+    Function: wait
+
+    Blocks until the halo update has completed, raising any error of the
+    update
+
+    Returns: The updated field
+    """
+
+    def wait(self, timeout: Optional[float] = None) -> NDArray:
+        self._future.result(timeout=timeout)
+        return self.field
+
 
 class pyDomain:
     def __init__(
@@ -1090,6 +1223,15 @@ class pyDomain:
         self.y_cyclic_offset = y_cyclic_offset
         self.compute_domain = pyDomainData()
         self.data_domain = pyDomainData()
+        self._geometry: dict[int, pyDomainGeometry] = {}
+        self._halo_buffers: dict[tuple, NDArray] = {}
+        self._halo_plans: dict[tuple, "pyHaloExchange"] = {}
+        self._gather_plans: dict[tuple, "pyGatherPlan"] = {}
+        self._reductions: dict[Optional[int], "pyGlobalReduction"] = {}
+        self._comms: dict[int, object] = {}
+        self._decompositions: dict[tuple, object] = {}
+        self._global_bounds = [global_indices[i] for i in range(4)]
+        self.bounds: NDArray
 
         self.mpp_domains_obj.define_domains(
             global_indices=self.global_indices,
@@ -1117,19 +1259,434 @@ class pyDomain:
             x_cyclic_offset=self.x_cyclic_offset,
             y_cyclic_offset=self.y_cyclic_offset,
         )
-        self.mpp_domains_obj.get_compute_domain(
-            domain_data=self.compute_domain,
+        self._query_bounds()
+
+    def _query_bounds(self, position: int = pyFMS_mpp_domains.CENTER) -> np.void:
+        # the bounds of CENTER are queried when the domain is defined or set
+        # and kept as compute_domain and data_domain, the other positions the
+        # first time their geometry is requested
+        record = self.mpp_domains_obj.get_compute_domain2(
             domain_id=self.domain_id,
+            positions=(position,),
             whalo=self.whalo,
             shalo=self.shalo,
+            global_indices=self._global_bounds,
+            symmetry=self.symmetry,
+        )
+        if position != pyFMS_mpp_domains.CENTER:
+            self.bounds = np.concatenate((self.bounds, record))
+            return record[0]
+
+        self.bounds = record
+        center = record[0]
+        for domain_data, kind in (
+            (self.compute_domain, "compute"),
+            (self.data_domain, "data"),
+        ):
+            for name in pyFMS_mpp_domains.DOMAIN_EXTENT_DTYPE.names:
+                getattr(domain_data, name).value = center[kind][name].item()
+        self._clear_caches()
+        return center
+
+    def _clear_caches(self):
+        # everything built from the compute, data or global domains, called
+        # when they are set. The halo and gather plans hold communicators,
+        # freeing them is collective over their comms as creating them was
+        for plan in (*self._halo_plans.values(), *self._gather_plans.values()):
+            plan.free()
+        self._halo_plans.clear()
+        self._gather_plans.clear()
+        self._reductions.clear()
+        self._geometry.clear()
+        self._decompositions.clear()
+
+    """
+    Function: geometry
+
+    Returns: The pyDomainGeometry of the domain for position, CENTER by
+    default. The bounds of CENTER are queried from cFMS when the domain is
+    defined and again when the compute or data domain is set, those of the
+    other positions the first time they are requested. The geometry is cached
+    until the domain is set. Setting the compute, data or global domain also
+    frees the cached halo and gather plans, collectively over their comms,
+    and drops the cached reductions and decompositions.
+    """
+
+    def geometry(self, position: Optional[int] = None) -> pyDomainGeometry:
+        if position is None:
+            position = pyFMS_mpp_domains.CENTER
+        try:
+            return self._geometry[position]
+        except KeyError:
+            pass
+
+        if position not in pyFMS_mpp_domains.POSITIONS:
+            raise ValueError(
+                f"position must be one of CENTER, EAST, NORTH or CORNER, got {position}"
+            )
+
+        queried = self.bounds[self.bounds["position"] == position]
+        record = queried[0] if len(queried) else self._query_bounds(position)
+
+        def corners(kind: str) -> tuple[int, int, int, int]:
+            extent = record[kind]
+            return (
+                int(extent["xbegin"]),
+                int(extent["xend"]),
+                int(extent["ybegin"]),
+                int(extent["yend"]),
+            )
+
+        geometry = pyDomainGeometry(
+            position=position,
+            compute=corners("compute"),
+            data=corners("data"),
+            global_=corners("global"),
         )
-        self.mpp_domains_obj.get_data_domain(
-            domain_data=self.data_domain,
+        self._geometry[position] = geometry
+        return geometry
+
+    """
+    Function: compute_slice
+
+    Returns: The np.s_ slice selecting the compute domain from a data domain
+    array at position, field[domain.compute_slice()] is a view
+    """
+
+    def compute_slice(self, position: Optional[int] = None) -> tuple[slice, slice]:
+        return self.geometry(position).compute_slice
+
+    """
+    Subroutine: update_halos
+
+    Updates the halos of a group of fields with a single halo exchange per
+    staggering position and dtype. positions gives the position of each
+    field, CENTER by default. Fields of a position and dtype (float64,
+    float32 or int32) with the same data domain shape are packed along the
+    vertical into one buffer of that dtype, so fields of any rank travel
+    together in one 3D update_domains call, and the updated halos are copied
+    back into the fields. A field alone in its group is updated directly.
+    Fields are never widened, a group mixing dtypes costs one exchange per
+    dtype instead. The fields and their order must be the same on all PEs.
+    """
+
+    def update_halos(
+        self,
+        fields: list[NDArray],
+        positions: Optional[list[Optional[int]]] = None,
+        flags: Optional[int] = None,
+        whalo: Optional[int] = None,
+        ehalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        nhalo: Optional[int] = None,
+    ):
+        if positions is None:
+            positions = [None] * len(fields)
+        if len(positions) != len(fields):
+            raise ValueError(
+                f"update_halos got {len(fields)} fields and {len(positions)} positions"
+            )
+
+        groups: dict[tuple, list[NDArray]] = {}
+        for field, position in zip(fields, positions):
+            if field.dtype not in (np.float64, np.float32, np.int32):
+                raise RuntimeError(
+                    f"update_halos input field datatype {field.dtype} unsupported"
+                )
+            if field.ndim < 2:
+                raise RuntimeError(
+                    f"update_halos field dimension {field.ndim}d unsupported"
+                )
+            key = (position, field.shape[:2], field.dtype)
+            groups.setdefault(key, []).append(field)
+
+        for (position, shape, dtype), group in groups.items():
+            if len(group) == 1:
+                self.mpp_domains_obj.update_domains(
+                    group[0],
+                    domain_id=self.domain_id,
+                    flags=flags,
+                    position=position,
+                    whalo=whalo,
+                    ehalo=ehalo,
+                    shalo=shalo,
+                    nhalo=nhalo,
+                )
+                continue
+
+            nlevels = [int(np.prod(field.shape[2:], dtype=np.int64)) for field in group]
+            offsets = np.cumsum([0] + nlevels).tolist()
+            buffer = self._halo_buffer(shape + (offsets[-1],), dtype)
+
+            for field, k0, k1 in zip(group, offsets[:-1], offsets[1:]):
+                buffer[:, :, k0:k1] = field.reshape(shape + (k1 - k0,))
+
+            self.mpp_domains_obj.update_domains(
+                buffer,
+                domain_id=self.domain_id,
+                flags=flags,
+                position=position,
+                whalo=whalo,
+                ehalo=ehalo,
+                shalo=shalo,
+                nhalo=nhalo,
+            )
+
+            for field, k0, k1 in zip(group, offsets[:-1], offsets[1:]):
+                field[...] = buffer[:, :, k0:k1].reshape(field.shape)
+
+    """
+    Function: start_update
+
+    Starts the halo update of field and returns without waiting for it. The
+    update runs on the shared cFMS thread while the calling thread carries
+    on, e.g. with the interior points of a stencil, and is completed by
+    the wait method of the returned handle. field must not be modified, nor
+    its halos read, before then. The arguments are those of
+    update_domains. cFMS calls made while the update is in flight wait for
+    it, MPI must be initialized with at least MPI_THREAD_SERIALIZED.
+
+    Returns: A pyHaloUpdate handle
+    """
+
+    def start_update(
+        self,
+        field: NDArray,
+        flags: Optional[int] = None,
+        position: Optional[int] = None,
+        whalo: Optional[int] = None,
+        ehalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        nhalo: Optional[int] = None,
+    ) -> pyHaloUpdate:
+        future = get_executor().update_domains(
+            self.mpp_domains_obj,
+            field,
             domain_id=self.domain_id,
-            whalo=self.whalo,
-            shalo=self.shalo,
+            flags=flags,
+            position=position,
+            whalo=whalo,
+            ehalo=ehalo,
+            shalo=shalo,
+            nhalo=nhalo,
+        )
+        return pyHaloUpdate(field, future)
+
+    """
+    Function: halo_plan
+
+    Returns: The persistent mpi4py pyHaloExchange plan for fields of the shape
+    and dtype of field at position, created on first use and cached on the
+    domain. Creating a plan is collective over comm. plan.exchange(field)
+    updates the halos of field as update_domains does.
+    """
+
+    def halo_plan(
+        self,
+        field: NDArray,
+        position: Optional[int] = None,
+        whalo: Optional[int] = None,
+        ehalo: Optional[int] = None,
+        shalo: Optional[int] = None,
+        nhalo: Optional[int] = None,
+        comm=None,
+    ):
+        from .py_halo_exchange import pyHaloExchange
+
+        key = (
+            field.shape,
+            field.dtype.str,
+            position,
+            whalo,
+            ehalo,
+            shalo,
+            nhalo,
+            self._comm_key(comm),
+        )
+        plan = self._halo_plans.get(key)
+        if plan is None:
+            plan = pyHaloExchange(
+                self,
+                field.shape,
+                dtype=field.dtype,
+                position=position,
+                whalo=whalo,
+                ehalo=ehalo,
+                shalo=shalo,
+                nhalo=nhalo,
+                comm=comm,
+            )
+            self._halo_plans[key] = plan
+        return plan
+
+    def _comm_key(self, comm) -> Optional[int]:
+        # comms are not hashable, the caches are keyed by id(comm) and the
+        # comm is kept alive on the domain so that its id is not reused by
+        # another comm while plans built for it are cached
+        if comm is None:
+            return None
+        self._comms.setdefault(id(comm), comm)
+        return id(comm)
+
+    def _gather_plan(
+        self,
+        dtype: DTypeLike,
+        trailing_shape: tuple[int, ...],
+        position: Optional[int],
+        root: int,
+        comm,
+    ):
+        from .py_gather import pyGatherPlan
+
+        key = (
+            np.dtype(dtype).str,
+            tuple(trailing_shape),
+            position,
+            root,
+            self._comm_key(comm),
+        )
+        plan = self._gather_plans.get(key)
+        if plan is None:
+            plan = pyGatherPlan(
+                self,
+                dtype=dtype,
+                trailing_shape=trailing_shape,
+                position=position,
+                root=root,
+                comm=comm,
+            )
+            self._gather_plans[key] = plan
+        return plan
+
+    """
+    Function: gather
+
+    Gathers field, data or compute domain shaped, at position from all PEs
+    on root with a single Gatherv, see pyGatherPlan. The plan is created on
+    first use, collectively over comm, and cached on the domain.
+
+    Returns: The global field indexed (x, y[, z]) on root, None elsewhere
+    """
+
+    def gather(
+        self,
+        field: NDArray,
+        root: int = 0,
+        position: Optional[int] = None,
+        out: Optional[NDArray] = None,
+        comm=None,
+    ) -> Optional[NDArray]:
+        plan = self._gather_plan(field.dtype, field.shape[2:], position, root, comm)
+        return plan.gather(field, out=out)
+
+    """
+    Function: scatter
+
+    Scatters global_field from root to the compute domains of all PEs with a
+    single Scatterv, see pyGatherPlan. The dtype and trailing shape of
+    global_field are broadcast from root, global_field is not read on the
+    other PEs. The halos of field are left to a halo update. A missing or
+    misshapen global_field on root raises a ValueError on every PE.
+
+    Returns: field, or a new data domain shaped array if field is None
+    """
+
+    def scatter(
+        self,
+        global_field: Optional[NDArray],
+        root: int = 0,
+        position: Optional[int] = None,
+        field: Optional[NDArray] = None,
+        comm=None,
+    ) -> NDArray:
+        from mpi4py import MPI
+
+        bcast_comm = MPI.COMM_WORLD if comm is None else comm
+        layout = None
+        if bcast_comm.Get_rank() == root and global_field is not None:
+            layout = (global_field.dtype.str, global_field.shape[2:])
+        layout = bcast_comm.bcast(layout, root=root)
+        if layout is None:
+            raise ValueError(f"scatter needs global_field on root {root}")
+        dtype, trailing_shape = layout
+        plan = self._gather_plan(dtype, trailing_shape, position, root, comm)
+        if field is None:
+            field = np.zeros(
+                self.geometry(position).data_shape + tuple(trailing_shape), dtype=dtype
+            )
+        return plan.scatter(global_field, field=field)
+
+    """
+    Function: global_reduce
+
+    Reduces a list of fields, data or compute domain shaped, over the
+    compute domains of all PEs with a single collective, see
+    pyGlobalReduction.reduce. ops is "sum", "min" or "max", or one per
+    field. reproducible gives bitwise identical sums for any layout and
+    number of PEs, as the bitwise-exact sums of FMS.
+
+    Returns: A float64 array of the result per field
+    """
+
+    def global_reduce(
+        self,
+        fields: list[NDArray],
+        ops: Union[str, list[str]] = "sum",
+        positions: Optional[list[Optional[int]]] = None,
+        reproducible: bool = False,
+        comm=None,
+    ) -> NDArray:
+        key = self._comm_key(comm)
+        reduction = self._reductions.get(key)
+        if reduction is None:
+            from .py_reduction import pyGlobalReduction
+
+            reduction = pyGlobalReduction(self, comm=comm)
+            self._reductions[key] = reduction
+        return reduction.reduce(
+            fields, ops=ops, positions=positions, reproducible=reproducible
         )
 
+    """
+    Function: decomposition
+
+    Returns: The pyDecomposition of the domain at position, the compute and
+    data domains of all PEs and their neighbors, created on first use and
+    cached on the domain. Creating it is collective over comm.
+    """
+
+    def decomposition(self, position: Optional[int] = None, comm=None):
+        key = (position, self._comm_key(comm))
+        decomposition = self._decompositions.get(key)
+        if decomposition is None:
+            from .py_decomposition import gather_decomposition
+
+            decomposition = gather_decomposition(self, position=position, comm=comm)
+            self._decompositions[key] = decomposition
+        return decomposition
+
+    """
+    Function: owner_of
+
+    Maps global indices i and j, relative to the start of the global domain,
+    to the ranks of the PEs owning them, see pyDecomposition.owner_of
+
+    Returns: An int64 array of ranks, -1 outside the domain
+    """
+
+    def owner_of(
+        self, i: NDArray, j: NDArray, position: Optional[int] = None, comm=None
+    ) -> NDArray:
+        return self.decomposition(position=position, comm=comm).owner_of(i, j)
+
+    def _halo_buffer(self, shape: tuple[int, ...], dtype: DTypeLike) -> NDArray:
+        key = (shape, np.dtype(dtype).str)
+        buffer = self._halo_buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._halo_buffers[key] = buffer
+        return buffer
+
     def set_compute_domain(
         self,
         xbegin: Optional[int] = None,
@@ -1160,12 +1717,7 @@ class pyDomain:
             shalo=shalo,
         )
 
-        self.mpp_domains_obj.get_compute_domain(
-            domain_data=self.compute_domain,
-            domain_id=self.domain_id,
-            whalo=self.whalo,
-            shalo=self.shalo,
-        )
+        self._query_bounds()
 
     def set_data_domain(
         self,
@@ -1197,12 +1749,7 @@ class pyDomain:
             shalo=shalo,
         )
 
-        self.mpp_domains_obj.get_data_domain(
-            domain_data=self.data_domain,
-            domain_id=self.domain_id,
-            whalo=self.whalo,
-            shalo=self.shalo,
-        )
+        self._query_bounds()
 
     def set_global_domain(
         self,
@@ -1229,6 +1776,14 @@ class pyDomain:
             whalo=whalo,
             shalo=shalo,
         )
+        for i, bound in enumerate((xbegin, xend, ybegin, yend)):
+            if bound is not None:
+                self._global_bounds[i] = int(bound)
+        for record in self.bounds:
+            record["global"] = pyFMS_mpp_domains.global_extent(
+                self._global_bounds, int(record["position"]), self.symmetry
+            )
+        self._clear_caches()
 
 
 class pyNestDomain:
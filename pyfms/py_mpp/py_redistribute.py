@@ -0,0 +1,251 @@
+from typing import Optional, Union
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .py_mpp_domains import pyDomain, pyDomainGeometry
+
+
+"""
+This module moves fields between two decompositions of the same global
+grid with point-to-point messages, as mpp_redistribute of FMS, e.g. from a
+compute layout to an I/O or analysis layout.
+
+A pyRedistribution Allgathers the compute domains of both pyDomains once
+and keeps, per peer, the overlaps of the compute domain of this PE on the
+input domain with the compute domains of the peer on the output domain,
+and the reverse. A redistribution then packs the overlaps of all fields per
+peer into one message, so that every pair of PEs exchanges at most one
+message per call, and overlaps on the PE itself are copied directly. No
+data passes through a single rank.
+
+A PE that does not hold one of the domains, e.g. an I/O domain on a subset
+of the PEs, passes None for it.
+"""
+
+
+_TAG = 19
+
+
+def _to_compute(field: NDArray, geometry: pyDomainGeometry, name: str) -> NDArray:
+    # the compute domain of a data or compute domain shaped field
+    if field.shape[:2] == geometry.data_shape:
+        return field[geometry.compute_slice]
+    if field.shape[:2] == geometry.compute_shape:
+        return field
+    raise ValueError(
+        f"{name} of shape {field.shape} matches neither the data domain "
+        f"{geometry.data_shape} nor the compute domain {geometry.compute_shape}"
+    )
+
+
+class pyRedistribution:
+    """
+    Redistribution plan from domain_in to domain_out at a staggering
+    position, see the module docstring. Messages are sent in dtype, fields
+    of other dtypes are cast. Creating the plan is collective over comm,
+    MPI.COMM_WORLD by default.
+    """
+
+    def __init__(
+        self,
+        domain_in: Optional[pyDomain],
+        domain_out: Optional[pyDomain],
+        position: Optional[int] = None,
+        dtype: DTypeLike = np.float64,
+        comm=None,
+    ):
+        from mpi4py import MPI
+
+        self._MPI = MPI
+        self.dtype = np.dtype(dtype)
+        comm = MPI.COMM_WORLD if comm is None else comm
+        self.comm = comm.Dup()
+        self.rank = self.comm.Get_rank()
+
+        self.geometry_in = None if domain_in is None else domain_in.geometry(position)
+        self.geometry_out = (
+            None if domain_out is None else domain_out.geometry(position)
+        )
+
+        bounds_in = self._allgather_bounds(self.geometry_in)
+        bounds_out = self._allgather_bounds(self.geometry_out)
+
+        # (peer, local slice) of the overlaps sent and received, the overlap
+        # of two compute domains is a single rectangle
+        self._sends: list[tuple[int, tuple[slice, slice]]] = []
+        self._recvs: list[tuple[int, tuple[slice, slice]]] = []
+        self._copies: list[tuple[tuple[slice, slice], tuple[slice, slice]]] = []
+
+        own_in = bounds_in[self.rank]
+        own_out = bounds_out[self.rank]
+        for peer in range(self.comm.Get_size()):
+            if own_in is not None and bounds_out[peer] is not None:
+                overlap = self._overlap(own_in, bounds_out[peer])
+                if overlap is not None:
+                    send = self._local(overlap, own_in)
+                    if peer == self.rank:
+                        self._copies.append((send, self._local(overlap, own_out)))
+                    else:
+                        self._sends.append((peer, send))
+            if own_out is not None and bounds_in[peer] is not None:
+                overlap = self._overlap(own_out, bounds_in[peer])
+                if overlap is not None and peer != self.rank:
+                    self._recvs.append((peer, self._local(overlap, own_out)))
+
+        # send and receive buffers per number of points per horizontal index
+        self._buffers: dict[int, tuple[NDArray, NDArray]] = {}
+
+    def _allgather_bounds(
+        self, geometry: Optional[pyDomainGeometry]
+    ) -> list[Optional[tuple[int, int, int, int]]]:
+        # compute domains of all PEs relative to the first one, None on PEs
+        # without the domain
+        own = np.full(5, -1, dtype=np.int64)
+        if geometry is not None:
+            own[:] = (1, geometry.isc, geometry.iec, geometry.jsc, geometry.jec)
+        table = np.empty((self.comm.Get_size(), 5), dtype=np.int64)
+        self.comm.Allgather(own, table)
+        present = table[:, 0] == 1
+        if not present.any():
+            raise ValueError("the domain is not defined on any PE")
+        xorigin = table[present, 1].min()
+        yorigin = table[present, 3].min()
+        return [
+            (
+                (
+                    int(x0 - xorigin),
+                    int(x1 - xorigin),
+                    int(y0 - yorigin),
+                    int(y1 - yorigin),
+                )
+                if flag == 1
+                else None
+            )
+            for flag, x0, x1, y0, y1 in table.tolist()
+        ]
+
+    @staticmethod
+    def _overlap(a: tuple, b: tuple) -> Optional[tuple]:
+        x0, x1 = max(a[0], b[0]), min(a[1], b[1])
+        y0, y1 = max(a[2], b[2]), min(a[3], b[3])
+        if x0 > x1 or y0 > y1:
+            return None
+        return (x0, x1, y0, y1)
+
+    @staticmethod
+    def _local(region: tuple, bounds: tuple) -> tuple[slice, slice]:
+        return np.s_[
+            region[0] - bounds[0] : region[1] - bounds[0] + 1,
+            region[2] - bounds[2] : region[3] - bounds[2] + 1,
+        ]
+
+    @property
+    def peers(self) -> int:
+        return len(self._sends) + len(self._recvs)
+
+    """
+    Subroutine: redistribute
+
+    Moves the compute domains of fields_in on domain_in to the compute
+    domains of fields_out on domain_out, one field or a list of them, data
+    or compute domain shaped. The fields of a pair must have the same
+    trailing (vertical) shape, and the fields on all PEs the same number of
+    points per horizontal index. Pass an empty list for the fields of a
+    domain the PE does not hold. Collective over the PEs of both domains.
+    """
+
+    def redistribute(
+        self,
+        fields_in: Union[NDArray, list[NDArray]],
+        fields_out: Union[NDArray, list[NDArray]],
+    ):
+        MPI = self._MPI
+        if isinstance(fields_in, np.ndarray):
+            fields_in = [fields_in]
+        if isinstance(fields_out, np.ndarray):
+            fields_out = [fields_out]
+
+        sources = []
+        if self.geometry_in is not None:
+            sources = [
+                _to_compute(field, self.geometry_in, "fields_in") for field in fields_in
+            ]
+        targets = []
+        if self.geometry_out is not None:
+            targets = [
+                _to_compute(field, self.geometry_out, "fields_out")
+                for field in fields_out
+            ]
+        if sources and targets:
+            if len(sources) != len(targets):
+                raise ValueError("fields_in and fields_out must be paired")
+            for source, target in zip(sources, targets):
+                if source.shape[2:] != target.shape[2:]:
+                    raise ValueError(
+                        f"trailing shapes {source.shape[2:]} and "
+                        f"{target.shape[2:]} do not match"
+                    )
+
+        depth = sum(int(np.prod(field.shape[2:])) for field in sources or targets)
+        send_buffer, recv_buffer = self._get_buffers(depth)
+
+        requests = []
+        start = 0
+        for peer, region in self._recvs:
+            count = self._size(region) * depth
+            requests.append(
+                self.comm.Irecv(
+                    recv_buffer[start : start + count], source=peer, tag=_TAG
+                )
+            )
+            start += count
+
+        start = 0
+        for peer, region in self._sends:
+            first = start
+            for source in sources:
+                view = source[region]
+                send_buffer[start : start + view.size] = view.reshape(-1)
+                start += view.size
+            requests.append(
+                self.comm.Isend(send_buffer[first:start], dest=peer, tag=_TAG)
+            )
+
+        for send, recv in self._copies:
+            for source, target in zip(sources, targets):
+                target[recv] = source[send]
+
+        MPI.Request.Waitall(requests)
+
+        start = 0
+        for peer, region in self._recvs:
+            for target in targets:
+                view = target[region]
+                view[...] = recv_buffer[start : start + view.size].reshape(view.shape)
+                start += view.size
+
+    @staticmethod
+    def _size(region: tuple[slice, slice]) -> int:
+        return (region[0].stop - region[0].start) * (region[1].stop - region[1].start)
+
+    def _get_buffers(self, depth: int) -> tuple[NDArray, NDArray]:
+        buffers = self._buffers.get(depth)
+        if buffers is None:
+            nsend = sum(self._size(region) for _, region in self._sends) * depth
+            nrecv = sum(self._size(region) for _, region in self._recvs) * depth
+            buffers = (
+                np.empty(nsend, dtype=self.dtype),
+                np.empty(nrecv, dtype=self.dtype),
+            )
+            self._buffers[depth] = buffers
+        return buffers
+
+    """
+    Subroutine: free
+
+    Frees the communicator of the plan
+    """
+
+    def free(self):
+        self.comm.Free()
@@ -0,0 +1,268 @@
+from typing import Optional, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .py_mpp_domains import pyDomain, pyFMS_mpp_domains
+
+
+"""
+This module reduces groups of fields of a pyDomain over their compute
+domains with a single collective.
+
+The local sums, minima and maxima of all fields are packed into one array
+of 8-byte words, the sums, or their reproducible digits, followed by the
+maxima and the negated minima, and reduced by one Allreduce with a user
+defined operation that adds the sums and takes the maximum of the extrema,
+instead of one collective per field. The packed array is sent as a single
+element of a contiguous datatype, so that MPI cannot split it.
+
+The reproducible sums follow the bitwise-exact sums of FMS (mpp_efp): every
+value is split exactly into NUMINT integers of NUMBIT bits, fixed point
+digits weighted by powers of 2**NUMBIT. Integer sums are associative, so
+the digits summed locally and then over the PEs are the same for any
+decomposition, and so is the double they are converted back to. Values are
+represented down to 2**-138 and must be smaller than 2**138 in magnitude.
+
+On symmetric domains staggered compute domains share their edges with the
+neighboring PEs. Each shared point is only reduced on the PE to its west
+or south, so that every point of the global domain counts once.
+"""
+
+
+NUMBIT = 46
+NUMINT = 6
+_PREC = 2**NUMBIT
+# weights of the digits, 2**92 down to 2**-138
+_WEIGHTS = [2.0 ** (NUMBIT * (2 - i)) for i in range(NUMINT)]
+# a chunk of digits can be summed in int64 without overflow
+_CHUNK = 2**16
+
+OPS = ("sum", "min", "max")
+
+# header of the packed array, the number of digit words and of sums
+_HEADER = 2
+_op = None
+_datatypes: dict[int, object] = {}
+
+
+def _combine(inbuf, inoutbuf, datatype):
+    # adds the digits and the sums and takes the maximum of the extrema of
+    # two packed arrays, the headers are the same on all PEs
+    a = np.frombuffer(inbuf, dtype=np.float64)
+    b = np.frombuffer(inoutbuf, dtype=np.float64)
+    ndigits, nsums = (int(n) for n in b[:_HEADER].view(np.int64))
+    digits = slice(_HEADER, _HEADER + ndigits)
+    sums = slice(digits.stop, digits.stop + nsums)
+    b[digits].view(np.int64)[...] += a[digits].view(np.int64)
+    b[sums] += a[sums]
+    np.maximum(b[sums.stop :], a[sums.stop :], out=b[sums.stop :])
+
+
+def _allreduce(comm, MPI, packed: NDArray) -> NDArray:
+    # the packed array reduced with _combine over comm, the operation and
+    # the datatype of each size are created once
+    global _op
+    if _op is None:
+        _op = MPI.Op.Create(_combine, commute=True)
+    datatype = _datatypes.get(packed.size)
+    if datatype is None:
+        datatype = MPI.DOUBLE.Create_contiguous(packed.size).Commit()
+        _datatypes[packed.size] = datatype
+    total = np.empty_like(packed)
+    comm.Allreduce([packed, 1, datatype], [total, 1, datatype], op=_op)
+    return total
+
+
+def _normalize(digits: NDArray) -> NDArray:
+    # carries the digits along the first axis so that all but the leading
+    # one are in [0, 2**NUMBIT)
+    digits = digits.copy()
+    for i in range(NUMINT - 1, 0, -1):
+        carry = digits[i] >> NUMBIT
+        digits[i] -= carry << NUMBIT
+        digits[i - 1] += carry
+    return digits
+
+
+"""
+Function: reproducible_digits
+
+Returns: The NUMINT normalized int64 digits of the exact sum of values, the
+same for any order of the values
+"""
+
+
+def reproducible_digits(values: NDArray) -> NDArray:
+    remainder = np.asarray(values, dtype=np.float64).reshape(-1)
+    if remainder.size == 0:
+        return np.zeros(NUMINT, dtype=np.int64)
+    if not np.all(np.abs(remainder) < _WEIGHTS[0] * _PREC):
+        raise ValueError("values must be finite and smaller than 2**138")
+
+    digits = np.empty((NUMINT, remainder.size), dtype=np.int64)
+    for i, weight in enumerate(_WEIGHTS):
+        # exact, the weights are powers of two and the quotients integers
+        quotient = np.trunc(remainder / weight)
+        remainder = remainder - quotient * weight
+        digits[i] = quotient
+
+    starts = np.arange(0, remainder.size, _CHUNK)
+    chunks = _normalize(np.add.reduceat(digits, starts, axis=1))
+    return _normalize(chunks.sum(axis=1))
+
+
+"""
+Function: digits_to_float
+
+Returns: The double closest to the value of normalized digits, rounded
+the same way for the same digits
+"""
+
+
+def digits_to_float(digits: NDArray) -> float:
+    digits = _normalize(np.asarray(digits, dtype=np.int64))
+    sign = 1.0
+    if digits[0] < 0:
+        sign = -1.0
+        digits = _normalize(-digits)
+    # from the least significant digit, all digits are non-negative
+    value = 0.0
+    for digit, weight in zip(digits[::-1], _WEIGHTS[::-1]):
+        value += float(digit) * weight
+    return sign * value
+
+
+class pyGlobalReduction:
+    """
+    Batched global reductions over the compute domains of fields of a
+    pyDomain, see the module docstring. comm, MPI.COMM_WORLD by default,
+    must hold the PEs of the domain. The first reduction of a staggered
+    position on a symmetric domain is collective.
+    """
+
+    def __init__(self, domain: pyDomain, comm=None):
+        from mpi4py import MPI
+
+        self.domain = domain
+        self.comm = MPI.COMM_WORLD if comm is None else comm
+        self._MPI = MPI
+        self._owned: dict[int, tuple[int, int]] = {}
+
+    def _trim(self, position: Optional[int]) -> tuple[int, int]:
+        # points dropped from the east and north edges of the compute domain
+        position = pyFMS_mpp_domains.CENTER if position is None else position
+        trim = self._owned.get(position)
+        if trim is not None:
+            return trim
+        trim = (0, 0)
+        xshared = position in (pyFMS_mpp_domains.EAST, pyFMS_mpp_domains.CORNER)
+        yshared = position in (pyFMS_mpp_domains.NORTH, pyFMS_mpp_domains.CORNER)
+        if self.domain.symmetry and (xshared or yshared):
+            geometry = self.domain.geometry(position)
+            own = np.array([geometry.iec, geometry.jec], dtype=np.int64)
+            ends = np.empty((self.comm.Get_size(), 2), dtype=np.int64)
+            self.comm.Allgather(own, ends)
+            trim = (
+                int(xshared and geometry.iec < ends[:, 0].max()),
+                int(yshared and geometry.jec < ends[:, 1].max()),
+            )
+        self._owned[position] = trim
+        return trim
+
+    def _owned_points(self, field: NDArray, position: Optional[int]) -> NDArray:
+        geometry = self.domain.geometry(position)
+        if field.shape[:2] == geometry.data_shape:
+            field = field[geometry.compute_slice]
+        elif field.shape[:2] != geometry.compute_shape:
+            raise ValueError(
+                f"field of shape {field.shape} matches neither the data domain "
+                f"{geometry.data_shape} nor the compute domain "
+                f"{geometry.compute_shape}"
+            )
+        xtrim, ytrim = self._trim(position)
+        return field[: field.shape[0] - xtrim, : field.shape[1] - ytrim]
+
+    """
+    Function: reduce
+
+    Reduces each field over the compute domains of all PEs, including the
+    vertical levels. ops is "sum", "min" or "max", or one of them per field,
+    positions the staggering position per field, CENTER by default. With
+    reproducible set sums are bitwise identical for any decomposition.
+    Collective over comm, one Allreduce for all fields.
+
+    Returns: A float64 array of the result per field
+    """
+
+    def reduce(
+        self,
+        fields: list[NDArray],
+        ops: Union[str, list[str]] = "sum",
+        positions: Optional[list[Optional[int]]] = None,
+        reproducible: bool = False,
+    ) -> NDArray:
+        MPI = self._MPI
+        nfields = len(fields)
+        ops = [ops] * nfields if isinstance(ops, str) else list(ops)
+        positions = [None] * nfields if positions is None else list(positions)
+        if len(ops) != nfields or len(positions) != nfields:
+            raise ValueError("ops and positions must be given for every field")
+        for op in ops:
+            if op not in OPS:
+                raise ValueError(f"op must be one of {OPS}, got {op}")
+
+        points = [
+            self._owned_points(field, position)
+            for field, position in zip(fields, positions)
+        ]
+        sums = [i for i, op in enumerate(ops) if op == "sum"]
+        extrema = [i for i, op in enumerate(ops) if op != "sum"]
+        results = np.empty(nfields, dtype=np.float64)
+        if nfields == 0:
+            return results
+
+        if reproducible:
+            digits = [reproducible_digits(points[i]) for i in sums]
+            local_sums = np.empty(0, dtype=np.float64)
+        else:
+            digits = []
+            local_sums = np.array(
+                [np.sum(points[i], dtype=np.float64) for i in sums], dtype=np.float64
+            )
+
+        # minima are negated so that all extrema reduce with the maximum
+        local_extrema = np.empty(len(extrema), dtype=np.float64)
+        for k, i in enumerate(extrema):
+            if points[i].size == 0:
+                local_extrema[k] = -np.inf
+            elif ops[i] == "max":
+                local_extrema[k] = np.max(points[i])
+            else:
+                local_extrema[k] = -np.min(points[i])
+
+        ndigits = NUMINT * len(digits)
+        header = np.array([ndigits, local_sums.size], dtype=np.int64)
+        packed = np.concatenate(
+            [
+                header.view(np.float64),
+                np.concatenate(digits or [np.empty(0, np.int64)]).view(np.float64),
+                local_sums,
+                local_extrema,
+            ]
+        )
+        total = _allreduce(self.comm, MPI, packed)
+
+        start = _HEADER
+        if reproducible:
+            total_digits = total[start : start + ndigits].view(np.int64)
+            for i, field_digits in zip(sums, total_digits.reshape(-1, NUMINT)):
+                results[i] = digits_to_float(field_digits)
+        else:
+            results[sums] = total[start : start + len(sums)]
+        start += ndigits + local_sums.size
+        for k, i in enumerate(extrema):
+            value = total[start + k]
+            results[i] = value if ops[i] == "max" else -value
+
+        return results
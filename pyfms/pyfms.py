@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
 import ctypes
+import logging
 import os
 from typing import Optional
 
+from .pyfms_utils import executor, library, profiling
 from .pyfms_utils.data_handling import set_Cchar, setscalar_Cint32
+from .pyfms_utils.function_registry import get_registry
+
+
+_logger = logging.getLogger(__name__)
 
 
 class pyFMS:
@@ -18,6 +24,7 @@ class pyFMS:
         ndomain: int = None,
         nnest_domain: int = None,
         calendar_type: int = None,
+        finalize_at_exit: bool = True,
     ):
         self.cFMS_path = cFMS_path
         self.cFMS = cFMS
@@ -26,17 +33,15 @@ class pyFMS:
         self.ndomain = ndomain
         self.nnest_domain = nnest_domain
         self.calendar_type = calendar_type
+        self.finalize_at_exit = finalize_at_exit
 
-        if self.cFMS_path is None:
-            raise ValueError(
-                "Please define the library file path, e.g., as  libFMS(cFMS_path=./cFMS.so)"
-            )
-
-        if not os.path.isfile(self.cFMS_path):
-            raise ValueError(f"Library {self.cFMS_path} does not exist")
-
+        # the library is opened once per process and shared with the wrappers
         if self.cFMS is None:
-            self.cFMS = ctypes.cdll.LoadLibrary(self.cFMS_path)
+            self.cFMS = library.load_library(self.cFMS_path)
+        else:
+            library.set_library(self.cFMS)
+
+        self._registry = get_registry(self.cFMS)
 
         self.pyfms_init(
             self.localcomm,
@@ -46,6 +51,12 @@ class pyFMS:
             self.calendar_type,
         )
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.pyfms_end()
+
     """
     Subroutine: pyfms_end
 
@@ -53,14 +64,34 @@ class pyFMS:
     Termination routine for the fms module. It also calls destructor routines
     for the mpp, mpp_domains, and mpp_io modules. If this routine is called
     more than once it will return silently. There are no arguments.
+    FMS is only ended once per process, by this method, by leaving the
+    pyFMS context or at exit if finalize_at_exit is set.
+    When profiling is enabled, the profile table across PEs is gathered on
+    the root PE before FMS is terminated and logged at INFO level to the
+    pyfms.pyfms logger, nothing is written to stdout.
+
+    Returns: The profile table on the root PE when profiling is enabled,
+    None otherwise
     """
 
-    def pyfms_end(self):
-        _cfms_end = self.cFMS.cFMS_end
+    def pyfms_end(self) -> Optional[str]:
+        if not library.is_initialized(self.cFMS):
+            return None
 
-        _cfms_end.restype = None
+        # cFMS_end finalizes MPI, which must happen on this thread
+        executor.shutdown_executor()
+
+        table = None
+        if profiling.is_enabled():
+            table = profiling.report()
+            if table is not None:
+                _logger.info("cFMS call profile\n%s", table)
+
+        _cfms_end = self._registry.get("cFMS_end", argtypes=[], restype=None)
 
         _cfms_end()
+        library.mark_ended(self.cFMS)
+        return table
 
     """
     Subroutine: pyfms_init
@@ -73,6 +104,9 @@ class pyFMS:
     routine will be called automatically by other fms_mod routines, users
     should explicitly call fms_init. If this routine is called more than once
     it will return silently. There are no arguments.
+    cFMS_init is only called once per process, pyFMS instances created after
+    the first share its initialization and ignore their arguments. Raises a
+    RuntimeError if FMS has already ended.
     """
 
     def pyfms_init(
@@ -83,7 +117,10 @@ class pyFMS:
         nnest_domain: Optional[int] = None,
         calendar_type: Optional[int] = None,
     ):
-        _cfms_init = self.cFMS.cFMS_init
+        if library.is_initialized(self.cFMS):
+            return
+        if library.is_ended(self.cFMS):
+            raise RuntimeError("FMS cannot be initialized again after it has ended")
 
         localcomm_c, localcomm_t = setscalar_Cint32(localcomm)
         alt_input_nml_path_c, alt_input_nml_path_t = set_Cchar(alt_input_nml_path)
@@ -91,14 +128,17 @@ class pyFMS:
         nnest_domain_c, nnest_domain_t = setscalar_Cint32(nnest_domain)
         calendar_type_c, calendar_type_t = setscalar_Cint32(calendar_type)
 
-        _cfms_init.argtypes = [
-            localcomm_t,
-            alt_input_nml_path_t,
-            ndomain_t,
-            nnest_domain_t,
-            calendar_type_t,
-        ]
-        _cfms_init.restype = None
+        _cfms_init = self._registry.get(
+            "cFMS_init",
+            argtypes=[
+                localcomm_t,
+                alt_input_nml_path_t,
+                ndomain_t,
+                nnest_domain_t,
+                calendar_type_t,
+            ],
+            restype=None,
+        )
 
         _cfms_init(
             localcomm_c,
@@ -107,6 +147,9 @@ class pyFMS:
             nnest_domain_c,
             calendar_type_c,
         )
+        library.mark_initialized(
+            self.cFMS, finalizer=self.pyfms_end if self.finalize_at_exit else None
+        )
 
     """
     Subroutine: pyfms_set_pelist_npes
@@ -115,11 +158,10 @@ class pyFMS:
     """
 
     def set_pelist_npes(self, npes_in: int):
-        _cfms_set_npes = self.cFMS.cFMS_set_pelist_npes
-
         npes_in_c, npes_in_t = setscalar_Cint32(npes_in)
 
-        _cfms_set_npes.argtypes = [npes_in_t]
-        _cfms_set_npes.restype = None
+        _cfms_set_npes = self._registry.get(
+            "cFMS_set_pelist_npes", argtypes=[npes_in_t], restype=None
+        )
 
         _cfms_set_npes(npes_in_c)
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 
+import contextlib
 import ctypes
-from typing import Tuple
+import functools
+import os
+import sys
+import threading
+from typing import Any, Optional, Tuple
 
 import numpy as np
 import numpy.typing as npt
@@ -11,11 +16,13 @@ import numpy.typing as npt
 This module allows for conversion between Python object and ctypes objects.
 for use in the C based methods which wrap the Fortan FMS source methods.
 
-Array methods: Will return an instance of the object passed and a pointer to
-               the object. Arrays are mutable types in Python and do not
+Array methods: Will return a raw pointer to the data of the array passed and
+               the pointer type. Arrays are mutable types in Python and do not
                require the a ctypes object to wrap it. If the array object
                is updated by the method the original Python object will
-               also contain these updates
+               also contain these updates. The pointer type only depends on
+               the dtype, the shape of the array is passed to cFMS
+               explicitly, so the type can be bound once per entry point.
 
 Scalar methods: Will return a reference to a ctypes object wrapping the passed
                 Python object and a pointer to the new ctypes object.
@@ -25,19 +32,29 @@ Scalar methods: Will return a reference to a ctypes object wrapping the passed
                 explicit ctypes object to wrap passed Python object, but also
                 return the value of the ctypes object to update the value.
 
-All passed in NumPy arrays must make use of the "FORTRAN" flag during
-initialization
+All passed in NumPy arrays must be C-contiguous, cFMS takes the explicit shape
+of the array and reorders the data for Fortran. Arrays that are not
+C-contiguous or not aligned are copied by check_array before being passed.
+
+Strict mode: Hidden copies can be audited with set_strict_mode. In "count"
+             mode every copy made by check_array is recorded against the
+             call site outside of pyfms that passed the array, see
+             copy_stats. In "raise" mode an ArrayCopyError is raised instead
+             of copying. The mode can also be set with the environment
+             variable PYFMS_STRICT_ARRAYS. Strict mode does not slow down the
+             fast path, arrays that need no copy are never inspected.
 
 Example: Wrapping C function that updates an integer and an array
 
 def wrapper_func(py_scalar_obj: int, py_array_obj: npt.NDArray[int])-> int:
-    _c_func = clib.c_func
-
     c_scalar_obj = ctypes.c_int(py_scalar_obj)
     c_array_p, c_array_t = setarray_Cint32(py_array_obj)
 
-    _c_func.argtypes = [ctype.POINTER(ctype.c_int), c_array_t]
-    _c_func.restype = None
+    _c_func = get_registry(clib).get(
+        "c_func",
+        argtypes=[ctypes.POINTER(ctypes.c_int), c_array_t],
+        restype=None,
+    )
 
     _c_func(ctypes.byref(c_scalar_obj), c_array_p)
 
@@ -56,44 +73,256 @@ Array setting methods
 """
 
 
-def set_ndpointer(arg: npt.NDArray) -> np.ctypeslib.ndpointer:
-    c_type = np.ctypeslib.as_ctypes_type(arg.dtype)
-    return np.ctypeslib.ndpointer(dtype=c_type, ndim=arg.ndim, shape=arg.shape)
+_bool = np.dtype(np.bool_)
+_float64 = np.dtype(np.float64)
+_float32 = np.dtype(np.float32)
+_int32 = np.dtype(np.int32)
 
+_pointer_types: dict[np.dtype, Any] = {
+    _bool: ctypes.POINTER(ctypes.c_bool),
+    _float64: ctypes.POINTER(ctypes.c_double),
+    _float32: ctypes.POINTER(ctypes.c_float),
+    _int32: ctypes.POINTER(ctypes.c_int),
+}
 
-def setarray_Cbool(
-    arg: npt.NDArray[np.bool_],
-) -> Tuple[npt.NDArray[np.bool_], np.ctypeslib.ndpointer]:
-    if arg is None:
-        return arg, ctypes.POINTER(ctypes.c_bool)
-    else:
-        return arg, set_ndpointer(arg)
 
+"""
+Strict mode settings and copy statistics
+"""
 
-def setarray_Cdouble(
-    arg: npt.NDArray[np.float64],
-) -> Tuple[npt.NDArray[np.float64], np.ctypeslib.ndpointer]:
-    if arg is None:
-        return arg, ctypes.POINTER(ctypes.c_double)
-    else:
-        return arg, set_ndpointer(arg)
 
+STRICT_MODES = ("off", "count", "raise")
 
-def setarray_Cfloat(
-    arg: npt.NDArray[np.float32],
-) -> Tuple[npt.NDArray[np.float32], np.ctypeslib.ndpointer]:
-    if arg is None:
-        return arg, ctypes.POINTER(ctypes.c_float)
-    else:
-        return arg, set_ndpointer(arg)
+_strict_mode = os.environ.get("PYFMS_STRICT_ARRAYS", "off") or "off"
+if _strict_mode not in STRICT_MODES:
+    raise ValueError(
+        f"PYFMS_STRICT_ARRAYS must be one of {STRICT_MODES}, got {_strict_mode}"
+    )
+
+_copy_stats: dict = {}
+_copy_stats_lock = threading.Lock()
+_this_file = os.path.abspath(__file__)
+_package_dir = os.path.dirname(os.path.dirname(_this_file)) + os.sep
+
+
+class ArrayCopyError(ValueError):
+    """
+    Raised in strict "raise" mode when an array would have to be copied
+    before being passed to cFMS.
+    """
+
+
+"""
+Subroutine: set_strict_mode
+
+Sets the strict mode to "off", "count" or "raise" and returns the previous
+mode.
+"""
+
+
+def set_strict_mode(mode: str) -> str:
+    global _strict_mode
+    if mode not in STRICT_MODES:
+        raise ValueError(f"strict mode must be one of {STRICT_MODES}, got {mode}")
+    previous, _strict_mode = _strict_mode, mode
+    return previous
+
+
+def get_strict_mode() -> str:
+    return _strict_mode
+
+
+"""
+Function: strict_mode
+
+Context manager setting the strict mode for the enclosed block only.
+"""
+
+
+@contextlib.contextmanager
+def strict_mode(mode: str = "raise"):
+    previous = set_strict_mode(mode)
+    try:
+        yield
+    finally:
+        set_strict_mode(previous)
+
+
+"""
+Function: copy_stats
+
+Returns: A dictionary keyed by call site, "filename:lineno", of the code
+outside of pyfms that passed the copied arrays. Each entry holds the pyfms
+function that made the copy, the number of copies per reason and the total
+number of bytes copied. Only filled in "count" mode.
+"""
 
 
-def setarray_Cint32(
-    arg: npt.NDArray[np.int32],
-) -> Tuple[npt.NDArray[np.int32], np.ctypeslib.ndpointer]:
+def copy_stats() -> dict:
+    with _copy_stats_lock:
+        return {
+            site: dict(entry, reasons=dict(entry["reasons"]))
+            for site, entry in _copy_stats.items()
+        }
+
+
+def reset_copy_stats():
+    with _copy_stats_lock:
+        _copy_stats.clear()
+
+
+def _copy_reason(arg: npt.NDArray) -> str:
+    if not arg.flags.aligned:
+        return "misaligned"
+    if arg.flags.f_contiguous:
+        return "fortran_order"
+    if arg.ndim > 1 and arg.strides[0] < arg.strides[-1]:
+        return "transposed"
+    return "non_contiguous"
+
+
+def _call_site() -> Tuple[str, str]:
+    # the innermost pyfms wrapper and the first frame outside of pyfms
+    frame = sys._getframe(1)
+    function = "check_array"
+    in_data_handling = True
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if not filename.startswith(_package_dir):
+            return f"{frame.f_code.co_filename}:{frame.f_lineno}", function
+        if in_data_handling and filename != _this_file:
+            function = frame.f_code.co_qualname
+            in_data_handling = False
+        frame = frame.f_back
+    return "<unknown>", function
+
+
+def _record_copy(arg: npt.NDArray):
+    reason = _copy_reason(arg)
+    site, function = _call_site()
+    if _strict_mode == "raise":
+        raise ArrayCopyError(
+            f"{function} called from {site} would copy a {reason} array of "
+            f"shape {arg.shape}, pass a C-contiguous aligned array instead"
+        )
+    with _copy_stats_lock:
+        entry = _copy_stats.setdefault(
+            site, {"function": function, "copies": 0, "bytes": 0, "reasons": {}}
+        )
+        entry["copies"] += 1
+        entry["bytes"] += arg.nbytes
+        entry["reasons"][reason] = entry["reasons"].get(reason, 0) + 1
+
+
+"""
+Function: check_array
+
+Fast path check of an array before its data pointer is handed to cFMS.
+The dtype and, if given, the rank of the array must match. If writeable is
+True the array must also be writeable. An array that is C-contiguous and
+aligned is returned as is, otherwise a C-contiguous copy is returned. In
+strict mode the copy is counted, or an ArrayCopyError is raised. Methods
+that pass an array to be updated should copy the data of a returned copy
+back into the original array.
+
+Returns: arg or a C-contiguous copy of arg
+"""
+
+
+def check_array(
+    arg: npt.NDArray,
+    dtype: np.dtype,
+    ndim: Optional[int] = None,
+    writeable: bool = False,
+) -> npt.NDArray:
+    try:
+        if (
+            arg.flags.carray
+            and arg.dtype == dtype
+            and (ndim is None or arg.ndim == ndim)
+        ):
+            return arg
+    except AttributeError:
+        raise TypeError(f"expected a NumPy array, got {type(arg).__name__}")
+
+    if arg.dtype != dtype:
+        raise TypeError(f"array must have data type {dtype}, got {arg.dtype}")
+    if ndim is not None and arg.ndim != ndim:
+        raise TypeError(f"array must have {ndim} dimension(s), got {arg.ndim}")
+    if writeable and not arg.flags.writeable:
+        raise ValueError("array is read-only and cannot be updated by cFMS")
+    if arg.flags.c_contiguous and arg.flags.aligned:
+        return arg
+
+    if _strict_mode != "off":
+        _record_copy(arg)
+    return np.ascontiguousarray(arg)
+
+
+"""
+Subroutine: check_size
+
+Raises a ValueError if arg holds fewer than size elements. For cFMS calls
+that take no shape argument and would otherwise read or write past the end
+of an undersized array.
+"""
+
+
+def check_size(arg: npt.NDArray, size: int, name: str):
+    if arg.size < size:
+        raise ValueError(f"{name} must have at least {size} elements, got {arg.size}")
+
+
+def _setarray(
+    arg: npt.NDArray, dtype: np.dtype, ndim: Optional[int]
+) -> Tuple[Any, type]:
+    pointer_t = _pointer_types[dtype]
     if arg is None:
-        return arg, ctypes.POINTER(ctypes.c_int)
-    return arg, set_ndpointer(arg)
+        return arg, pointer_t
+    return check_array(arg, dtype, ndim).ctypes.data_as(pointer_t), pointer_t
+
+
+"""
+Function: set_ndpointer
+
+Returns: An ndpointer type, checking the dtype and rank of arg, that also
+accepts None. The setarray methods pass raw pointers instead, this is kept
+for callers binding their own ndpointer argtypes.
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _nullable_ndpointer(dtype: np.dtype, ndim: Optional[int] = None) -> type:
+    base = np.ctypeslib.ndpointer(dtype=dtype, ndim=ndim)
+
+    def from_param(cls, obj):
+        if obj is None:
+            return None
+        return base.from_param(obj)
+
+    return type(
+        f"nullable_{base.__name__}", (base,), {"from_param": classmethod(from_param)}
+    )
+
+
+def set_ndpointer(arg: npt.NDArray) -> np.ctypeslib.ndpointer:
+    return _nullable_ndpointer(arg.dtype, arg.ndim)
+
+
+def setarray_Cbool(arg: npt.NDArray, ndim: Optional[int] = None) -> Tuple[Any, type]:
+    return _setarray(arg, _bool, ndim)
+
+
+def setarray_Cdouble(arg: npt.NDArray, ndim: Optional[int] = None) -> Tuple[Any, type]:
+    return _setarray(arg, _float64, ndim)
+
+
+def setarray_Cfloat(arg: npt.NDArray, ndim: Optional[int] = None) -> Tuple[Any, type]:
+    return _setarray(arg, _float32, ndim)
+
+
+def setarray_Cint32(arg: npt.NDArray, ndim: Optional[int] = None) -> Tuple[Any, type]:
+    return _setarray(arg, _int32, ndim)
 
 
 """
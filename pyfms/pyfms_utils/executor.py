@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+import threading
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from numpy.typing import NDArray
+
+from .function_registry import add_function_wrapper, remove_function_wrapper
+
+
+"""
+This module runs cFMS calls on a single dedicated thread.
+
+FMS is not thread-safe, but ctypes releases the GIL while a foreign function
+runs. A cFMSExecutor owns one worker thread, and the future returning
+send_data, override and update_domains methods queue the corresponding
+wrapper calls on it, so that NumPy work on other threads overlaps FMS I/O and
+communication.
+
+With confine set, the default, every other cFMS call made while calls are
+queued on the executor is also handed to the worker thread and waited on,
+so cFMS is never entered from two threads at once. The confining wrapper is
+only installed on the FunctionRegistry while calls are queued, once the
+last one has completed cFMS calls are made on the calling thread again
+without a thread hop. MPI must be initialized with at least
+MPI_THREAD_SERIALIZED, e.g. by mpi4py before pyFMS.
+
+Arrays passed to a queued call belong to cFMS until its future is done. They
+must not be modified, and arrays updated in place, as in update_domains, must
+not be read before then.
+
+get_executor returns an executor shared by the process, used e.g. by the
+non-blocking halo updates of pyDomain. pyFMS.pyfms_end shuts it down before
+FMS ends, as MPI must be finalized on the thread that initialized it.
+
+Example:
+
+with cFMSExecutor() as executor:
+    future = executor.update_domains(mpp_domains, field, domain_id=0)
+    next_field = compute(next_field)
+    future.result()
+"""
+
+
+class cFMSExecutor:
+    def __init__(self, confine: bool = True):
+        _check_mpi_thread_level()
+        self.confine = confine
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cFMS")
+        # the single worker thread lives until shutdown
+        self._thread_id = self._executor.submit(threading.get_ident).result()
+        # calls queued by submit, the confining wrapper is installed while
+        # there are any
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _confined(self, symbol: str, function: Callable) -> Callable:
+        def confined(*args):
+            if threading.get_ident() == self._thread_id:
+                return function(*args)
+            return self._executor.submit(function, *args).result()
+
+        return confined
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    """
+    Function: submit
+
+    Queues fn(*args, **kwargs) on the cFMS thread
+
+    Returns: A concurrent.futures.Future of the result of fn
+    """
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if not self.confine:
+            return self._executor.submit(fn, *args, **kwargs)
+
+        def run():
+            # released before the future is done, so that the caller of
+            # result sees the wrapper removed
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._release()
+
+        self._acquire()
+        try:
+            return self._executor.submit(run)
+        except BaseException:
+            self._release()
+            raise
+
+    def _acquire(self):
+        with self._pending_lock:
+            self._pending += 1
+            if self._pending == 1:
+                add_function_wrapper(self._confined)
+
+    def _release(self):
+        with self._pending_lock:
+            self._pending -= 1
+            if self._pending == 0:
+                remove_function_wrapper(self._confined)
+
+    """
+    Function: send_data
+
+    Queues DiagManager.send_data on the cFMS thread
+
+    Returns: A Future of the result of send_data
+    """
+
+    def send_data(
+        self,
+        diag_manager: Any,
+        diag_field_id: int,
+        field_shape: list[int],
+        field: NDArray,
+    ) -> Future:
+        return self.submit(diag_manager.send_data, diag_field_id, field_shape, field)
+
+    """
+    Function: override
+
+    Queues pyDataOverride.override on the cFMS thread, the arguments after
+    data_override are passed on as is
+
+    Returns: A Future of the overridden data
+    """
+
+    def override(self, data_override: Any, *args, **kwargs) -> Future:
+        return self.submit(data_override.override, *args, **kwargs)
+
+    """
+    Function: update_domains
+
+    Queues pyFMS_mpp_domains.update_domains on the cFMS thread, the keyword
+    arguments are passed on as is. field is updated in place once the
+    future is done.
+
+    Returns: A Future of the result of update_domains
+    """
+
+    def update_domains(self, mpp_domains: Any, field: NDArray, **kwargs) -> Future:
+        return self.submit(mpp_domains.update_domains, field, **kwargs)
+
+    """
+    Subroutine: shutdown
+
+    Waits for the queued calls if wait is set and stops the cFMS thread.
+    cFMS calls are made on the calling thread again afterwards.
+    """
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+def _check_mpi_thread_level():
+    # importing mpi4py.MPI initializes MPI unless FMS already did, in which
+    # case the thread level FMS initialized it with is queried
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        warnings.warn(
+            "mpi4py is not installed, the MPI thread level cannot be checked, "
+            "cFMS calls on a dedicated thread need at least "
+            "MPI_THREAD_SERIALIZED",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return
+    if not MPI.Is_initialized() or MPI.Is_finalized():
+        return
+    if MPI.Query_thread() < MPI.THREAD_SERIALIZED:
+        raise RuntimeError(
+            "cFMS calls on a dedicated thread need MPI to be initialized with "
+            "at least MPI_THREAD_SERIALIZED"
+        )
+
+
+_shared_executor: Optional[cFMSExecutor] = None
+_shared_lock = threading.Lock()
+
+
+"""
+Function: get_executor
+
+Returns: The cFMSExecutor shared by the process, created on first use
+"""
+
+
+def get_executor() -> cFMSExecutor:
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = cFMSExecutor()
+        return _shared_executor
+
+
+"""
+Subroutine: shutdown_executor
+
+Waits for the calls queued on the shared executor and shuts it down. A new
+shared executor is created by the next get_executor.
+"""
+
+
+def shutdown_executor():
+    global _shared_executor
+    with _shared_lock:
+        executor, _shared_executor = _shared_executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import ctypes
+import threading
+import weakref
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+
+"""
+This module binds the cFMS entry points used by the pyFMS wrapper classes.
+
+Looking a symbol up on a ctypes.CDLL returns a function object that is cached
+on the library and shared by every caller. Assigning argtypes and restype to
+that object on each call is slow and is not thread-safe. The FunctionRegistry
+instead resolves every cFMS_* symbol into a private function object, sets its
+argtypes and restype once, and hands the same bound object back on every
+subsequent call.
+
+Entries are keyed by (symbol, dtype, rank). Entry points whose array argument
+types depend on the data being passed should supply the dtype and rank of that
+data; all other entry points can leave both as None.
+
+Function wrappers, e.g. the ones installed by pyfms_utils.profiling and
+pyfms_utils.executor, can be added with add_function_wrapper. The wrapped
+functions replace the bound ones in every registry, so the cost of a wrapper
+is only paid while it is installed.
+
+Example: Wrapping C function that updates an integer and an array
+
+def wrapper_func(cFMS: ctypes.CDLL, py_array_obj: npt.NDArray[np.int32]) -> int:
+    c_array_p, c_array_t = setarray_Cint32(py_array_obj)
+
+    _c_func = get_registry(cFMS).get(
+        "c_func", argtypes=[c_array_t], restype=ctypes.c_int
+    )
+
+    return _c_func(c_array_p)
+"""
+
+
+class FunctionRegistry:
+    def __init__(self, cFMS: ctypes.CDLL):
+        self.cFMS = cFMS
+        self._functions: dict[tuple, Any] = {}
+        self._bound: dict[tuple, Any] = {}
+        self._wrappers: tuple[Callable, ...] = _function_wrappers
+        self._lock = threading.Lock()
+
+    """
+    Function: get
+
+    Returns the function bound to symbol, dtype and rank. The argtypes and
+    restype are only applied the first time the key is requested; later
+    requests return the cached function object as is.
+    """
+
+    def get(
+        self,
+        symbol: str,
+        argtypes: Optional[Sequence] = None,
+        restype: Any = None,
+        dtype: Optional[Hashable] = None,
+        rank: Optional[int] = None,
+    ):
+        try:
+            return self._functions[(symbol, dtype, rank)]
+        except KeyError:
+            return self._bind((symbol, dtype, rank), argtypes, restype)
+
+    def _bind(self, key: tuple, argtypes: Optional[Sequence], restype: Any):
+        with self._lock:
+            function = self._functions.get(key)
+            if function is None:
+                # item access returns a new function object rather than the
+                # one cached on the CDLL, so the types set here are private
+                function = self.cFMS[key[0]]
+                if argtypes is not None:
+                    function.argtypes = list(argtypes)
+                function.restype = restype
+                self._bound[key] = function
+                function = self._wrap(key[0], function)
+                self._functions[key] = function
+        return function
+
+    def _wrap(self, symbol: str, function):
+        for wrapper in self._wrappers:
+            function = wrapper(symbol, function)
+        return function
+
+    """
+    Subroutine: set_wrappers
+
+    Sets the function wrappers of the registry, each wrapper(symbol, function)
+    returns a callable wrapping function. The wrappers are applied in order,
+    the last one is the outermost. An empty tuple hands out the bound
+    functions again.
+    """
+
+    def set_wrappers(self, wrappers: tuple[Callable, ...]):
+        with self._lock:
+            self._wrappers = tuple(wrappers)
+            self._functions = {
+                key: self._wrap(key[0], function)
+                for key, function in self._bound.items()
+            }
+
+    """
+    Function: is_bound
+
+    Returns: True if symbol has been bound for the given dtype and rank
+    """
+
+    def is_bound(
+        self,
+        symbol: str,
+        dtype: Optional[Hashable] = None,
+        rank: Optional[int] = None,
+    ) -> bool:
+        return (symbol, dtype, rank) in self._functions
+
+    """
+    Subroutine: clear
+
+    Drops all bound functions, they will be rebound on their next use
+    """
+
+    def clear(self):
+        with self._lock:
+            self._functions.clear()
+            self._bound.clear()
+
+
+_registries: "weakref.WeakKeyDictionary[ctypes.CDLL, FunctionRegistry]" = (
+    weakref.WeakKeyDictionary()
+)
+_registries_lock = threading.Lock()
+_function_wrappers: tuple[Callable, ...] = ()
+
+
+"""
+Function: get_registry
+
+Returns: The FunctionRegistry of the loaded library cFMS. One registry
+is created per library and shared by all the wrapper classes using it.
+"""
+
+
+def get_registry(cFMS: ctypes.CDLL) -> FunctionRegistry:
+    try:
+        return _registries[cFMS]
+    except KeyError:
+        with _registries_lock:
+            registry = _registries.get(cFMS)
+            if registry is None:
+                registry = FunctionRegistry(cFMS)
+                _registries[cFMS] = registry
+        return registry
+
+
+"""
+Subroutine: add_function_wrapper
+
+Adds wrapper as the outermost function wrapper of all existing registries and
+of the registries created afterwards.
+"""
+
+
+def add_function_wrapper(wrapper: Callable):
+    global _function_wrappers
+    with _registries_lock:
+        _function_wrappers = _function_wrappers + (wrapper,)
+        for registry in list(_registries.values()):
+            registry.set_wrappers(_function_wrappers)
+
+
+"""
+Subroutine: remove_function_wrapper
+
+Removes wrapper from all registries
+"""
+
+
+def remove_function_wrapper(wrapper: Callable):
+    global _function_wrappers
+    with _registries_lock:
+        _function_wrappers = tuple(w for w in _function_wrappers if w != wrapper)
+        for registry in list(_registries.values()):
+            registry.set_wrappers(_function_wrappers)
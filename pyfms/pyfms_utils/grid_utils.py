@@ -3,6 +3,9 @@ import ctypes
 import numpy as np
 import numpy.typing as npt
 
+from .data_handling import check_size, setarray_Cdouble
+from .function_registry import get_registry
+
 
 class GridUtils:
     @staticmethod
@@ -15,38 +18,35 @@ class GridUtils:
     ) -> npt.NDArray[np.float64]:
 
         ncells = nlon * nlat
-        ngridpts = (nlon + 1) * (nlat + 1)
+
+        # cFMS takes no array sizes, lon and lat hold the cell corners
+        check_size(lon, (nlon + 1) * (nlat + 1), "lon")
+        check_size(lat, (nlon + 1) * (nlat + 1), "lat")
 
         nlon_t = ctypes.c_int
         nlat_t = ctypes.c_int
-        lon_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngridpts), flags="C_CONTIGUOUS"
-        )
-        lat_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ngridpts), flags="C_CONTIGUOUS"
-        )
-        area_ndp = np.ctypeslib.ndpointer(
-            dtype=np.float64, shape=(ncells), flags="C_CONTIGUOUS"
-        )
 
-        nlon_c = nlon_t(nlon)
-        nlat_c = nlat_t(nlat)
         area = np.zeros(ncells, dtype=np.float64)
 
-        _get_grid_area = cfms.cFMS_get_grid_area
-
-        _get_grid_area.restype = None
-        _get_grid_area.argtypes = [
-            ctypes.POINTER(nlon_t),
-            ctypes.POINTER(nlat_t),
-            lon_ndp,
-            lat_ndp,
-            area_ndp,
-        ]
+        lon_p, lon_t = setarray_Cdouble(lon, ndim=1)
+        lat_p, lat_t = setarray_Cdouble(lat, ndim=1)
+        area_p, area_t = setarray_Cdouble(area)
+
+        _get_grid_area = get_registry(cfms).get(
+            "cFMS_get_grid_area",
+            argtypes=[
+                ctypes.POINTER(nlon_t),
+                ctypes.POINTER(nlat_t),
+                lon_t,
+                lat_t,
+                area_t,
+            ],
+            restype=None,
+        )
 
         nlon_c = nlon_t(nlon)
         nlat_c = nlat_t(nlat)
 
-        _get_grid_area(ctypes.byref(nlon_c), ctypes.byref(nlat_c), lon, lat, area)
+        _get_grid_area(ctypes.byref(nlon_c), ctypes.byref(nlat_c), lon_p, lat_p, area_p)
 
         return area
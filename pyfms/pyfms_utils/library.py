@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import atexit
+import ctypes
+import os
+import sys
+import threading
+import weakref
+from typing import Callable, Optional
+
+
+"""
+This module holds the process wide handle of the cFMS library and the state
+of FMS.
+
+load_library opens each library file once per process. Every later request
+for the same file returns the same ctypes.CDLL, so the file check and dlopen
+are only paid once. The handle loaded or passed last by pyFMS is shared; the
+wrapper classes constructed without a library use get_library to pick it up.
+
+The lifecycle of FMS is tracked per handle. cFMS_init is only called for a
+handle that has not been initialized, and cFMS_end only for a handle that is
+initialized and has not ended. FMS cannot be initialized again after it has
+ended, as MPI has been finalized. A finalizer registered with mark_initialized
+is run at exit for handles that were not ended explicitly.
+"""
+
+
+LOADED = "loaded"
+INITIALIZED = "initialized"
+ENDED = "ended"
+
+_libraries: dict[str, ctypes.CDLL] = {}
+_status: "weakref.WeakKeyDictionary[ctypes.CDLL, str]" = weakref.WeakKeyDictionary()
+_finalizers: dict[int, Callable] = {}
+_shared: Optional[ctypes.CDLL] = None
+_lock = threading.RLock()
+_atexit_registered = False
+
+
+"""
+Function: load_library
+
+Returns: The ctypes.CDLL of the library at cFMS_path, loaded only the first
+time the file is requested. The library becomes the shared handle.
+"""
+
+
+def load_library(cFMS_path: str) -> ctypes.CDLL:
+    if cFMS_path is None:
+        raise ValueError(
+            "Please define the library file path, e.g., as  libFMS(cFMS_path=./cFMS.so)"
+        )
+    key = os.path.realpath(cFMS_path)
+    with _lock:
+        cFMS = _libraries.get(key)
+        if cFMS is None:
+            if not os.path.isfile(key):
+                raise ValueError(f"Library {cFMS_path} does not exist")
+            cFMS = ctypes.cdll.LoadLibrary(key)
+            _libraries[key] = cFMS
+        set_library(cFMS)
+    return cFMS
+
+
+"""
+Subroutine: set_library
+
+Sets cFMS as the shared handle, e.g. for a library loaded outside of pyfms
+"""
+
+
+def set_library(cFMS: ctypes.CDLL):
+    global _shared
+    with _lock:
+        _shared = cFMS
+        _status.setdefault(cFMS, LOADED)
+
+
+"""
+Function: get_library
+
+Returns: The shared cFMS handle, or None if no library has been loaded
+"""
+
+
+def get_library() -> Optional[ctypes.CDLL]:
+    return _shared
+
+
+"""
+Function: get_status
+
+Returns: The lifecycle state of cFMS, LOADED, INITIALIZED or ENDED. Defaults
+to the shared handle, returns None if the handle is unknown.
+"""
+
+
+def get_status(cFMS: Optional[ctypes.CDLL] = None) -> Optional[str]:
+    cFMS = cFMS if cFMS is not None else _shared
+    if cFMS is None:
+        return None
+    return _status.get(cFMS)
+
+
+def is_initialized(cFMS: Optional[ctypes.CDLL] = None) -> bool:
+    return get_status(cFMS) == INITIALIZED
+
+
+def is_ended(cFMS: Optional[ctypes.CDLL] = None) -> bool:
+    return get_status(cFMS) == ENDED
+
+
+"""
+Subroutine: mark_initialized
+
+Records that FMS has been initialized through cFMS. If finalizer is given it
+is called at exit unless mark_ended is called first.
+"""
+
+
+def mark_initialized(cFMS: ctypes.CDLL, finalizer: Optional[Callable] = None):
+    global _atexit_registered
+    with _lock:
+        if _status.get(cFMS) == ENDED:
+            raise RuntimeError("FMS cannot be initialized again after it has ended")
+        _status[cFMS] = INITIALIZED
+        if finalizer is not None:
+            _finalizers[id(cFMS)] = finalizer
+            if not _atexit_registered:
+                atexit.register(_finalize)
+                _atexit_registered = True
+
+
+"""
+Subroutine: mark_ended
+
+Records that FMS has been ended through cFMS and drops its finalizer
+"""
+
+
+def mark_ended(cFMS: ctypes.CDLL):
+    with _lock:
+        _status[cFMS] = ENDED
+        _finalizers.pop(id(cFMS), None)
+
+
+def _mpi_finalized() -> bool:
+    # only ask mpi4py if it was imported, a finalized MPI cannot be ended twice
+    MPI = getattr(sys.modules.get("mpi4py"), "MPI", None)
+    return MPI is not None and MPI.Is_finalized()
+
+
+def _finalize():
+    with _lock:
+        finalizers = list(_finalizers.values())
+        _finalizers.clear()
+    if _mpi_finalized():
+        return
+    for finalizer in finalizers:
+        finalizer()
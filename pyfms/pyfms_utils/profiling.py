@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+
+import ctypes
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .function_registry import add_function_wrapper, remove_function_wrapper
+
+
+"""
+This module profiles the calls made by the pyFMS wrapper classes into cFMS.
+
+When enabled, the public methods of the wrapper classes and every function
+handed out by the FunctionRegistry are replaced by timed versions. For each
+wrapper method the call count, the wall time, the time spent in cFMS, the
+time spent marshaling arguments in Python (wall time less the time in cFMS
+and in nested wrapper methods) and the number of bytes passed to cFMS are
+accumulated per rank. When disabled, the original methods and functions are
+put back, so profiling costs nothing unless it is turned on.
+
+When profiling is enabled, pyFMS.pyfms_end returns the min/max/mean of the
+statistics across PEs on the root PE and logs them at INFO level to the
+pyfms.pyfms logger.
+
+enable and disable patch the wrapper classes for the whole process and are
+not thread-safe. Call them while no other thread, such as the cFMS executor
+of pyfms_utils.executor, is running wrapper calls. Calls submitted to the
+executor run on its thread, the time spent in cFMS is then recorded for the
+cFMS function but not attributed to the wrapper method that submitted it.
+
+Hooks added with add_hook are called after every profiled wrapper call with
+the record (name, wall, marshal, fortran, nbytes), allowing other tools to be
+plugged into the same instrumentation.
+
+Example:
+
+from pyfms.pyfms_utils import profiling
+
+profiling.enable()
+... timestep ...
+print(profiling.report())
+profiling.disable()
+"""
+
+
+FIELDS = ("count", "wall", "marshal", "fortran", "bytes")
+
+_enabled = False
+_stats: dict[str, list] = {}
+_stats_lock = threading.Lock()
+_hooks: list[Callable] = []
+_local = threading.local()
+_classes: list[type] = []
+_patched: dict[type, dict[str, Callable[..., Any]]] = {}
+
+
+def _default_classes() -> list[type]:
+    from ..py_data_override.py_data_override import pyDataOverride
+    from ..py_diag_manager.pyfms_diag_manager import DiagManager
+    from ..py_horiz_interp.py_horiz_interp import HorizInterp
+    from ..py_mpp.py_mpp import pyFMS_mpp
+    from ..py_mpp.py_mpp_domains import pyFMS_mpp_domains
+    from ..pyfms import pyFMS
+
+    return [
+        pyFMS,
+        pyFMS_mpp,
+        pyFMS_mpp_domains,
+        DiagManager,
+        pyDataOverride,
+        HorizInterp,
+    ]
+
+
+def _stack() -> list:
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def _nbytes(arg) -> int:
+    if arg is None:
+        return 0
+    # pointers from ndarray.ctypes.data_as keep a reference to the array
+    array = getattr(arg, "_arr", None)
+    if array is not None:
+        return array.nbytes
+    if isinstance(arg, ctypes.c_char_p):
+        return len(arg.value or b"")
+    try:
+        return ctypes.sizeof(getattr(arg, "_obj", arg))
+    except TypeError:
+        return 0
+
+
+def _record(name: str, wall: float, marshal: float, fortran: float, nbytes: int):
+    with _stats_lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = [0, 0.0, 0.0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += marshal
+        entry[3] += fortran
+        entry[4] += nbytes
+    for hook in _hooks:
+        hook(name, wall, marshal, fortran, nbytes)
+
+
+def _wrap_function(symbol: str, function: Callable) -> Callable:
+    def profiled(*args):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        nbytes = sum(_nbytes(arg) for arg in args)
+        stack = _stack()
+        if stack:
+            frame = stack[-1]
+            frame[0] += elapsed
+            frame[2] += nbytes
+        else:
+            _record(symbol, elapsed, 0.0, elapsed, nbytes)
+        return result
+
+    return profiled
+
+
+def _wrap_method(name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    def profiled(*args, **kwargs):
+        stack = _stack()
+        # time in cFMS, time in nested wrapper methods, bytes passed
+        frame = [0.0, 0.0, 0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += wall
+            _record(name, wall, wall - frame[0] - frame[1], frame[0], frame[2])
+
+    return profiled
+
+
+"""
+Subroutine: register_class
+
+Adds cls to the classes whose public methods are profiled. The wrapper
+classes of pyfms are registered by default.
+"""
+
+
+def register_class(cls: type):
+    if cls not in _classes:
+        _classes.append(cls)
+    if _enabled:
+        _patch(cls)
+
+
+def _patch(cls: type):
+    if cls in _patched:
+        return
+    originals: dict[str, Callable[..., Any]] = {}
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(method):
+            continue
+        originals[name] = method
+        setattr(cls, name, _wrap_method(f"{cls.__name__}.{name}", method))
+    _patched[cls] = originals
+
+
+"""
+Subroutine: enable
+
+Turns profiling on for the registered wrapper classes and all cFMS
+functions. Not thread-safe, see the module docstring.
+"""
+
+
+def enable():
+    global _enabled
+    if _enabled:
+        return
+    for cls in _default_classes():
+        if cls not in _classes:
+            _classes.append(cls)
+    _enabled = True
+    for cls in _classes:
+        _patch(cls)
+    add_function_wrapper(_wrap_function)
+
+
+"""
+Subroutine: disable
+
+Turns profiling off, restoring the original methods and functions. The
+accumulated statistics are kept until reset is called.
+"""
+
+
+def disable():
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    remove_function_wrapper(_wrap_function)
+    for cls, originals in _patched.items():
+        for name, method in originals.items():
+            setattr(cls, name, method)
+    _patched.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def add_hook(hook: Callable):
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable):
+    _hooks.remove(hook)
+
+
+"""
+Function: stats
+
+Returns: A copy of the statistics of this rank, a dictionary mapping the
+wrapper name to a dictionary with the keys of FIELDS
+"""
+
+
+def stats() -> dict[str, dict]:
+    with _stats_lock:
+        return {name: dict(zip(FIELDS, entry)) for name, entry in _stats.items()}
+
+
+"""
+Function: summarize
+
+Returns: The min/max/mean of every statistic across the per rank statistics
+in rank_stats. A wrapper that was not called on a rank counts as zero.
+"""
+
+
+def summarize(rank_stats: list[dict]) -> dict[str, dict]:
+    names = sorted({name for local in rank_stats for name in local})
+    nranks = len(rank_stats)
+    summary: dict[str, dict[str, tuple[float, float, float]]] = {}
+    for name in names:
+        summary[name] = {}
+        for field in FIELDS:
+            values = [local.get(name, {}).get(field, 0) for local in rank_stats]
+            summary[name][field] = (min(values), max(values), sum(values) / nranks)
+    return summary
+
+
+"""
+Function: format_table
+
+Returns: The summary as a text table with a min/max/mean column group per
+statistic. Times are in seconds.
+"""
+
+
+def format_table(summary: dict[str, dict], nranks: int) -> str:
+    width = max([len("wrapper")] + [len(name) for name in summary])
+    header = f"{'wrapper':<{width}}"
+    units = f"{'':<{width}}"
+    for field in FIELDS:
+        header += f" | {field:^38}"
+        units += f" | {'min':>12} {'max':>12} {'mean':>12}"
+    lines = [f"pyFMS profile across {nranks} PE(s)", header, units]
+    lines.append("-" * len(units))
+    for name, fields in summary.items():
+        line = f"{name:<{width}}"
+        for field in FIELDS:
+            if field in ("count", "bytes"):
+                line += " | " + " ".join(f"{value:>12.0f}" for value in fields[field])
+            else:
+                line += " | " + " ".join(f"{value:>12.6f}" for value in fields[field])
+        lines.append(line)
+    return "\n".join(lines)
+
+
+"""
+Function: report
+
+Gathers the statistics of all ranks of comm, MPI.COMM_WORLD by default, on
+root and summarizes them. Must be called on all ranks of comm.
+
+Returns: The formatted table on root, None on the other ranks
+"""
+
+
+def report(comm=None, root: int = 0) -> Optional[str]:
+    local = stats()
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        return format_table(summarize([local]), 1)
+
+    if not MPI.Is_initialized() or MPI.Is_finalized():
+        return format_table(summarize([local]), 1)
+    if comm is None:
+        comm = MPI.COMM_WORLD
+    rank_stats = comm.gather(local, root=root)
+    if comm.Get_rank() != root:
+        return None
+    return format_table(summarize(rank_stats), len(rank_stats))
@@ -16,6 +16,12 @@ function run_test() {
 
 run_test "pytest tests/test_build.py"
 
+run_test "pytest tests/pyfms_utils"
+
+run_test "pytest tests/test_import.py"
+
+run_test "pytest tests/py_mpp/test_domain_geometry.py tests/py_mpp/test_domain_pool.py tests/py_mpp/test_halo_transfers.py tests/py_mpp/test_layout.py tests/py_mpp/test_reproducible_sum.py tests/py_mpp/test_io_combine.py tests/py_mpp/test_decomposition.py tests/py_mpp/test_domain_array.py tests/py_mpp/test_halo_groups.py"
+
 test="tests/test_pyfms.py"
 create_input $test
 run_test "pytest -m parallel $test"
@@ -36,6 +42,41 @@ create_input $test
 run_test "mpirun -n 4 python -m pytest -m 'parallel' tests/py_mpp/test_update_domains.py"
 remove_input $test
 
+test="tests/py_mpp/test_update_halos.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_layout_benchmark.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_gather.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_global_reduce.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_redistribute.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_io_domain.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
+test="tests/py_mpp/test_start_update.py"
+create_input $test
+run_test "mpirun -n 4 python -m pytest -m 'parallel' $test"
+remove_input $test
+
 run_test "pytest tests/py_horiz_interp"
 
 run_test "pytest tests/py_data_override/test_generate_files.py"
@@ -37,9 +37,11 @@ def test_data_override():
         domain_id=ocn_domain_id,
     )
 
-    compute_dict = mpp_domains.get_compute_domain2(domain_id=ocn_domain_id)
-    xsize = compute_dict["xsize"]
-    ysize = compute_dict["ysize"]
+    center = mpp_domains.get_compute_domain2(
+        domain_id=ocn_domain_id, positions=(mpp_domains.CENTER,)
+    )[0]
+    xsize = int(center["compute"]["xsize"])
+    ysize = int(center["compute"]["ysize"])
 
     data_override = pyfms.pyDataOverride(cfms)
     data_override.init(ocn_domain_id=ocn_domain_id)
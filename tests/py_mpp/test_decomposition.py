@@ -0,0 +1,94 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from pyfms.py_mpp.py_decomposition import DIRECTIONS, pyDecomposition
+
+
+def decompose(extents: list[int]) -> list[tuple[int, int]]:
+    ends = np.cumsum(extents)
+    return [(int(end - n), int(end - 1)) for n, end in zip(extents, ends)]
+
+
+def decomposition(xextent, yextent, halo=1, masked=(), **cyclic):
+    # ranks in the order of FMS, x fastest, skipping masked divisions
+    compute = [
+        (xs, xe, ys, ye)
+        for ((ys, ye), (xs, xe)), (iy, ix) in zip(
+            itertools.product(decompose(yextent), decompose(xextent)),
+            itertools.product(range(len(yextent)), range(len(xextent))),
+        )
+        if (ix, iy) not in masked
+    ]
+    data = [(x0 - halo, x1 + halo, y0 - halo, y1 + halo) for x0, x1, y0, y1 in compute]
+    return pyDecomposition(compute, data, (sum(xextent), sum(yextent)), **cyclic)
+
+
+@pytest.mark.parametrize(
+    "xcyclic, ycyclic", [(False, False), (True, False), (True, True)]
+)
+def test_owner_of(xcyclic, ycyclic):
+
+    xextent, yextent = [3, 5, 4], [2, 6]
+    table = decomposition(xextent, yextent, xcyclic=xcyclic, ycyclic=ycyclic)
+    assert table.npes == 6
+    assert table.data[4].tolist() == [2, 8, 1, 8]
+
+    # every index against a loop over the compute domains
+    nx, ny = sum(xextent), sum(yextent)
+    i, j = np.meshgrid(np.arange(-2, nx + 2), np.arange(-2, ny + 2), indexing="ij")
+    owners = table.owner_of(i, j)
+    assert owners.shape == i.shape
+    for (a, b), owner in np.ndenumerate(owners):
+        x, y = int(i[a, b]), int(j[a, b])
+        x = x % nx if xcyclic else x
+        y = y % ny if ycyclic else y
+        expected = [
+            rank
+            for rank, (x0, x1, y0, y1) in enumerate(table.compute)
+            if x0 <= x <= x1 and y0 <= y <= y1
+        ]
+        assert owner == (expected[0] if expected else -1)
+
+    # broadcast scalars and large arrays
+    assert table.owner_of(4, [0, 7]).tolist() == [1, 4]
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, [nx, ny], size=(10**6, 2))
+    owners = table.owner_of(points[:, 0], points[:, 1])
+    x0, x1, y0, y1 = table.compute[owners].T
+    assert np.all((x0 <= points[:, 0]) & (points[:, 0] <= x1))
+    assert np.all((y0 <= points[:, 1]) & (points[:, 1] <= y1))
+
+
+def test_neighbors():
+
+    table = decomposition([3, 5, 4], [2, 6], xcyclic=True)
+    assert table.ranks.tolist() == [[0, 3], [1, 4], [2, 5]]
+    assert table.neighbor(0, "east") == 1
+    assert table.neighbor(0, "west") == 2
+    assert table.neighbor(0, "north") == 3
+    assert table.neighbor(0, "south") == -1
+    assert table.neighbor(0, "northwest") == 5
+    assert table.neighbor(5, "northeast") == -1
+    assert table.neighbor(5, "southeast") == 0
+    assert table.neighbors.shape == (6, len(DIRECTIONS))
+
+    with pytest.raises(ValueError):
+        table.neighbor(0, "up")
+
+
+def test_masked_and_shared_edges():
+
+    # the division (1, 0) is masked out of the layout
+    table = decomposition([2, 2], [2, 2], masked=[(1, 0)])
+    assert table.npes == 3
+    assert table.ranks.tolist() == [[0, 1], [-1, 2]]
+    assert table.neighbor(0, "east") == -1
+    assert table.owner_of([3, 3], [0, 3]).tolist() == [-1, 2]
+
+    # staggered compute domains of a symmetric domain share their edges, the
+    # point is owned to the west or south
+    compute = [(0, 2, 0, 4), (2, 4, 0, 4)]
+    table = pyDecomposition(compute, compute, (5, 5))
+    assert table.owner_of([1, 2, 3], [0, 0, 0]).tolist() == [0, 0, 1]
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from pyfms import pyDomainArray, pyDomainGeometry, pyFMS_mpp_domains
+from pyfms.py_mpp.py_domain_array import update_halos
+
+
+class Domain:
+    # the geometry of a pyDomain, halo updates are recorded
+    def __init__(self):
+        self.updates = []
+
+    def geometry(self, position=None):
+        return pyDomainGeometry(
+            position=pyFMS_mpp_domains.CENTER if position is None else position,
+            compute=(2, 5, 2, 3),
+            data=(0, 7, 0, 5),
+            global_=(0, 7, 0, 7),
+        )
+
+    def update_halos(self, fields, positions=None, **kwargs):
+        for field in fields:
+            assert type(field) is np.ndarray
+            field[0, :] = -1.0
+        self.updates.append(len(fields))
+
+
+def test_domain_array():
+
+    pyDomainArray.reset_counts()
+    domain = Domain()
+    u = pyDomainArray(domain, nz=3, name="u")
+    v = pyDomainArray(domain, name="v")
+    assert u.shape == (8, 6, 3)
+    assert u.stale
+
+    # both stale, one update
+    update_halos([u, v])
+    assert domain.updates == [2]
+    assert not u.stale and not v.stale
+    assert np.all(u[0] == -1.0)
+
+    # nothing written, no update
+    update_halos([u, v])
+    u.update_domains()
+    assert domain.updates == [2]
+
+    # a different halo width is updated
+    v.update_domains(whalo=1)
+    assert domain.updates == [2, 1]
+
+    # reads and new arrays leave the halos current
+    w = u * 2.0 + np.sin(u)
+    assert type(w) is np.ndarray
+    assert float(u.sum()) == -18.0
+    assert not u.stale
+
+    # every write through NumPy makes them stale
+    writes = [
+        lambda a: a.__setitem__((3, 3), 1.0),
+        lambda a: a[2:4].__setitem__(Ellipsis, 2.0),
+        lambda a: a.__iadd__(1.0),
+        lambda a: np.multiply(a, 2.0, out=a),
+        lambda a: np.add.at(a, ([1], [1]), 1.0),
+        lambda a: a.fill(0.0),
+        lambda a: np.copyto(a, 3.0),
+        lambda a: np.putmask(a, a > 0, 1.0),
+        lambda a: a.reshape(-1).__setitem__(0, 1.0),
+    ]
+    for write in writes:
+        u.update_domains()
+        assert not u.stale
+        write(u)
+        assert u.stale
+
+    # copies have their own state
+    u.update_domains()
+    copy = u.copy()
+    assert copy.stale and not u.stale
+    copy[...] = 0.0
+    assert not u.stale
+
+    # bypassing NumPy needs mark_stale
+    np.asarray(u)[3, 3] = 5.0
+    assert not u.stale
+    u.mark_stale()
+    assert u.stale
+
+    counts = pyDomainArray.counts()
+    assert counts["v"] == dict(performed=2, skipped=1)
+    assert counts["u"]["skipped"] == 3
+    assert "halo updates performed" in pyDomainArray.report()
+
+
+def test_domain_array_errors():
+
+    domain = Domain()
+    with pytest.raises(ValueError):
+        pyDomainArray.wrap(np.zeros((4, 2)), domain)
+    u = pyDomainArray.wrap(np.zeros((8, 6)), domain)
+    with pytest.raises(ValueError):
+        update_halos([u[2:6]])
+    with pytest.raises(ValueError):
+        update_halos([u, pyDomainArray(Domain())])
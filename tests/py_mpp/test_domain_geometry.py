@@ -0,0 +1,155 @@
+import numpy as np
+
+from pyfms import pyDomain, pyDomainData, pyDomainGeometry, pyFMS_mpp_domains
+
+
+def test_domain_geometry():
+
+    # halo of 2 around the compute domain [4, 7] x [2, 3]
+    geometry = pyDomainGeometry(
+        position=pyFMS_mpp_domains.EAST,
+        compute=(4, 7, 2, 3),
+        data=(2, 9, 0, 5),
+        global_=(0, 8, 0, 7),
+    )
+
+    assert geometry.position == pyFMS_mpp_domains.EAST
+    assert geometry.data_shape == (8, 6)
+    assert geometry.compute_shape == (4, 2)
+    assert geometry.compute_slice == np.s_[2:6, 2:4]
+
+    field = np.arange(8 * 6 * 3, dtype=np.float64).reshape(8, 6, 3)
+    compute = field[geometry.compute_slice]
+    assert compute.shape == (4, 2, 3)
+    assert np.shares_memory(compute, field)
+    assert compute[0, 0, 0] == field[2, 2, 0]
+
+    for name in ("isc", "iec", "jsc", "jec", "isd", "ied", "jsd", "jed", "ieg"):
+        assert type(getattr(geometry, name)) is int
+
+
+def test_get_compute_domain2():
+
+    class Registry:
+        # cFMS_get_{compute,data}_domain of a 4x2 compute domain at [4, 7] x
+        # [2, 3] with a halo of 2, one more point along x east of CENTER
+        def __init__(self):
+            self.calls = []
+
+        def get(self, symbol, argtypes=None, restype=None):
+            halo = 2 if symbol == "cFMS_get_data_domain" else 0
+
+            def query(domain_id, *arguments):
+                extents = arguments[:8]
+                x_is_global, _, _, position = arguments[8:12]
+                self.calls.append((symbol, position.value))
+                shift = int(position.value != pyFMS_mpp_domains.CENTER)
+                values = (4 - halo, 7 + shift + halo, 2 - halo, 3 + halo)
+                sizes = (values[1] - values[0] + 1, values[3] - values[2] + 1)
+                values += (sizes[0], sizes[0], sizes[1], sizes[1])
+                for extent, value in zip(extents, values):
+                    extent.value = value
+                x_is_global.value = True
+
+            return query
+
+    mpp_domains = pyFMS_mpp_domains.__new__(pyFMS_mpp_domains)
+    mpp_domains._registry = Registry()
+
+    bounds = mpp_domains.get_compute_domain2(domain_id=0)
+    assert bounds.dtype == pyFMS_mpp_domains.DOMAIN_BOUNDS_DTYPE
+    assert bounds["position"].tolist() == list(pyFMS_mpp_domains.POSITIONS)
+    assert len(mpp_domains._registry.calls) == 2 * len(pyFMS_mpp_domains.POSITIONS)
+    assert [position for _, position in mpp_domains._registry.calls[::2]] == list(
+        pyFMS_mpp_domains.POSITIONS
+    )
+
+    center, east = bounds[0], bounds[1]
+    assert center["compute"].tolist() == (4, 7, 2, 3, 4, 4, 2, 2, True, False)
+    assert center["data"].tolist() == (2, 9, 0, 5, 8, 8, 6, 6, True, False)
+    assert east["compute"]["xend"] == 8
+    assert east["data"]["xsize"] == 9
+
+    assert center["global"].tolist() == (0, 0, 0, 0, 0, 0, 0, 0, False, False)
+
+    center = mpp_domains.get_compute_domain2(positions=(pyFMS_mpp_domains.CENTER,))
+    assert center.shape == (1,)
+
+    # global domain of a symmetric 8x4 domain
+    bounds = mpp_domains.get_compute_domain2(global_indices=[0, 7, 0, 3], symmetry=True)
+    assert bounds[0]["global"].tolist() == (0, 7, 0, 3, 8, 8, 4, 4, True, True)
+    assert bounds[1]["global"].tolist() == (0, 8, 0, 3, 9, 9, 4, 4, True, True)
+    assert bounds[3]["global"]["yend"] == 4
+
+    # a domain queries CENTER when it is set up and the other positions
+    # the first time their geometry is requested
+    mpp_domains._registry.calls.clear()
+    domain = pyDomain.__new__(pyDomain)
+    domain.mpp_domains_obj = mpp_domains
+    domain.domain_id = 0
+    domain.whalo = domain.shalo = None
+    domain.symmetry = True
+    domain.compute_domain = pyDomainData()
+    domain.data_domain = pyDomainData()
+    domain._geometry = {}
+    domain._halo_plans = {}
+    domain._gather_plans = {}
+    domain._reductions = {}
+    domain._decompositions = {}
+    domain._global_bounds = [0, 7, 0, 3]
+    domain._query_bounds()
+    assert mpp_domains._registry.calls == [
+        ("cFMS_get_compute_domain", pyFMS_mpp_domains.CENTER),
+        ("cFMS_get_data_domain", pyFMS_mpp_domains.CENTER),
+    ]
+    assert domain.compute_domain.xend.value == 7
+
+    geometry = domain.geometry(position=pyFMS_mpp_domains.EAST)
+    assert len(mpp_domains._registry.calls) == 4
+    assert (geometry.iec, geometry.ieg) == (8, 8)
+    assert domain.geometry(position=pyFMS_mpp_domains.EAST) is geometry
+    assert domain.geometry().iec == 7
+    assert len(mpp_domains._registry.calls) == 4
+    assert domain.bounds["position"].tolist() == [
+        pyFMS_mpp_domains.CENTER,
+        pyFMS_mpp_domains.EAST,
+    ]
+
+    # plans and reductions built from the old bounds are dropped, and the
+    # plans freed, when the compute or global domain is set
+    class Plan:
+        freed = False
+
+        def free(self):
+            self.freed = True
+
+    mpp_domains.set_compute_domain = lambda **kwargs: None
+    mpp_domains.set_global_domain = lambda **kwargs: None
+    for setter in (domain.set_compute_domain, domain.set_global_domain):
+        plans = [Plan(), Plan()]
+        domain._halo_plans[("halo",)] = plans[0]
+        domain._gather_plans[("gather",)] = plans[1]
+        domain._reductions[None] = Plan()
+        domain._decompositions[(None, None)] = Plan()
+        cached = domain.geometry()
+        setter(xbegin=4, xend=7)
+        assert all(plan.freed for plan in plans)
+        assert not domain._halo_plans and not domain._gather_plans
+        assert not domain._reductions and not domain._decompositions
+        assert domain.geometry() is not cached
+
+
+def test_comm_key():
+
+    # the caches keyed by id(comm) keep the comm alive, so that a comm
+    # created after another one is freed never hits its cached plans
+    domain = pyDomain.__new__(pyDomain)
+    domain._comms = {}
+
+    assert domain._comm_key(None) is None
+    comm = object()
+    key = domain._comm_key(comm)
+    assert key == id(comm)
+    del comm
+    assert domain._comm_key(object()) != key
+    assert len(domain._comms) == 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pyfms import pyDomainArrayPool, pyDomainGeometry, pyFMS_mpp_domains
+from pyfms.py_mpp.py_domain_pool import aligned_empty
+from pyfms.pyfms_utils.data_handling import check_array
+
+
+def test_aligned_empty():
+
+    for alignment in (16, 64, 4096):
+        array = aligned_empty((5, 3, 7), np.float32, alignment)
+        assert array.ctypes.data % alignment == 0
+        assert array.shape == (5, 3, 7)
+        assert array.dtype == np.float32
+        assert array.flags.c_contiguous
+
+
+def test_domain_pool():
+
+    geometry = pyDomainGeometry(
+        position=pyFMS_mpp_domains.CENTER,
+        compute=(2, 5, 2, 3),
+        data=(0, 7, 0, 5),
+        global_=(0, 7, 0, 7),
+    )
+
+    pool = pyDomainArrayPool(alignment=64)
+
+    field = pool.zeros(geometry, nz=4)
+    assert field.shape == (8, 6, 4)
+    assert field.ctypes.data % 64 == 0
+    assert np.all(field == 0.0)
+    # passed to cFMS without a copy
+    assert check_array(field, np.dtype(np.float64), writeable=True) is field
+
+    other = pool.empty(geometry, dtype=np.float32)
+    assert other.shape == (8, 6)
+    assert pool.bytes_in_use == field.nbytes + other.nbytes
+
+    pool.release(field)
+    assert pool.empty(geometry, nz=4) is field
+
+    with pytest.raises(ValueError):
+        pool.release(np.zeros((8, 6, 4)))
+
+    with pool.temporary(geometry, nz=4) as temporary:
+        assert temporary is not field
+    pool.release(field)
+
+    stats = pool.high_water_mark()
+    assert stats[((8, 6, 4), "float64")] == dict(
+        allocated=2, reused=1, in_use=0, high_water=2
+    )
+    assert stats[((8, 6), "float32")]["in_use"] == 1
+    assert pool.bytes_high_water == 2 * field.nbytes + other.nbytes
+    assert "high water mark" in pool.report()
+
+    pool.release(other)
+    assert pool.bytes_in_use == 0
+    pool.clear()
+    assert pool.empty(geometry, dtype=np.float32) is not other
+
+    with pytest.raises(ValueError):
+        pyDomainArrayPool(alignment=48)
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_gather_scatter():
+
+    nx = 12
+    ny = 8
+    npes = 4
+    halo = 2
+    root = 1
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so", ndomain=2)
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (nx - 1), 0, (ny - 1)]
+    layout = mpp_domains.define_layout(global_indices=global_indices, ndivs=npes)
+    halos = dict(whalo=halo, ehalo=halo, shalo=halo, nhalo=halo)
+
+    domain = pyDomain(
+        global_indices=global_indices,
+        layout=layout,
+        mpp_domains_obj=mpp_domains,
+        domain_id=0,
+        xextent=np.array([5, 7], dtype=np.int32),
+        yextent=np.array([3, 5], dtype=np.int32),
+        **halos,
+    )
+
+    x, y = np.meshgrid(np.arange(nx), np.arange(ny), indexing="ij")
+    global_data = np.stack([100.0 * y + x, 100.0 * y + x + 0.5], axis=-1)
+
+    # data domain shaped field with halos set to a sentinel
+    geometry = domain.geometry()
+    field = np.full(geometry.data_shape + (2,), -1.0)
+    compute = domain.compute_slice()
+
+    scattered = domain.scatter(global_data if mpp.pe() == root else None, root=root)
+    assert scattered.shape == field.shape
+    field[compute] = scattered[compute]
+
+    gathered = domain.gather(field, root=root)
+    if mpp.pe() == root:
+        assert np.array_equal(gathered, global_data)
+    else:
+        assert gathered is None
+
+    # the plan is reused, also for compute domain shaped fields
+    gathered = domain.gather(np.ascontiguousarray(field[compute]), root=root)
+    assert len(domain._gather_plans) == 1
+    if mpp.pe() == root:
+        assert np.array_equal(gathered, global_data)
+
+    # scatter into the given field leaves the halos untouched
+    field = np.full(geometry.data_shape + (2,), -1.0)
+    domain.scatter(global_data if mpp.pe() == root else None, root=root, field=field)
+    assert np.all(field[compute] >= 0.0)
+    assert np.sum(field < 0.0) == field.size - field[compute].size
+
+    # a bad global field on root raises on every PE instead of leaving the
+    # others blocked in Scatterv, and the plan is still usable afterwards
+    with pytest.raises(ValueError, match="global_field"):
+        domain.scatter(global_data[1:] if mpp.pe() == root else None, root=root)
+    with pytest.raises(ValueError, match="global_field"):
+        domain.scatter(None, root=root)
+    domain.scatter(global_data if mpp.pe() == root else None, root=root, field=field)
+
+    # the points of the compute domain of every PE are owned by it
+    table = domain.decomposition()
+    assert table is domain.decomposition()
+    assert table.ranks.shape == (2, 2)
+    owners = domain.owner_of(x, y)
+    rank = mpp.pe()
+    x0, x1, y0, y1 = table.compute[rank]
+    assert np.all(owners[x0 : x1 + 1, y0 : y1 + 1] == rank)
+    assert np.sum(owners == rank) == np.prod(geometry.compute_shape)
+
+    # staggered fields of a symmetric domain share the edges of their
+    # compute domains
+    symmetric = pyDomain(
+        global_indices=global_indices,
+        layout=layout,
+        mpp_domains_obj=mpp_domains,
+        domain_id=1,
+        symmetry=True,
+        **halos,
+    )
+    corner = mpp_domains.CORNER
+    geometry = symmetric.geometry(corner)
+    xc, yc = np.meshgrid(np.arange(nx + 1), np.arange(ny + 1), indexing="ij")
+    global_corner = (100 * yc + xc).astype(np.float32)
+
+    field = symmetric.scatter(global_corner if mpp.pe() == 0 else None, position=corner)
+    assert field.dtype == np.float32
+    gathered = symmetric.gather(field, position=corner)
+    if mpp.pe() == 0:
+        assert gathered.shape == (nx + 1, ny + 1)
+        assert np.array_equal(gathered, global_corner)
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
+
+
+if __name__ == "__main__":
+    test_gather_scatter()
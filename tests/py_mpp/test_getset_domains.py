@@ -90,6 +90,11 @@ def test_getset_domains():
     x_is_global = False
     y_is_global = False
 
+    # plans cached before the domains are set are built from the old bounds
+
+    plan = domain.halo_plan(np.zeros(domain.geometry().data_shape))
+    assert domain.global_reduce([np.ones(domain.geometry().data_shape)])[0] == 16.0
+
     # set compute and data domains
 
     xsize = 2
@@ -128,6 +133,13 @@ def test_getset_domains():
         shalo=shalo,
     )
 
+    # the cached plans and reductions were dropped with the old bounds
+
+    assert not domain._halo_plans and not domain._reductions
+    field = np.zeros(domain.geometry().data_shape)
+    assert domain.halo_plan(field) is not plan
+    assert domain.global_reduce([np.ones(field.shape)])[0] == 16.0
+
     # get domain
 
     assert domain.compute_domain.xbegin.value == isc[pe]
@@ -150,6 +162,59 @@ def test_getset_domains():
     assert domain.data_domain.xmax_size.value == 6
     assert domain.data_domain.ymax_size.value == 6
 
+    # cached geometry
+
+    geometry = domain.geometry()
+    assert geometry is domain.geometry(position=mpp_domains.CENTER)
+    assert (geometry.isc, geometry.iec, geometry.jsc, geometry.jec) == (
+        isc[pe],
+        iec[pe],
+        jsc[pe],
+        jec[pe],
+    )
+    assert (geometry.isd, geometry.ied, geometry.jsd, geometry.jed) == (
+        isd[pe],
+        ied[pe],
+        jsd[pe],
+        jed[pe],
+    )
+    assert (geometry.isg, geometry.ieg, geometry.jsg, geometry.jeg) == (0, 3, 0, 3)
+    assert geometry.data_shape == (6, 6)
+    assert geometry.compute_shape == (2, 2)
+
+    field = np.zeros(geometry.data_shape, dtype=np.float64)
+    field[domain.compute_slice()] = 1.0
+    assert field.sum() == 4.0
+    assert field[isc[pe] - isd[pe], jsc[pe] - jsd[pe]] == 1.0
+
+    # bounds of all positions in one query, only CENTER is queried by the
+    # domain until the geometry of another position is requested
+
+    bounds = mpp_domains.get_compute_domain2(
+        domain_id=domain_id,
+        whalo=whalo,
+        shalo=shalo,
+        global_indices=domain.global_indices,
+    )
+    assert bounds.dtype == pyFMS_mpp_domains.DOMAIN_BOUNDS_DTYPE
+    assert bounds["position"].tolist() == list(pyFMS_mpp_domains.POSITIONS)
+    assert domain.bounds["position"].tolist() == [pyFMS_mpp_domains.CENTER]
+    assert np.array_equal(bounds[:1], domain.bounds)
+    center = bounds[0]
+    assert center["compute"]["xbegin"] == isc[pe]
+    assert center["compute"]["yend"] == jec[pe]
+    assert center["compute"]["xmax_size"] == 2
+    assert not center["compute"]["x_is_global"]
+    assert center["data"]["xbegin"] == isd[pe]
+    assert center["data"]["ysize"] == 6
+    assert center["global"]["xend"] == 3
+    for record in bounds:
+        geometry = domain.geometry(position=int(record["position"]))
+        assert geometry.isc == record["compute"]["xbegin"]
+        assert geometry.jed == record["data"]["yend"]
+        assert geometry.ieg == record["global"]["xend"]
+    assert np.array_equal(bounds, domain.bounds)
+
     pyfms.pyfms_end()
 
 
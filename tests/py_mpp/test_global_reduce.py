@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains
+from pyfms.py_mpp.py_reduction import digits_to_float, reproducible_digits
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_global_reduce():
+
+    nx = 24
+    ny = 16
+    nz = 3
+    halo = 2
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so", ndomain=2)
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (nx - 1), 0, (ny - 1)]
+    halos = dict(whalo=halo, ehalo=halo, shalo=halo, nhalo=halo)
+
+    rng = np.random.default_rng(7)
+    global_t = rng.standard_normal((nx, ny, nz)) * 1.0e3
+    global_q = np.exp(rng.uniform(-30.0, 5.0, (nx, ny)))
+    global_corner = rng.standard_normal((nx + 1, ny + 1))
+
+    expected = [
+        digits_to_float(reproducible_digits(global_t)),
+        global_q.min(),
+        global_t.max(),
+        digits_to_float(reproducible_digits(global_corner)),
+    ]
+
+    results = []
+    for domain_id, layout in enumerate(([2, 2], [4, 1])):
+        domain = pyDomain(
+            global_indices=global_indices,
+            layout=layout,
+            mpp_domains_obj=mpp_domains,
+            domain_id=domain_id,
+            symmetry=True,
+            **halos,
+        )
+        # the fields are distributed from PE 0, the halos are left at zero
+        root = mpp.pe() == 0
+        t = domain.scatter(global_t if root else None)
+        q = domain.scatter(global_q if root else None)
+        c = domain.scatter(global_corner if root else None, position=mpp_domains.CORNER)
+
+        result = domain.global_reduce(
+            [t, q, t, c],
+            ops=["sum", "min", "max", "sum"],
+            positions=[None, None, None, mpp_domains.CORNER],
+            reproducible=True,
+        )
+        assert result.tolist() == expected
+        results.append(result)
+
+        # the default sums agree to rounding
+        fast = domain.global_reduce([t, c], positions=[None, mpp_domains.CORNER])
+        assert np.allclose(fast, [expected[0], expected[3]])
+
+    assert np.array_equal(results[0], results[1])
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
+
+
+if __name__ == "__main__":
+    test_global_reduce()
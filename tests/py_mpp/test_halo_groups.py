@@ -0,0 +1,44 @@
+import numpy as np
+
+from pyfms import pyDomain
+
+
+class MppDomains:
+    # update_domains of pyFMS_mpp_domains, the updated fields are recorded
+    def __init__(self):
+        self.updates = []
+
+    def update_domains(self, field, position=None, **kwargs):
+        self.updates.append((field.dtype, field.shape, position))
+        field[0] = -1
+
+
+def test_halo_groups():
+
+    domain = pyDomain.__new__(pyDomain)
+    domain.mpp_domains_obj = MppDomains()
+    domain.domain_id = 0
+    domain._halo_buffers = {}
+
+    t = np.zeros((8, 6, 3), dtype=np.float32)
+    q = np.zeros((8, 6), dtype=np.float32)
+    p = np.zeros((8, 6), dtype=np.float64)
+    mask = np.zeros((8, 6), dtype=np.int32)
+    u = np.zeros((9, 6), dtype=np.float32)
+
+    # one exchange per position and dtype, float32 fields stay float32
+    domain.update_halos([t, q, p, mask, u], positions=[None, None, None, None, 3])
+    assert domain.mpp_domains_obj.updates == [
+        (np.float32, (8, 6, 4), None),
+        (np.float64, (8, 6), None),
+        (np.int32, (8, 6), None),
+        (np.float32, (9, 6), 3),
+    ]
+    for field in (t, q, p, mask, u):
+        assert np.all(field[0] == -1)
+        assert np.all(field[1:] == 0)
+
+    # the packing buffer is reused
+    buffers = dict(domain._halo_buffers)
+    domain.update_halos([t, q])
+    assert domain._halo_buffers == buffers
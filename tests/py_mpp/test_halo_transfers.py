@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from pyfms.py_mpp.py_halo_exchange import halo_transfers
+
+
+def decompose(extents: list[int]) -> list[tuple[int, int]]:
+    ends = np.cumsum(extents)
+    return [(int(end - n), int(end - 1)) for n, end in zip(extents, ends)]
+
+
+@pytest.mark.parametrize(
+    "xextent, yextent, halos, xcyclic, ycyclic",
+    [
+        ([4, 4], [4, 4], (2, 2, 2, 2), True, True),
+        ([3, 2, 4], [5, 3], (1, 2, 2, 1), True, False),
+        ([8], [2, 2, 2, 2], (2, 2, 3, 3), True, True),
+        ([2, 2, 2], [3, 3], (1, 1, 1, 1), False, False),
+    ],
+)
+def test_halo_transfers(xextent, yextent, halos, xcyclic, ycyclic):
+
+    whalo, ehalo, shalo, nhalo = halos
+    nx, ny = sum(xextent), sum(yextent)
+    # an arbitrary index offset, as the indices reported by cFMS
+    offset = 5
+
+    bounds = np.array(
+        [
+            (xs + offset, xe + offset, ys + offset, ye + offset)
+            for (ys, ye), (xs, xe) in itertools.product(
+                decompose(yextent), decompose(xextent)
+            )
+        ]
+    )
+
+    def value(ix, iy):
+        return 100.0 * iy + ix
+
+    fields = []
+    for isc, iec, jsc, jec in bounds:
+        field = np.full(
+            (iec - isc + 1 + whalo + ehalo, jec - jsc + 1 + shalo + nhalo), -1.0
+        )
+        for i, j in itertools.product(range(isc, iec + 1), range(jsc, jec + 1)):
+            field[i - isc + whalo, j - jsc + shalo] = value(i - offset, j - offset)
+        fields.append(field)
+
+    def local(rank, region):
+        isd, jsd = bounds[rank][0] - whalo, bounds[rank][2] - shalo
+        return np.s_[
+            region[0] - isd : region[1] - isd + 1, region[2] - jsd : region[3] - jsd + 1
+        ]
+
+    transfers = [
+        halo_transfers(bounds, rank, *halos, xcyclic=xcyclic, ycyclic=ycyclic)
+        for rank in range(len(bounds))
+    ]
+    for rank, peers in enumerate(transfers):
+        for peer, (recv, _) in peers.items():
+            send = transfers[peer][rank][1]
+            assert len(recv) == len(send)
+            for recv_region, send_region in zip(recv, send):
+                fields[rank][local(rank, recv_region)] = fields[peer][
+                    local(peer, send_region)
+                ]
+
+    for rank, (isc, iec, jsc, jec) in enumerate(bounds):
+        for i, j in itertools.product(
+            range(isc - whalo, iec + ehalo + 1), range(jsc - shalo, jec + nhalo + 1)
+        ):
+            ix, iy = i - offset, j - offset
+            inside = (xcyclic or 0 <= ix < nx) and (ycyclic or 0 <= iy < ny)
+            expected = value(ix % nx, iy % ny) if inside else -1.0
+            assert fields[rank][i - isc + whalo, j - jsc + shalo] == expected
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from pyfms.py_mpp.py_io_domain import combine, io_filename
+
+
+def test_combine(tmp_path):
+
+    pytest.importorskip("h5py")
+    import xarray as xr
+
+    # a set of 2x2 files as written by FMS, with a vertical axis
+    nx, ny, nz = 10, 6, 3
+    rng = np.random.default_rng(0)
+    temp = rng.standard_normal((nz, ny, nx))
+    path = str(tmp_path / "restart.nc")
+
+    index = 0
+    for y0, y1 in ((0, 2), (3, 5)):
+        for x0, x1 in ((0, 3), (4, 9)):
+            coords = dict(
+                xaxis_1=(
+                    "xaxis_1",
+                    np.arange(x0, x1 + 1) + 1.0,
+                    dict(domain_decomposition=np.array([1, nx, x0 + 1, x1 + 1])),
+                ),
+                yaxis_1=(
+                    "yaxis_1",
+                    np.arange(y0, y1 + 1) + 1.0,
+                    dict(domain_decomposition=np.array([1, ny, y0 + 1, y1 + 1])),
+                ),
+                zaxis_1=("zaxis_1", np.arange(nz) + 1.0),
+            )
+            variables = dict(
+                temp=(
+                    ("zaxis_1", "yaxis_1", "xaxis_1"),
+                    temp[:, y0 : y1 + 1, x0 : x1 + 1],
+                ),
+                levels=(("zaxis_1",), np.arange(nz, dtype=np.float64)),
+            )
+            xr.Dataset(
+                variables, coords=coords, attrs=dict(NumFilesInSet=4, title="test")
+            ).to_netcdf(io_filename(path, index), engine="h5netcdf")
+            index += 1
+
+    output = combine(path)
+    assert output == path
+
+    with xr.open_dataset(path, engine="h5netcdf") as dataset:
+        assert np.array_equal(dataset["temp"].values, temp)
+        assert np.array_equal(dataset["levels"].values, np.arange(nz))
+        assert dataset.attrs["title"] == "test"
+        assert "NumFilesInSet" not in dataset.attrs
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pytest
+from mpi4py import MPI
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains, pyIODomainWriter
+from pyfms.py_mpp.py_io_domain import combine, io_filename
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_io_domain_writer():
+
+    nx = 16
+    ny = 12
+    nz = 3
+    path = "io_domain_test.nc"
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so")
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (nx - 1), 0, (ny - 1)]
+    domain = pyDomain(
+        global_indices=global_indices,
+        layout=[2, 2],
+        mpp_domains_obj=mpp_domains,
+        domain_id=0,
+        whalo=2,
+        ehalo=2,
+        shalo=2,
+        nhalo=2,
+    )
+
+    rng = np.random.default_rng(11)
+    global_t = rng.standard_normal((nx, ny, nz))
+    global_h = rng.standard_normal((nx, ny)).astype(np.float32)
+    root = mpp.pe() == 0
+    t = domain.scatter(global_t if root else None)
+    h = domain.scatter(global_h if root else None)
+
+    # two I/O domains of two PEs each, split along y
+    writer = pyIODomainWriter(domain, io_layout=[1, 2])
+    assert writer.nfiles == 2
+    filename = writer.write(path, dict(temp=t, height=h), attributes=dict(step=1))
+    if writer.is_io_root:
+        assert filename == io_filename(path, writer.io_index)
+    else:
+        assert filename is None
+
+    MPI.COMM_WORLD.Barrier()
+    if root:
+        import xarray as xr
+
+        combine(path)
+        with xr.open_dataset(path, engine="h5netcdf") as dataset:
+            assert np.array_equal(dataset["temp"].values, global_t.T)
+            assert np.array_equal(dataset["height"].values, global_h.T)
+            assert dataset.attrs["step"] == 1
+        for index in range(writer.nfiles):
+            os.remove(io_filename(path, index))
+        os.remove(path)
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
+
+
+if __name__ == "__main__":
+    test_io_domain_writer()
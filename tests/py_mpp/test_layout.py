@@ -0,0 +1,210 @@
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from pyfms.py_mpp.py_layout import (
+    balanced_extents,
+    block_costs,
+    factor_layouts,
+    format_mask_layouts,
+    layout_cost,
+    mask_layout,
+    mask_layouts,
+    mask_maskmap,
+    rank_layouts,
+    read_mask,
+    weighted_extents,
+)
+
+
+def test_balanced_extents():
+
+    assert balanced_extents(10, 3).tolist() == [4, 3, 3]
+    assert balanced_extents(12, 4).tolist() == [3, 3, 3, 3]
+    assert balanced_extents(10, 3).dtype == np.int32
+    assert factor_layouts(12) == [[1, 12], [2, 6], [3, 4], [4, 3], [6, 2], [12, 1]]
+
+
+def test_layout_cost():
+
+    halos = dict(whalo=2, ehalo=2, shalo=2, nhalo=2)
+    extents = (balanced_extents(8, 2), balanced_extents(8, 2))
+
+    # cyclic 2x2 layout: 3 distinct neighbors, a full ring of halo points
+    cost = layout_cost(
+        *extents,
+        **halos,
+        xcyclic=True,
+        ycyclic=True,
+        message_cost=1.0,
+        halo_cost=0.0,
+        compute_cost=0.0,
+    )
+    assert cost == 3.0
+    cost = layout_cost(
+        *extents,
+        **halos,
+        xcyclic=True,
+        ycyclic=True,
+        message_cost=0.0,
+        halo_cost=1.0,
+        compute_cost=0.0,
+    )
+    assert cost == 8 * 8 - 4 * 4
+
+    # without cyclic edges each PE only has the halos facing the others
+    cost = layout_cost(*extents, **halos, message_cost=0.0, compute_cost=0.0)
+    assert cost == (6 * 6 - 4 * 4) * 2.0e-9
+
+
+def test_rank_layouts():
+
+    global_indices = [0, 359, 0, 29]
+    candidates = rank_layouts(
+        global_indices, 16, 2, 2, 2, 2, xflags=2, nz=50, compute_cost=0.0
+    )
+
+    assert candidates == sorted(candidates, key=lambda candidate: candidate.cost)
+    for candidate in candidates:
+        lx, ly = candidate.layout
+        assert lx * ly == 16
+        assert candidate.xextent.sum() == 360
+        assert candidate.yextent.sum() == 30
+        assert candidate.xextent.min() >= 2
+        assert candidate.yextent.min() >= 2
+
+    # the 1x16 layout is skipped, its divisions are narrower than the halo
+    assert [1, 16] not in [candidate.layout for candidate in candidates]
+
+    arguments = candidates[0].domain_arguments()
+    assert arguments["global_indices"] == global_indices
+    assert arguments["layout"] == candidates[0].layout
+    assert len(rank_layouts(global_indices, 16, 2, 2, 2, 2, top=2)) == 2
+
+
+def test_uneven_extents():
+
+    # on a non-cyclic axis the outer PEs have a single neighbor and are
+    # given more points
+    halos = dict(whalo=4, ehalo=4, shalo=4, nhalo=4)
+    candidate = next(
+        candidate
+        for candidate in rank_layouts([0, 399, 0, 99], 4, nz=20, **halos)
+        if candidate.layout == [4, 1]
+    )
+    assert candidate.xextent.sum() == 400
+    assert candidate.xextent[0] > candidate.xextent[1]
+    assert candidate.xextent[3] > candidate.xextent[2]
+    assert candidate.cost < layout_cost(
+        balanced_extents(400, 4), balanced_extents(100, 1), nz=20, **halos
+    )
+
+    candidate = next(
+        candidate
+        for candidate in rank_layouts([0, 399, 0, 99], 4, nz=20, xflags=2, **halos)
+        if candidate.layout == [4, 1]
+    )
+    assert candidate.xextent.tolist() == [100] * 4
+
+
+def test_block_costs():
+
+    cost = np.arange(6 * 4, dtype=np.float64).reshape(6, 4)
+    xextent, yextent = np.array([1, 2, 3]), np.array([3, 1])
+    blocks = block_costs(cost, xextent, yextent)
+
+    assert blocks.shape == (3, 2)
+    assert blocks[1, 0] == cost[1:3, 0:3].sum()
+    assert blocks[2, 1] == cost[3:6, 3:4].sum()
+    assert blocks.sum() == cost.sum()
+
+
+def test_weighted_extents():
+
+    # cost peaking at the equator with an expensive region
+    nx, ny = 96, 48
+    latitude = np.linspace(-90.0, 90.0, ny)
+    cost = np.ones((nx, ny)) * (1.0 + 2.0 * np.cos(np.radians(latitude)))[None, :]
+    cost[20:40, 10:30] *= 3.0
+
+    for layout in ([4, 4], [8, 2], [1, 6]):
+        xextent, yextent = weighted_extents(cost, layout, minimum=2)
+        assert xextent.dtype == np.int32 and yextent.dtype == np.int32
+        assert len(xextent) == layout[0] and len(yextent) == layout[1]
+        assert xextent.sum() == nx and yextent.sum() == ny
+        assert xextent.min() >= 2 and yextent.min() >= 2
+
+        weighted = block_costs(cost, xextent, yextent).max()
+        even = block_costs(
+            cost, balanced_extents(nx, layout[0]), balanced_extents(ny, layout[1])
+        ).max()
+        assert weighted < even
+
+    # a uniform cost gives the even split
+    xextent, yextent = weighted_extents(np.ones((12, 8)), [3, 2])
+    assert xextent.tolist() == [4, 4, 4]
+    assert yextent.tolist() == [4, 4]
+
+    with pytest.raises(ValueError):
+        weighted_extents(np.ones((4, 4)), [3, 1], minimum=2)
+    with pytest.raises(ValueError):
+        weighted_extents(-np.ones((4, 4)), [2, 2])
+
+
+def land_mask(nx: int, ny: int) -> NDArray:
+    # ocean everywhere but a continent in the west and land north of y = 24,
+    # stored (y, x) as in a grid file
+    land = np.zeros((ny, nx), dtype=np.float32)
+    land[:, :12] = 1.0
+    land[24:, :] = 1.0
+    return land
+
+
+def test_read_mask(tmp_path):
+
+    pytest.importorskip("h5py")
+    import xarray as xr
+
+    nx, ny = 48, 36
+    path = str(tmp_path / "land_mask.nc")
+    xr.Dataset(dict(mask=(("ny", "nx"), land_mask(nx, ny)))).to_netcdf(
+        path, engine="h5netcdf"
+    )
+
+    mask = read_mask(path, invert=True, engine="h5netcdf")
+    assert mask.shape == (nx, ny)
+    assert np.array_equal(mask, land_mask(nx, ny).T <= 0.5)
+
+
+def test_mask_layouts():
+
+    nx, ny = 48, 36
+    mask = land_mask(nx, ny).T <= 0.5
+    assert not mask[:12, :].any() and not mask[:, 24:].any()
+    assert mask[12:, :24].all()
+
+    maskmap = mask_maskmap(mask, balanced_extents(nx, 4), balanced_extents(ny, 3))
+    assert maskmap.shape == (4, 3)
+    assert maskmap.tolist() == [[False] * 3] + [[True, True, False]] * 3
+
+    candidates = mask_layouts(mask, range(12, 17))
+    assert [candidate.npes for candidate in candidates] == sorted(
+        candidate.npes for candidate in candidates
+    )
+    for candidate in candidates:
+        ndivs = candidate.layout[0] * candidate.layout[1]
+        assert candidate.maskmap.shape == tuple(candidate.layout)
+        assert candidate.npes == candidate.maskmap.sum() <= ndivs
+
+    candidate = mask_layout(mask, 6)
+    assert candidate.npes == 6
+    assert candidate.layout[0] * candidate.layout[1] > 6
+    arguments = candidate.domain_arguments()
+    assert arguments["global_indices"] == [0, nx - 1, 0, ny - 1]
+    assert arguments["maskmap"] is candidate.maskmap
+
+    table = format_mask_layouts(candidates).splitlines()
+    assert len(table) == len(candidates) + 1
+
+    with pytest.raises(ValueError):
+        mask_layout(np.zeros((8, 8), dtype=bool), 2)
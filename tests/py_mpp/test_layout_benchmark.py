@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains
+from pyfms.py_mpp.py_layout import benchmark_layouts, rank_layouts, weighted_extents
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_benchmark_layouts():
+
+    npes = 4
+    ntop = 3
+    halos = dict(whalo=2, ehalo=2, shalo=2, nhalo=2)
+    global_indices = [0, 47, 0, 23]
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so", ndomain=ntop + 1)
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    candidates = rank_layouts(
+        global_indices, npes, xflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN, top=ntop, **halos
+    )
+    assert len(candidates) == ntop
+
+    ranked = benchmark_layouts(
+        mpp_domains,
+        candidates,
+        domain_id=0,
+        xflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN,
+        nz=5,
+        nrepeat=3,
+        **halos,
+    )
+
+    assert sorted(map(id, ranked)) == sorted(map(id, candidates))
+    measured = [candidate.measured for candidate in ranked]
+    assert all(time > 0.0 for time in measured)
+    assert measured == sorted(measured)
+
+    # workload-weighted extents passed on to pyDomain
+    layout = [2, 2]
+    cost = np.ones((48, 24))
+    cost[:12, :] = 4.0
+    xextent, yextent = weighted_extents(cost, layout, minimum=2)
+    domain = pyDomain(
+        mpp_domains_obj=mpp_domains,
+        global_indices=global_indices,
+        layout=layout,
+        domain_id=ntop,
+        xextent=xextent,
+        yextent=yextent,
+        **halos,
+    )
+    i, j = mpp.pe() % layout[0], mpp.pe() // layout[0]
+    assert xextent.tolist() in ([10, 38], [11, 37])
+    assert domain.compute_domain.xsize.value == xextent[i]
+    assert domain.compute_domain.ysize.value == yextent[j]
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
+
+
+if __name__ == "__main__":
+    test_benchmark_layouts()
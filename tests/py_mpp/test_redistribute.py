@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains, pyRedistribution
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_redistribute():
+
+    nx = 20
+    ny = 12
+    nz = 4
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so", ndomain=2)
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (nx - 1), 0, (ny - 1)]
+
+    # a compute layout with halos and an I/O like layout of whole rows
+    compute_domain = pyDomain(
+        global_indices=global_indices,
+        layout=[2, 2],
+        mpp_domains_obj=mpp_domains,
+        domain_id=0,
+        xextent=np.array([8, 12], dtype=np.int32),
+        whalo=2,
+        ehalo=2,
+        shalo=2,
+        nhalo=2,
+    )
+    io_domain = pyDomain(
+        global_indices=global_indices,
+        layout=[1, 4],
+        mpp_domains_obj=mpp_domains,
+        domain_id=1,
+    )
+
+    rng = np.random.default_rng(3)
+    global_t = rng.standard_normal((nx, ny, nz))
+    global_q = rng.standard_normal((nx, ny))
+    root = mpp.pe() == 0
+
+    t = compute_domain.scatter(global_t if root else None)
+    q = compute_domain.scatter(global_q if root else None)
+
+    io_t = np.zeros(io_domain.geometry().data_shape + (nz,))
+    io_q = np.zeros(io_domain.geometry().compute_shape, dtype=np.float32)
+
+    to_io = pyRedistribution(compute_domain, io_domain)
+    to_io.redistribute([t, q], [io_t, io_q])
+
+    gathered_t = io_domain.gather(io_t)
+    gathered_q = io_domain.gather(io_q)
+    if root:
+        assert np.array_equal(gathered_t, global_t)
+        assert np.array_equal(gathered_q, global_q.astype(np.float32))
+
+    # and back, the halos of the compute domain are not touched
+    t_back = np.full_like(t, -99.0)
+    from_io = pyRedistribution(io_domain, compute_domain)
+    from_io.redistribute(io_t, t_back)
+    compute = compute_domain.compute_slice()
+    assert np.array_equal(t_back[compute], t[compute])
+    assert np.sum(t_back == -99.0) == t_back.size - t_back[compute].size
+
+    to_io.free()
+    from_io.free()
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
+
+
+if __name__ == "__main__":
+    test_redistribute()
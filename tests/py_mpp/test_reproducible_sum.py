@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pytest
+
+from pyfms.py_mpp.py_reduction import (
+    _combine,
+    digits_to_float,
+    reproducible_digits,
+)
+
+
+def test_reproducible_digits():
+
+    rng = np.random.default_rng(42)
+    values = rng.standard_normal(200000) * np.exp(rng.uniform(-20.0, 20.0, 200000))
+    total = digits_to_float(reproducible_digits(values))
+    assert total == math.fsum(values)
+
+    # the digits of any partition and order of the values sum to the same
+    for nparts in (1, 3, 16):
+        parts = np.array_split(rng.permutation(values), nparts)
+        digits = sum(reproducible_digits(part) for part in parts)
+        assert digits_to_float(digits) == total
+
+    # cancellation and tiny values are exact
+    assert digits_to_float(reproducible_digits(np.array([1.0e20, -1.0e-20]))) == 1.0e20
+    assert digits_to_float(reproducible_digits(np.array([1.0e20, -1.0e20]))) == 0.0
+    assert digits_to_float(reproducible_digits(np.array([-1.0e-20]))) == -1.0e-20
+    assert digits_to_float(reproducible_digits(np.empty(0))) == 0.0
+
+    with pytest.raises(ValueError):
+        reproducible_digits(np.array([1.0, np.nan]))
+    with pytest.raises(ValueError):
+        reproducible_digits(np.array([2.0**140]))
+
+
+def test_combine():
+
+    # one digit word, one sum and two extrema packed behind the header
+    def packed(digit, total, extrema):
+        return np.concatenate(
+            [
+                np.array([1, 1, digit], dtype=np.int64).view(np.float64),
+                [total],
+                extrema,
+            ]
+        )
+
+    a = packed(2**50, 1.5, [3.0, -np.inf])
+    b = packed(-3, 2.0, [1.0, -4.0])
+    _combine(memoryview(a), memoryview(b), None)
+    assert b[:3].view(np.int64).tolist() == [1, 1, 2**50 - 3]
+    assert b[3:].tolist() == [3.5, 3.0, -4.0]
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+from mpi4py import MPI
+
+from pyfms import pyDomain, pyFMS, pyFMS_mpp, pyFMS_mpp_domains
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.mark.parallel
+def test_start_update():
+
+    nx = 8
+    ny = 8
+    npes = 4
+    whalo = 2
+    ehalo = 2
+    nhalo = 2
+    shalo = 2
+    domain_id = 0
+
+    assert MPI.Query_thread() >= MPI.THREAD_SERIALIZED
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so")
+    mpp = pyFMS_mpp(cFMS=pyfms.cFMS)
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (nx - 1), 0, (ny - 1)]
+
+    layout = mpp_domains.define_layout(global_indices=global_indices, ndivs=npes)
+
+    domain = pyDomain(
+        global_indices=global_indices,
+        layout=layout,
+        mpp_domains_obj=mpp_domains,
+        domain_id=domain_id,
+        whalo=whalo,
+        ehalo=ehalo,
+        shalo=shalo,
+        nhalo=nhalo,
+        xflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN,
+        yflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN,
+    )
+
+    isc = domain.compute_domain.xbegin.value
+    jsc = domain.compute_domain.ybegin.value
+    xsize_d = domain.data_domain.xsize.value
+    ysize_d = domain.data_domain.ysize.value
+
+    # value of the global point, wrapped around the cyclic domain
+    ix = (isc - 2 * whalo + np.arange(xsize_d)) % nx
+    iy = (jsc - 2 * shalo + np.arange(ysize_d)) % ny
+    answer = (iy[np.newaxis, :] + shalo) * 10.0 + (ix[:, np.newaxis] + whalo)
+
+    compute = domain.compute_slice()
+    field = np.zeros(shape=(xsize_d, ysize_d), dtype=np.float64)
+    field[compute] = answer[compute]
+
+    handle = domain.start_update(
+        field, whalo=whalo, ehalo=ehalo, shalo=shalo, nhalo=nhalo
+    )
+
+    # interior work overlapping the halo exchange
+    interior = 2.0 * field[compute]
+    interior_sum = interior.sum()
+
+    assert handle.wait() is field
+    assert handle.done()
+
+    assert np.array_equal(field, answer)
+    assert interior_sum == 2.0 * answer[compute].sum()
+
+    # several updates in flight at once
+    fields = [np.zeros_like(field) for _ in range(3)]
+    handles = []
+    for k, kfield in enumerate(fields):
+        kfield[compute] = answer[compute] + 100 * k
+        handles.append(
+            domain.start_update(
+                kfield, whalo=whalo, ehalo=ehalo, shalo=shalo, nhalo=nhalo
+            )
+        )
+    for k, khandle in enumerate(handles):
+        assert np.array_equal(khandle.wait(), answer + 100 * k)
+
+    assert mpp.npes() == npes
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyfms import pyDomain, pyDomainArray, pyFMS, pyFMS_mpp_domains
+
+
+NX = 8
+NY = 8
+NPES = 4
+HALO = 2
+
+
+@pytest.mark.create
+def test_create_input_nml():
+    inputnml = open("input.nml", "w")
+    inputnml.close()
+    assert os.path.isfile("input.nml")
+
+
+@pytest.fixture(scope="module")
+def cyclic():
+    # a cyclic domain shared by the tests of the module, FMS is ended once
+    # they have all run
+
+    pyfms = pyFMS(cFMS_path="./cFMS/libcFMS/.libs/libcFMS.so")
+    mpp_domains = pyFMS_mpp_domains(cFMS=pyfms.cFMS)
+
+    global_indices = [0, (NX - 1), 0, (NY - 1)]
+    layout = mpp_domains.define_layout(global_indices=global_indices, ndivs=NPES)
+    halos = dict(whalo=HALO, ehalo=HALO, shalo=HALO, nhalo=HALO)
+
+    domain = pyDomain(
+        global_indices=global_indices,
+        layout=layout,
+        mpp_domains_obj=mpp_domains,
+        domain_id=0,
+        xflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN,
+        yflags=mpp_domains.CYCLIC_GLOBAL_DOMAIN,
+        **halos,
+    )
+
+    isc = domain.compute_domain.xbegin.value
+    jsc = domain.compute_domain.ybegin.value
+    xsize_d = domain.data_domain.xsize.value
+    ysize_d = domain.data_domain.ysize.value
+
+    # value of the global point, wrapped around the cyclic domain
+    ix = (isc - 2 * HALO + np.arange(xsize_d)) % NX
+    iy = (jsc - 2 * HALO + np.arange(ysize_d)) % NY
+    answer = (iy[np.newaxis, :] + HALO) * 10.0 + (ix[:, np.newaxis] + HALO)
+
+    yield dict(
+        pyfms=pyfms,
+        mpp_domains=mpp_domains,
+        domain=domain,
+        halos=halos,
+        answer=answer,
+        compute=domain.compute_slice(),
+    )
+
+    pyfms.pyfms_end()
+
+
+@pytest.mark.parallel
+def test_update_halos(cyclic):
+
+    # grouped halo update of fields with mixed dtypes and ranks
+
+    domain, answer, compute = cyclic["domain"], cyclic["answer"], cyclic["compute"]
+
+    ddata = np.zeros(answer.shape, dtype=np.float64)
+    ndata = np.zeros(answer.shape, dtype=np.int32)
+    kdata = np.zeros(answer.shape + (3,), dtype=np.float32)
+    ddata[compute] = answer[compute]
+    ndata[compute] = answer[compute]
+    for k in range(3):
+        kdata[compute + (k,)] = answer[compute] + 100 * k
+
+    domain.update_halos([ddata, ndata, kdata], **cyclic["halos"])
+
+    assert np.array_equal(ddata, answer)
+    assert np.array_equal(ndata, answer)
+    for k in range(3):
+        assert np.array_equal(kdata[:, :, k], answer + 100 * k)
+
+
+@pytest.mark.parallel
+def test_halo_plan(cyclic):
+
+    # persistent mpi4py halo exchange, reused for two exchanges
+
+    domain, answer, compute = cyclic["domain"], cyclic["answer"], cyclic["compute"]
+    halos = cyclic["halos"]
+
+    field = np.zeros(answer.shape, dtype=np.float32)
+    plan = domain.halo_plan(field, **halos)
+    assert domain.halo_plan(field, **halos) is plan
+
+    for shift in (0, 1000):
+        field = np.zeros(answer.shape, dtype=np.float32)
+        field[compute] = answer[compute] + shift
+        plan.exchange(field)
+        assert np.array_equal(field, answer + shift)
+
+
+@pytest.mark.parallel
+def test_domain_array(cyclic):
+
+    # halo updates of arrays nothing was written to are skipped
+
+    domain, answer, compute = cyclic["domain"], cyclic["answer"], cyclic["compute"]
+    halos = cyclic["halos"]
+
+    field = pyDomainArray(domain, dtype=np.float32, name="t")
+    field[compute] = answer[compute]
+    for _ in range(2):
+        field.update_domains(**halos)
+        assert np.array_equal(field, answer)
+    assert pyDomainArray.counts()["t"] == dict(performed=1, skipped=1)
+    field[compute] += 1000
+    field.update_domains(**halos)
+    assert np.array_equal(field, answer + 1000)
+
+
+@pytest.mark.remove
+def test_remove_input_nml():
+    os.remove("input.nml")
+    assert not os.path.isfile("input.nml")
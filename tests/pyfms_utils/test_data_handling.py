@@ -0,0 +1,129 @@
+import ctypes
+
+import numpy as np
+import pytest
+
+from pyfms.pyfms_utils.data_handling import (
+    ArrayCopyError,
+    check_array,
+    check_size,
+    copy_stats,
+    get_strict_mode,
+    reset_copy_stats,
+    set_strict_mode,
+    setarray_Cdouble,
+    setarray_Cint32,
+    strict_mode,
+)
+from pyfms.pyfms_utils.grid_utils import GridUtils
+
+
+def test_check_array():
+
+    field = np.zeros(shape=(6, 4), dtype=np.float64)
+
+    # C-contiguous arrays are passed through without a copy
+    assert check_array(field, np.dtype(np.float64)) is field
+    assert check_array(field, np.dtype(np.float64), ndim=2) is field
+
+    # non contiguous and transposed arrays are copied to C order
+    for view in (field[1:5, 1:3], field.T, np.asfortranarray(field)):
+        copy = check_array(view, np.dtype(np.float64))
+        assert copy is not view
+        assert copy.flags.c_contiguous
+        assert np.array_equal(copy, view)
+
+    with pytest.raises(TypeError):
+        check_array(field, np.dtype(np.float32))
+
+    with pytest.raises(TypeError):
+        check_array(field, np.dtype(np.float64), ndim=3)
+
+    with pytest.raises(TypeError):
+        check_array([1.0, 2.0], np.dtype(np.float64))
+
+    readonly = field.copy()
+    readonly.flags.writeable = False
+    assert check_array(readonly, np.dtype(np.float64)) is readonly
+    with pytest.raises(ValueError):
+        check_array(readonly, np.dtype(np.float64), writeable=True)
+
+
+def test_setarray():
+
+    field = np.arange(12, dtype=np.int32).reshape(3, 4)
+
+    field_p, field_t = setarray_Cint32(field, ndim=2)
+    assert field_t is ctypes.POINTER(ctypes.c_int)
+    assert ctypes.addressof(field_p.contents) == field.ctypes.data
+    assert field_p[5] == 5
+
+    # the pointer type only depends on the dtype
+    other_p, other_t = setarray_Cint32(np.zeros(7, dtype=np.int32))
+    assert other_t is field_t
+
+    none_p, none_t = setarray_Cdouble(None)
+    assert none_p is None
+    assert none_t is ctypes.POINTER(ctypes.c_double)
+
+    # a strided view is passed as a contiguous copy
+    view_p, view_t = setarray_Cint32(field[:, 1])
+    assert [view_p[i] for i in range(3)] == [1, 5, 9]
+
+
+def test_check_size():
+
+    check_size(np.zeros(6), 6, "lon")
+    check_size(np.zeros(8), 6, "lon")
+    with pytest.raises(ValueError, match="lon"):
+        check_size(np.zeros(5), 6, "lon")
+
+    # undersized grids are rejected before cFMS is called
+    with pytest.raises(ValueError, match="lat"):
+        GridUtils.get_grid_area(
+            cfms=None, nlon=2, nlat=2, lon=np.zeros(9), lat=np.zeros(4)
+        )
+
+
+def test_strict_mode():
+
+    field = np.zeros(shape=(6, 4), dtype=np.float64)
+    reset_copy_stats()
+
+    with strict_mode("count"):
+        assert get_strict_mode() == "count"
+        # arrays passed without a copy are not recorded
+        setarray_Cdouble(field)
+        assert copy_stats() == {}
+
+        for _ in range(2):
+            setarray_Cdouble(field[1:5, 1:3])
+        setarray_Cdouble(np.asfortranarray(field))
+        setarray_Cdouble(field[:, :3].T)
+
+    assert get_strict_mode() == "off"
+
+    stats = copy_stats()
+    assert len(stats) == 3
+    site = [key for key in stats if stats[key]["copies"] == 2][0]
+    assert site.startswith(__file__)
+    assert stats[site]["function"] == "check_array"
+    assert stats[site]["reasons"] == {"non_contiguous": 2}
+    assert stats[site]["bytes"] == 2 * 8 * 8
+    reasons = sorted(reason for entry in stats.values() for reason in entry["reasons"])
+    assert reasons == ["fortran_order", "non_contiguous", "transposed"]
+
+    # copies are not recorded when strict mode is off
+    setarray_Cdouble(field[1:5, 1:3])
+    assert copy_stats() == stats
+
+    reset_copy_stats()
+    assert copy_stats() == {}
+
+    with strict_mode("raise"):
+        setarray_Cdouble(field)
+        with pytest.raises(ArrayCopyError):
+            setarray_Cdouble(field[::2])
+
+    with pytest.raises(ValueError):
+        set_strict_mode("sometimes")
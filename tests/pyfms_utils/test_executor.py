@@ -0,0 +1,122 @@
+import ctypes
+import threading
+
+import numpy as np
+import pytest
+
+from pyfms.pyfms_utils import function_registry
+from pyfms.pyfms_utils.data_handling import setarray_Cdouble
+from pyfms.pyfms_utils.executor import cFMSExecutor, get_executor, shutdown_executor
+from pyfms.pyfms_utils.function_registry import (
+    add_function_wrapper,
+    get_registry,
+    remove_function_wrapper,
+)
+
+
+libc = ctypes.CDLL(None)
+
+
+def zero(field):
+    field_p, field_t = setarray_Cdouble(field)
+    _memset = get_registry(libc).get(
+        "memset",
+        argtypes=[field_t, ctypes.c_int, ctypes.c_size_t],
+        restype=ctypes.c_void_p,
+    )
+    _memset(field_p, 0, field.nbytes)
+    return field
+
+
+def test_executor():
+
+    threads = []
+
+    def record_thread(symbol, function):
+        def recorded(*args):
+            threads.append(threading.get_ident())
+            return function(*args)
+
+        return recorded
+
+    add_function_wrapper(record_thread)
+
+    field = np.ones(shape=(32, 16), dtype=np.float64)
+
+    with cFMSExecutor() as executor:
+        # the caller returns before the queued calls have run
+        release = threading.Event()
+        blocked = executor.submit(release.wait)
+        future = executor.submit(zero, field)
+        assert not blocked.done() and not future.done()
+        assert np.all(field == 1.0)
+        release.set()
+        assert future.result() is field
+        assert np.all(field == 0.0)
+
+        # calls made outside of the executor while calls are queued are run
+        # on its thread
+        release.clear()
+        blocked = executor.submit(release.wait)
+        field[...] = 1.0
+        threading.Timer(0.05, release.set).start()
+        zero(field)
+        assert blocked.done()
+        assert np.all(field == 0.0)
+
+        assert len(threads) == 2
+        assert threads[0] == threads[1] == executor._thread_id
+        assert executor._thread_id != threading.get_ident()
+
+        # once no calls are queued they are made on the calling thread,
+        # without the confining wrapper
+        assert executor._confined not in function_registry._function_wrappers
+        zero(field)
+        assert threads[-1] == threading.get_ident()
+
+    # after shutdown calls are made on the calling thread
+    zero(field)
+    assert threads[-1] == threading.get_ident()
+
+    remove_function_wrapper(record_thread)
+
+
+def test_mpi_thread_level(monkeypatch):
+
+    from mpi4py import MPI
+
+    # as if FMS had initialized MPI with MPI_THREAD_SINGLE
+    monkeypatch.setattr(MPI, "Query_thread", lambda: MPI.THREAD_SINGLE)
+    with pytest.raises(RuntimeError, match="MPI_THREAD_SERIALIZED"):
+        cFMSExecutor()
+
+
+def test_start_update():
+
+    from pyfms.py_mpp.py_mpp_domains import pyDomain
+
+    release = threading.Event()
+
+    class MppDomains:
+        # a halo update that only finishes once released
+        def update_domains(self, field, **kwargs):
+            release.wait()
+            field[0, :] = field[-1, :] = 2.0
+
+    domain = pyDomain.__new__(pyDomain)
+    domain.mpp_domains_obj = MppDomains()
+    domain.domain_id = 0
+
+    field = np.ones(shape=(6, 6), dtype=np.float64)
+    handle = domain.start_update(field)
+
+    # the caller carries on while the update is in flight
+    assert not handle.done()
+    interior = field[1:-1].sum()
+    release.set()
+    assert handle.wait(timeout=10.0) is field
+    assert np.all(field[0] == 2.0) and interior == 24.0
+
+    executor = get_executor()
+    assert executor._confined not in function_registry._function_wrappers
+    shutdown_executor()
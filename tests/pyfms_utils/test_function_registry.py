@@ -0,0 +1,48 @@
+import ctypes
+
+import numpy as np
+
+from pyfms.pyfms_utils.data_handling import setarray_Cdouble
+from pyfms.pyfms_utils.function_registry import get_registry
+
+
+libc = ctypes.CDLL(None)
+
+
+def test_bind_once():
+
+    registry = get_registry(libc)
+    assert get_registry(libc) is registry
+
+    field = np.ones(shape=(4, 3), dtype=np.float64)
+    field_p, field_t = setarray_Cdouble(field)
+
+    _memset = registry.get(
+        "memset",
+        argtypes=[field_t, ctypes.c_int, ctypes.c_size_t],
+        restype=ctypes.c_void_p,
+        dtype=field.dtype,
+        rank=field.ndim,
+    )
+
+    assert registry.is_bound("memset", dtype=field.dtype, rank=field.ndim)
+    assert registry.get("memset", dtype=field.dtype, rank=field.ndim) is _memset
+
+    # the function cached on the library is left untouched
+    assert libc.memset is not _memset
+    assert libc.memset.argtypes is None
+
+    _memset(field_p, 0, field.nbytes)
+    assert np.all(field == 0.0)
+
+    # a differently shaped array reuses the binding
+    field = np.ones(shape=(7, 5, 2), dtype=np.float64)
+    field_p, field_t = setarray_Cdouble(field)
+    _memset(field_p, 0, field.nbytes)
+    assert np.all(field == 0.0)
+
+    # optional arrays bind to the same type
+    _memset(None, 0, 0)
+
+    registry.clear()
+    assert not registry.is_bound("memset", dtype=field.dtype, rank=field.ndim)
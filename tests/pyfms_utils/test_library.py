@@ -0,0 +1,48 @@
+import _ctypes
+import ctypes
+
+import pytest
+
+from pyfms.pyfms_utils import library
+
+
+def test_load_library():
+
+    # any shared object will do in place of libcFMS.so
+    path = _ctypes.__file__
+
+    handle = library.load_library(path)
+    assert library.load_library(path) is handle
+    assert library.get_library() is handle
+    assert library.get_status(handle) == library.LOADED
+
+    with pytest.raises(ValueError):
+        library.load_library(path + ".does_not_exist")
+
+    with pytest.raises(ValueError):
+        library.load_library(None)
+
+
+def test_lifecycle():
+
+    handle = ctypes.CDLL(None)
+    library.set_library(handle)
+    assert library.get_library() is handle
+    assert not library.is_initialized()
+
+    finalized = []
+    library.mark_initialized(handle, finalizer=lambda: finalized.append(handle))
+    assert library.is_initialized(handle)
+
+    library._finalize()
+    assert finalized == [handle]
+    # finalizers only run once
+    library._finalize()
+    assert finalized == [handle]
+
+    library.mark_ended(handle)
+    assert library.is_ended(handle)
+    assert not library.is_initialized(handle)
+
+    with pytest.raises(RuntimeError):
+        library.mark_initialized(handle)
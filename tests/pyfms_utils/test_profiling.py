@@ -0,0 +1,81 @@
+import ctypes
+
+import numpy as np
+
+from pyfms.pyfms_utils import profiling
+from pyfms.pyfms_utils.data_handling import setarray_Cdouble
+from pyfms.pyfms_utils.function_registry import get_registry
+
+
+libc = ctypes.CDLL(None)
+
+
+class Wrapper:
+    def __init__(self, clib: ctypes.CDLL):
+        self._registry = get_registry(clib)
+
+    def zero(self, field):
+        field_p, field_t = setarray_Cdouble(field)
+        _memset = self._registry.get(
+            "memset",
+            argtypes=[field_t, ctypes.c_int, ctypes.c_size_t],
+            restype=ctypes.c_void_p,
+        )
+        _memset(field_p, 0, field.nbytes)
+
+    def zero_twice(self, field):
+        self.zero(field)
+        self.zero(field)
+
+
+def test_profiling():
+
+    wrapper = Wrapper(libc)
+    zero = Wrapper.zero
+    field = np.ones(shape=(16, 8), dtype=np.float64)
+    wrapper.zero(field)
+    _memset = wrapper._registry.get("memset")
+
+    records = []
+
+    def hook(*record):
+        records.append(record)
+
+    profiling.reset()
+    profiling.register_class(Wrapper)
+    profiling.add_hook(hook)
+    profiling.enable()
+    assert profiling.is_enabled()
+    assert Wrapper.zero is not zero
+    assert wrapper._registry.get("memset") is not _memset
+
+    wrapper.zero_twice(field)
+    wrapper.zero(field)
+
+    stats = profiling.stats()
+    assert stats["Wrapper.zero"]["count"] == 3
+    assert stats["Wrapper.zero"]["bytes"] == 3 * field.nbytes
+    assert stats["Wrapper.zero_twice"]["count"] == 1
+    # bytes and time in cFMS are attributed to the innermost method
+    assert stats["Wrapper.zero_twice"]["bytes"] == 0
+    assert stats["Wrapper.zero_twice"]["fortran"] == 0.0
+    for entry in stats.values():
+        assert entry["wall"] >= entry["marshal"] + entry["fortran"] - 1.0e-9
+    assert len(records) == 4
+
+    profiling.disable()
+    profiling.remove_hook(hook)
+    assert Wrapper.zero is zero
+    assert wrapper._registry.get("memset") is _memset
+
+    # statistics are not updated once profiling is disabled
+    wrapper.zero(field)
+    assert profiling.stats() == stats
+
+    summary = profiling.summarize([stats, {}])
+    assert summary["Wrapper.zero"]["count"] == (0, 3, 1.5)
+    table = profiling.format_table(summary, 2)
+    assert "Wrapper.zero_twice" in table
+
+    profiling.reset()
+    assert profiling.stats() == {}
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def import_time(statement: str) -> tuple[int, set]:
+    """
+    Runs statement in a fresh interpreter with -X importtime
+
+    Returns: cumulative import time of pyfms in microseconds, and the
+    modules loaded after running the statement
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; {statement}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumul, name = line.split("|")
+        # nested imports are indented and already part of the cumulative time
+        if name.startswith(" pyfms"):
+            cumulative += int(cumul)
+    return cumulative, set(result.stdout.split())
+
+
+def test_lazy_import():
+
+    import pyfms
+
+    for name in pyfms.__all__:
+        assert getattr(pyfms, name) is not None
+        assert name in dir(pyfms)
+
+    with pytest.raises(AttributeError):
+        pyfms.not_a_pyfms_attribute
+
+    lazy_time, modules = import_time("import pyfms")
+    assert "pyfms" in modules
+    for module in (
+        "yaml",
+        "dacite",
+        "numpy",
+        "pyfms.pyfms",
+        "pyfms.py_mpp.py_mpp_domains",
+        "pyfms.py_field_manager.py_field_manager",
+    ):
+        assert module not in modules
+
+    _, modules = import_time("from pyfms import pyFMS")
+    assert "pyfms.pyfms" in modules
+    assert "yaml" not in modules
+    assert "pyfms.py_diag_manager.pyfms_diag_manager" not in modules
+
+    eager_time, _ = import_time(
+        "import pyfms; [getattr(pyfms, n) for n in pyfms.__all__]"
+    )
+    print(f"import pyfms: {lazy_time} us, all of pyfms: {eager_time} us")
+    assert lazy_time < eager_time
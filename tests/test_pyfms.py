@@ -4,6 +4,7 @@ import pytest
 from mpi4py import MPI
 
 from pyfms import pyFMS
+from pyfms.pyfms_utils import profiling
 
 
 cfms_path = os.path.dirname(__file__) + "/../cFMS/cLIBFMS/lib/libcFMS.so"
@@ -18,7 +19,7 @@ def test_create_input_nml():
 
 
 @pytest.mark.parallel
-def test_pyfms_init():
+def test_pyfms_init(capsys):
 
     assert os.path.exists(cfms_path)
 
@@ -31,7 +32,16 @@ def test_pyfms_init():
 
     assert isinstance(pyfmsobj, pyFMS)
 
-    pyfmsobj.pyfms_end()
+    # the profile table is returned on root, not printed
+    profiling.enable()
+    table = pyfmsobj.pyfms_end()
+    profiling.disable()
+    if MPI.COMM_WORLD.Get_rank() == 0:
+        assert isinstance(table, str)
+    else:
+        assert table is None
+    assert capsys.readouterr().out == ""
+    assert pyfmsobj.pyfms_end() is None
 
 
 @pytest.mark.remove